@@ -1,11 +1,10 @@
 import requests
 import pandas as pd
 import logging
-from typing import Dict
-import os
-from dotenv import load_dotenv
-load_dotenv()
-mail = os.getenv("EMAIL")
+from typing import Dict, Optional
+
+from data_collectors.engine import CollectorEngine, get_engine
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,10 +14,17 @@ class OpenWeatherCollector:
     NOT DONE YET, DONT WANT TO PAY YET FOR API KEY
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, requests_per_second: float = 1.0,
+                 engine: Optional[CollectorEngine] = None):
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5"
-        self.session = requests.Session()
+        # Shared engine: pooled session, retries with backoff and a circuit breaker per host
+        self.engine = engine or get_engine()
+        self.session = self.engine.register(self.base_url, requests_per_second=requests_per_second)
+
+    def _get(self, endpoint: str, params: Dict) -> requests.Response:
+        """GET an endpoint through the engine"""
+        return self.engine.run(self.engine.request("GET", f"{self.base_url}/{endpoint}", params=params))
     
     def get_current_weather(self, lat: float, lon: float) -> Dict:
         """Get current weather data"""
@@ -30,7 +36,7 @@ class OpenWeatherCollector:
         }
         
         try:
-            response = self.session.get(f"{self.base_url}/weather", params=params)
+            response = self._get("weather", params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -47,7 +53,7 @@ class OpenWeatherCollector:
         }
         
         try:
-            response = self.session.get(f"{self.base_url}/forecast", params=params)
+            response = self._get("forecast", params)
             response.raise_for_status()
             data = response.json()
             
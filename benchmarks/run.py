@@ -0,0 +1,381 @@
+#benchmark runner
+#times the collectors, caches and models end to end on offline payloads and checks for regressions
+#
+#   python -m benchmarks.run                              run every case and print the table
+#   python -m benchmarks.run --save results.json          keep the results as a baseline
+#   python -m benchmarks.run --baseline results.json      exit 1 if a case regressed
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+# One year of hourly rows
+YEAR_HOURS = 8760
+
+CASES: Dict[str, Callable] = {}
+UNITS: Dict[str, str] = {}
+
+
+def case(name: str, unit: str):
+    """Register a benchmark case.
+
+    A case is a context manager taking the scale factor and yielding
+    ``(run, units)``: a callable doing the timed work and how many units
+    (rows, polls, ...) one call processes. Setup and teardown stay outside
+    the timings.
+    """
+    def register(setup):
+        CASES[name] = contextmanager(setup)
+        UNITS[name] = unit
+        return setup
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    unit: str
+    units: int
+    median_s: float
+    min_s: float
+    throughput: float
+    peak_mb: float
+
+
+def measure(name: str, run: Callable, units: int, repeat: int = 5) -> Result:
+    """Time ``run`` after a warm-up call, then trace its peak Python/NumPy allocation once."""
+    run()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(times)
+    return Result(name=name, unit=UNITS[name], units=units, median_s=median, min_s=min(times),
+                  throughput=units / median if median > 0 else float("inf"), peak_mb=peak / 2 ** 20)
+
+
+def _eia_collector(base_url: str):
+    from data_collectors.engine import CollectorEngine
+    from data_collectors.eia_collector import EIADataCollector
+
+    collector = EIADataCollector(api_key="offline", requests_per_second=0, engine=CollectorEngine())
+    collector.base_url = base_url
+    return collector
+
+
+def _noaa_collector(base_url: str, directory: str, **kwargs):
+    from data_collectors.engine import CollectorEngine
+    from data_collectors.gridpoint_index import GridpointIndex
+    from data_collectors.weather_collectors import NOAACollector
+
+    index = GridpointIndex(os.path.join(directory, "gridpoints.json"))
+    index.put(38.5816, -121.4944, ("STO", 41, 68))
+    collector = NOAACollector(requests_per_second=0, engine=CollectorEngine(), gridpoint_index=index, **kwargs)
+    collector.base_url = base_url
+    return collector
+
+
+@case("parse_eia", unit="rows")
+def bench_parse_eia(scale: float):
+    from data_collectors.parsing import eia_frame
+
+    rows = fixtures.eia_rows(max(1, int(20 * 5000 * scale)))
+    fields = {'period': 'timestamp', 'respondent': 'region', 'value': 'demand_mw'}
+    yield (lambda: eia_frame(rows, fields)), len(rows)
+
+
+@case("paginate_eia", unit="rows")
+def bench_paginate_eia(scale: float):
+    rows = fixtures.eia_rows(max(1, int(3 * YEAR_HOURS * scale)))
+    with StandInServer(eia_rows=rows) as server:
+        collector = _eia_collector(server.url)
+        yield (lambda: collector.get_electricity_demand("CISO", "2022-01-01T00", "2025-01-01T00")), len(rows)
+
+
+@case("parse_nws", unit="forecasts")
+def bench_parse_nws(scale: float):
+    from data_collectors.parsing import nws_forecast_frame
+
+    periods = fixtures.nws_forecast()["properties"]["periods"]
+    sites = max(1, int(200 * scale))
+
+    def run():
+        for _ in range(sites):
+            nws_forecast_frame(periods, 38.5816, -121.4944)
+    yield run, sites
+
+
+@case("poll_forecast_uncached", unit="polls")
+def bench_poll_forecast_uncached(scale: float):
+    polls = max(1, int(50 * scale))
+    with StandInServer() as server, tempfile.TemporaryDirectory() as directory:
+        collector = _noaa_collector(server.url, directory)
+
+        def run():
+            for _ in range(polls):
+                collector.get_forecast(38.5816, -121.4944)
+        yield run, polls
+
+
+@case("poll_forecast_conditional", unit="polls")
+def bench_poll_forecast_conditional(scale: float):
+    from data_collectors.http_cache import ResponseCache
+
+    polls = max(1, int(50 * scale))
+    # max-age=0, so every poll revalidates and gets a 304
+    with StandInServer(max_age=0) as server, tempfile.TemporaryDirectory() as directory:
+        collector = _noaa_collector(server.url, directory, response_cache=ResponseCache())
+
+        def run():
+            for _ in range(polls):
+                collector.get_forecast(38.5816, -121.4944)
+        yield run, polls
+
+
+@case("series_cache", unit="rows")
+def bench_series_cache(scale: float):
+    from data_collectors.cache import SeriesCache
+
+    df = fixtures.raw_hourly(max(1, int(3 * YEAR_HOURS * scale))).rename(
+        columns={"time": "timestamp", "Load": "demand_mw"})[["timestamp", "demand_mw"]]
+    df["region"] = "CISO"
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SeriesCache(directory)
+
+        def run():
+            cache.write("bench/demand", df, keys=["timestamp", "region"])
+            cache.read("bench/demand", columns=["timestamp", "demand_mw"])
+        yield run, len(df)
+
+
+@case("hourly_load", unit="intervals")
+def bench_hourly_load(scale: float):
+    from data.scripts.extract import GridStatusExtractor
+
+    load = fixtures.caiso_load(years=3 * scale)
+    extractor = GridStatusExtractor()
+    extractor.caiso = fixtures.StandInCAISO(load)
+    start = load["Time"].iloc[0].tz_localize(None).strftime("%Y-%m-%d")
+    end = (load["Time"].iloc[-1].tz_localize(None) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    yield (lambda: extractor.get_historical_load_hourly(start, end)), len(load)
+
+
+@case("live_load", unit="polls")
+def bench_live_load(scale: float):
+    from data.scripts.extract import INTERVALS_PER_HOUR, LiveLoadTracker
+
+    load = fixtures.caiso_load(years=max(scale, 0.01) * 30 / 365)
+    times = load["Time"].dt.tz_convert("UTC").to_numpy(dtype="datetime64[ns]").astype("int64")
+    values = load["Load"].to_numpy()
+    hours = len(load) // INTERVALS_PER_HOUR
+
+    def run():
+        # One hourly poll at a time, reading the last day after each
+        tracker = LiveLoadTracker(caiso=None, capacity_hours=24)
+        for hour in range(hours):
+            window = slice(hour * INTERVALS_PER_HOUR, (hour + 1) * INTERVALS_PER_HOUR)
+            tracker.push(times[window], values[window])
+            tracker.hourly(24)
+    yield run, hours
+
+
+@case("score_demand", unit="rows")
+def bench_score_demand(scale: float):
+    from models.inference import load_model
+
+    with warnings.catch_warnings():
+        # the pickles may come from another scikit-learn version
+        warnings.simplefilter("ignore")
+        model = load_model("demand")
+    X = fixtures.feature_batch(model.feature_names, max(1, int(3 * YEAR_HOURS * scale)))
+    yield (lambda: model.predict(X)), len(X)
+
+
+@case("feature_pipeline", unit="rows")
+def bench_feature_pipeline(scale: float):
+    from data.scripts.pipeline import FeaturePipeline
+
+    raw = fixtures.raw_hourly(max(48, int(3 * YEAR_HOURS * scale)))
+    chunk = 50_000
+
+    def run():
+        # A new store each time; the pipeline skips hours it has already processed
+        with tempfile.TemporaryDirectory() as directory:
+            FeaturePipeline(directory).run(raw.iloc[i:i + chunk] for i in range(0, len(raw), chunk))
+    yield run, len(raw)
+
+
+@case("dispatch_week", unit="region-hours")
+def bench_dispatch_week(scale: float):
+    from models.dispatch import solve_dispatch
+
+    forecast = fixtures.fleet_forecast(max(1, int(60 * scale)))
+    units = forecast["demand_mw"].size
+    yield (lambda: solve_dispatch(**forecast, storage_energy_mwh=2000, storage_power_mw=500)), units
+
+
+@case("hourly_table_join", unit="rows")
+def bench_hourly_table_join(scale: float):
+    import numpy as np
+
+    from data_collectors.timeseries import HourlyTable
+
+    # Demand and shuffled generation for 40 regions, joined on hour and region
+    hours = pd.date_range("2019-01-01", periods=max(24, int(6 * YEAR_HOURS * scale)), freq="h")
+    regions = [f"R{i:02d}" for i in range(40)]
+    demand = pd.DataFrame({"timestamp": np.tile(hours, len(regions)),
+                           "region": np.repeat(regions, len(hours)),
+                           "demand_mw": np.random.default_rng(0).uniform(0, 1000, len(hours) * len(regions))})
+    generation = demand.rename(columns={"demand_mw": "generation_mw"}).sample(frac=1.0, random_state=0)
+    demand, generation = HourlyTable.from_frame(demand), HourlyTable.from_frame(generation)
+    yield (lambda: demand.join(generation)), len(demand)
+
+
+@case("backtest_folds", unit="folds")
+def bench_backtest_folds(scale: float):
+    import numpy as np
+    from sklearn.linear_model import Ridge
+
+    from models.backtest import Backtester, rolling_origin_folds
+
+    # Monthly origins over six years of hourly features, a year of history first
+    rows = max(400, int(6 * YEAR_HOURS * scale))
+    X = np.random.default_rng(0).standard_normal((rows, 34))
+    y = X @ np.linspace(-1, 1, 34)
+    horizon = max(1, rows // 72)
+    folds = rolling_origin_folds(rows, horizon=horizon, initial=rows // 6)
+    backtester = Backtester(X, y, folds)
+    yield (lambda: backtester.run({"ridge": Ridge()})), len(folds)
+
+
+@case("ensemble_score", unit="rows")
+def bench_ensemble_score(scale: float):
+    from models.ensemble import Ensemble
+    from models.inference import load_model
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = load_model("demand")
+    X = fixtures.feature_batch(model.feature_names, max(1, int(YEAR_HOURS * scale)))
+    ensemble = Ensemble()
+    for i in range(3):
+        ensemble.add(f"demand-{i}", model, version=str(i))
+
+    def run():
+        # Cold scores; a warm cache would only time the batch hash
+        ensemble.clear_cache()
+        ensemble.predict(X)
+    yield run, len(X)
+    ensemble.close()
+
+
+def run_suite(names: Optional[List[str]] = None, scale: float = 1.0, repeat: int = 5) -> Dict[str, Result]:
+    """Run the named cases (all by default) and return their results."""
+    results = {}
+    for name in names or list(CASES):
+        with CASES[name](scale) as (run, units):
+            results[name] = measure(name, run, units, repeat=repeat)
+    return results
+
+
+def load_thresholds(path: str = THRESHOLDS_PATH) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Dict], thresholds: Dict) -> List[str]:
+    """Cases that got slower or hungrier than the baseline allows.
+
+    :param results: Results of this run.
+    :param baseline: Saved results, name -> Result fields.
+    :param thresholds: Allowed relative throughput drop and memory growth, as
+        defaults plus per-case overrides (see thresholds.json).
+    :return: One message per regression; empty when the run is accepted.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if base["units"] != result.units:
+            regressions.append(f"{name}: baseline processed {base['units']} {result.unit}, "
+                               f"this run {result.units}; rerun at the same scale")
+            continue
+        limits = dict(thresholds["default"], **thresholds.get("cases", {}).get(name, {}))
+        floor = base["throughput"] * (1 - limits["throughput_drop"])
+        if result.throughput < floor:
+            regressions.append(f"{name}: {result.throughput:,.0f} {result.unit}/s is below "
+                               f"{floor:,.0f} (baseline {base['throughput']:,.0f})")
+        ceiling = base["peak_mb"] * (1 + limits["memory_growth"]) + limits.get("memory_slack_mb", 0)
+        if result.peak_mb > ceiling:
+            regressions.append(f"{name}: peak {result.peak_mb:.1f} MB is above {ceiling:.1f} MB "
+                               f"(baseline {base['peak_mb']:.1f} MB)")
+    return regressions
+
+
+def format_table(results: Dict[str, Result]) -> str:
+    lines = [f"{'case':<28}{'units':>10}  {'median':>10}  {'throughput':>26}  {'peak':>10}"]
+    for r in results.values():
+        lines.append(f"{r.name:<28}{r.units:>10}  {r.median_s * 1000:>8.1f}ms  "
+                     f"{r.throughput:>14,.0f} {r.unit + '/s':<11}  {r.peak_mb:>7.1f} MB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks for VARtigrate.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run, default all: {', '.join(CASES)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on payload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="allowed regressions")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run_suite(args.cases or None, scale=args.scale, repeat=args.repeat)
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"scale": args.scale, "cases": {name: asdict(r) for name, r in results.items()}}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+        regressions = compare(results, baseline, load_thresholds(args.thresholds))
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
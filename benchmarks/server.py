@@ -0,0 +1,135 @@
+#stand-in server
+#local http server that answers like the EIA v2 and NWS apis, so collectors run end to end offline
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks import fixtures
+
+
+class StandInServer:
+    """Serves EIA pages and NWS points/forecasts from in-memory payloads.
+
+    EIA POST bodies are paginated by offset/length with the total as a
+    string, like the real API. NWS forecasts carry an ETag and answer a
+    matching If-None-Match with 304. Point the collectors at ``url`` by
+    setting their base_url. Counters of served requests are kept per path
+    kind in ``hits``; inject() makes chosen requests fail, to exercise
+    retries, circuit breakers and checkpoints.
+    """
+
+    def __init__(self, eia_rows: Optional[List[Dict]] = None, forecast: Optional[Dict] = None,
+                 max_age: int = 0):
+        self.eia_rows = eia_rows if eia_rows is not None else []
+        self.forecast = forecast if forecast is not None else fixtures.nws_forecast()
+        self.forecast_body = json.dumps(self.forecast).encode()
+        self.etag = '"forecast-1"'
+        self.max_age = max_age
+        self.hits: Dict[str, int] = {}
+        # [kind, EIA offset or None, status, Retry-After or None, remaining]
+        self._faults: List[list] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+
+    def inject(self, kind: str, status: int, times: int = 1, retry_after: Optional[str] = None,
+               offset: Optional[int] = None):
+        """Answer the next ``times`` requests of a kind ('eia', 'points', 'forecast') with ``status``.
+
+        :param offset: Only fail EIA requests for this page offset.
+        """
+        with self._lock:
+            self._faults.append([kind, offset, status, retry_after, times])
+
+    def _fault(self, kind: str, offset: Optional[int] = None) -> Optional[Tuple[int, Dict]]:
+        with self._lock:
+            for fault in self._faults:
+                if fault[0] == kind and fault[1] in (None, offset) and fault[4] > 0:
+                    fault[4] -= 1
+                    return fault[2], ({"Retry-After": fault[3]} if fault[3] is not None else {})
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                query = json.loads(self.rfile.read(length) or b"{}")
+                server._count("eia")
+                offset, page_length = query.get("offset", 0), query.get("length", 5000)
+                fault = server._fault("eia", offset)
+                if fault:
+                    return self._send(fault[0], headers=fault[1])
+                body = json.dumps({"response": {
+                    "total": str(len(server.eia_rows)),
+                    "data": server.eia_rows[offset:offset + page_length],
+                }}).encode()
+                self._send(200, body, {"Content-Type": "application/json"})
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                kind = "points" if path.startswith("/points/") else "forecast"
+                fault = server._fault(kind)
+                if fault:
+                    server._count(kind)
+                    return self._send(fault[0], headers=fault[1])
+                if path.startswith("/points/"):
+                    server._count("points")
+                    self._send(200, json.dumps(fixtures.nws_point()).encode(),
+                               {"Content-Type": "application/geo+json"})
+                elif re.match(r"^/gridpoints/.+/forecast/hourly$", path):
+                    server._count("forecast")
+                    headers = {"ETag": server.etag, "Cache-Control": f"max-age={server.max_age}"}
+                    if self.headers.get("If-None-Match") == server.etag:
+                        self._send(304, headers=headers)
+                    else:
+                        self._send(200, server.forecast_body, dict(headers, **{"Content-Type": "application/geo+json"}))
+                else:
+                    self._send(404)
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,179 @@
+"""
+database.py
+This file defines the local SQL storage for the VARtigrate data pipeline.
+
+Demand, generation, weather forecast and prediction tables live in an embedded
+SQLite or DuckDB database, keyed and indexed by (region, timestamp). Collector
+DataFrames are bulk upserted (executemany on SQLite, an Arrow scan on DuckDB)
+and range queries come back as DataFrames; on DuckDB they are read through Arrow.
+
+Date created: 2026-10-18
+Last modified: 2026-10-18
+Author: Gordon Doore
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Table definitions: column -> SQL type, and the key used for upserts and range scans.
+# Column names match the frames returned by the collectors.
+TABLES: Dict[str, Dict] = {
+    "demand": {
+        "columns": {"region": "TEXT", "timestamp": "TIMESTAMP", "demand_mw": "DOUBLE",
+                    "data_source": "TEXT"},
+        "key": ["region", "timestamp"],
+    },
+    "generation": {
+        "columns": {"region": "TEXT", "fuel_type": "TEXT", "timestamp": "TIMESTAMP",
+                    "generation_mw": "DOUBLE", "data_source": "TEXT"},
+        "key": ["region", "fuel_type", "timestamp"],
+    },
+    "weather_forecast": {
+        "columns": {"latitude": "DOUBLE", "longitude": "DOUBLE", "timestamp": "TIMESTAMP",
+                    "temperature_c": "DOUBLE", "wind_speed_ms": "DOUBLE", "wind_direction": "TEXT",
+                    "forecast_text": "TEXT", "data_source": "TEXT"},
+        "key": ["latitude", "longitude", "timestamp"],
+    },
+    "predictions": {
+        "columns": {"region": "TEXT", "model": "TEXT", "timestamp": "TIMESTAMP",
+                    "prediction": "DOUBLE", "model_version": "TEXT"},
+        "key": ["region", "model", "timestamp"],
+    },
+}
+
+# SQLite keeps timestamps as sortable UTC text
+SQLITE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _utc_naive(values: pd.Series) -> pd.Series:
+    """Timestamps as naive UTC, the form every table stores."""
+    times = pd.to_datetime(values)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    return times
+
+
+class Database:
+    """Embedded storage for collected series and model predictions.
+
+    :param path: Database file, or ':memory:'.
+    :param backend: 'sqlite' (standard library) or 'duckdb' (columnar, Arrow reads).
+    """
+
+    def __init__(self, path: str = ":memory:", backend: str = "sqlite"):
+        if backend not in ("sqlite", "duckdb"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'sqlite' or 'duckdb'.")
+        self.path = path
+        self.backend = backend
+        if backend == "duckdb":
+            import duckdb
+
+            self.conn = duckdb.connect(path)
+        else:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+
+    def create_tables(self):
+        """Create every table in TABLES with its key and a timestamp index."""
+        for table, spec in TABLES.items():
+            columns = ", ".join(f"{name} {sql_type}" for name, sql_type in spec["columns"].items())
+            key = ", ".join(spec["key"])
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}, PRIMARY KEY ({key}))")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table} (timestamp)")
+        self.conn.commit()
+
+    def _prepare(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        spec = TABLES[table]
+        missing = [column for column in spec["key"] if column not in df]
+        if missing:
+            raise ValueError(f"Cannot store rows in {table} without key columns {missing}.")
+        columns = [column for column in spec["columns"] if column in df]
+        df = df[columns].copy()
+        df["timestamp"] = _utc_naive(df["timestamp"])
+        # Keep the last row per key so a batch never conflicts with itself
+        return df.drop_duplicates(subset=spec["key"], keep="last")
+
+    def upsert(self, table: str, df: pd.DataFrame) -> int:
+        """Insert rows, replacing existing rows with the same key.
+
+        :param table: One of TABLES.
+        :param df: Collector frame; columns not in the table are ignored.
+        :return: Number of rows written.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}', expected one of {sorted(TABLES)}.")
+        if df.empty:
+            return 0
+        df = self._prepare(table, df)
+        columns = list(df.columns)
+        column_list = ", ".join(columns)
+
+        if self.backend == "duckdb":
+            import pyarrow as pa
+
+            self.conn.register("incoming", pa.Table.from_pandas(df, preserve_index=False))
+            try:
+                self.conn.execute(f"INSERT OR REPLACE INTO {table} ({column_list}) "
+                                  f"SELECT {column_list} FROM incoming")
+            finally:
+                self.conn.unregister("incoming")
+            return len(df)
+
+        df["timestamp"] = df["timestamp"].dt.strftime(SQLITE_TIME_FORMAT)
+        key = TABLES[table]["key"]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key)
+        conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+        sql = (f"INSERT INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({', '.join(key)}) {conflict}")
+        # sqlite3 only binds plain Python values
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        with self.conn:
+            self.conn.executemany(sql, rows)
+        return len(df)
+
+    def query(self, table: str, start=None, end=None, regions: Optional[List[str]] = None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Rows of a table in a time range, ordered by key.
+
+        :param table: One of TABLES.
+        :param start: Earliest timestamp (inclusive, UTC if naive).
+        :param end: Latest timestamp (inclusive, UTC if naive).
+        :param regions: Only these regions, for tables with a region column.
+        :param columns: Columns to return, defaults to all.
+        :return: DataFrame with naive UTC timestamps.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}', expected one of {sorted(TABLES)}.")
+        spec = TABLES[table]
+        if regions is not None and "region" not in spec["columns"]:
+            raise ValueError(f"Table '{table}' has no region column to filter on.")
+        columns = columns or list(spec["columns"])
+        conditions, params = [], []
+        for bound, op in ((start, ">="), (end, "<=")):
+            if bound is not None:
+                bound = _utc_naive(pd.Series([bound])).iloc[0]
+                conditions.append(f"timestamp {op} ?")
+                params.append(bound.strftime(SQLITE_TIME_FORMAT) if self.backend == "sqlite" else bound.to_pydatetime())
+        if regions is not None:
+            conditions.append(f"region IN ({', '.join('?' * len(regions))})")
+            params.extend(regions)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {', '.join(spec['key'])}"
+
+        if self.backend == "duckdb":
+            result = self.conn.execute(sql, params)
+            arrow_table = result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+            return arrow_table.to_pandas()
+
+        cursor = self.conn.execute(sql, params)
+        df = pd.DataFrame(cursor.fetchall(), columns=columns)
+        if "timestamp" in df:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], format=SQLITE_TIME_FORMAT)
+        return df
+
+    def close(self):
+        self.conn.close()
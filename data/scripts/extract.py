@@ -3,59 +3,178 @@ extract.py
 This file defines api calls, largely to gridstatus API, but also open-meteo API, to extract data for the VARtigrate data pipeline.
 
 Date created: 2025-06-02
-Last modified: 2025-06-02
+Last modified: 2026-10-18
 Author: Gordon Doore
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from gridstatus import CAISO
+import numpy as np
 import pandas as pd
 import requests 
 
+from data_collectors.backfill import BackfillPlanner
+
+# CAISO publishes load every 5 minutes
+INTERVALS_PER_HOUR = 12
+HOUR_NS = 3_600_000_000_000
+
+
+class LiveLoadTracker:
+    """
+    Rolling in-memory view of recent 5-minute load with incrementally kept hourly means.
+
+    Observations live in a fixed-size ring buffer. Each poll asks gridstatus only
+    for intervals after the newest one already held; new readings are added to
+    per-hour running sums and readings that fall out of the buffer are subtracted,
+    so no poll resamples or refetches the window.
+    """
+
+    def __init__(self, caiso: CAISO, capacity_hours: int = 24, value_column: str = "Load"):
+        self.caiso = caiso
+        self.capacity_hours = capacity_hours
+        self.value_column = value_column
+        self.capacity = capacity_hours * INTERVALS_PER_HOUR
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros(self.capacity, dtype=float)
+        self.head = 0  # index of the oldest observation
+        self.size = 0
+        # hour (UTC ns) -> [sum, count]
+        self.hourly_sums: Dict[int, List[float]] = {}
+        self.last_time: Optional[pd.Timestamp] = None
+
+    def _accumulate(self, times: np.ndarray, values: np.ndarray, sign: int):
+        hours, inverse = np.unique(times - times % HOUR_NS, return_inverse=True)
+        sums = np.bincount(inverse, weights=values)
+        counts = np.bincount(inverse)
+        for hour, total, count in zip(hours.tolist(), sums, counts):
+            entry = self.hourly_sums.setdefault(hour, [0.0, 0])
+            entry[0] += sign * total
+            entry[1] += sign * int(count)
+            if entry[1] <= 0:
+                del self.hourly_sums[hour]
+
+    def push(self, times: np.ndarray, values: np.ndarray):
+        """
+        Add observations (UTC ns timestamps, oldest first), evicting the oldest when full.
+        
+        :param times: int64 nanosecond UTC timestamps.
+        :param values: Load readings.
+        """
+        times, values = times[-self.capacity:], values[-self.capacity:]
+        n = len(times)
+        if n == 0:
+            return
+        evict = max(0, self.size + n - self.capacity)
+        if evict:
+            old = (self.head + np.arange(evict)) % self.capacity
+            self._accumulate(self.times[old], self.values[old], -1)
+            self.head = (self.head + evict) % self.capacity
+            self.size -= evict
+        slots = (self.head + self.size + np.arange(n)) % self.capacity
+        self.times[slots] = times
+        self.values[slots] = values
+        self.size += n
+        self._accumulate(times, values, 1)
+
+    def poll(self) -> int:
+        """
+        Fetch intervals newer than the last one seen and fold them in.
+        
+        :return: Number of new observations.
+        """
+        end = pd.Timestamp.now(tz="UTC")
+        start = self.last_time if self.last_time is not None else end - pd.Timedelta(hours=self.capacity_hours)
+        load = self.caiso.get_load(start, end=end)
+        times = pd.to_datetime(load['Time'], utc=True)
+        new = (times > self.last_time) if self.last_time is not None else np.ones(len(load), dtype=bool)
+        new = np.asarray(new) & load[self.value_column].notna().to_numpy()
+        if not new.any():
+            return 0
+        order = np.argsort(times[new].to_numpy(dtype='datetime64[ns]'), kind='stable')
+        new_times = times[new].to_numpy(dtype='datetime64[ns]').astype(np.int64)[order]
+        self.push(new_times, load.loc[new, self.value_column].to_numpy(dtype=float)[order])
+        self.last_time = pd.Timestamp(new_times[-1], tz="UTC")
+        return int(new.sum())
+
+    def hourly(self, prev_hours: int = 1) -> pd.DataFrame:
+        """
+        Hourly mean load for the most recent hours held in the buffer.
+        
+        :param prev_hours: Number of hours to return.
+        :return: DataFrame indexed by UTC hour, like resample('h').mean().
+        """
+        hours = sorted(self.hourly_sums)[-prev_hours:]
+        means = [self.hourly_sums[hour][0] / self.hourly_sums[hour][1] for hour in hours]
+        index = pd.DatetimeIndex(pd.to_datetime(hours, utc=True), name="Time")
+        return pd.DataFrame({self.value_column: means}, index=index)
+
+
 class GridStatusExtractor:
     """
     Class to extract data from the gridstatus API.
     """
     
-    def __init__(self, region: str):
-        self.caiso = CAISO(region=region)
+    def __init__(self, region: str = "CAISO"):
+        # gridstatus.CAISO covers a single ISO and takes no region argument
+        self.region = region
+        self.caiso = CAISO()
+        self.live: Optional[LiveLoadTracker] = None
 
-    def get_historical_load_hourly(self, start_date: str, end_date: str) -> pd.DataFrame:
+    def get_historical_load_hourly(self, start_date: str, end_date: str,
+                                   freq: str = "month", max_workers: int = 4,
+                                   checkpoint_dir: Optional[str] = None) -> pd.DataFrame:
         """
         Get historical load data from the gridstatus API.
+
+        The range is split into month (or week) windows that are fetched and
+        resampled in parallel, so only a few windows of 5-minute data are in
+        memory at once. With a checkpoint directory, finished windows are kept
+        on disk and a rerun only fetches the ones that are missing.
         
         :param start_date: Start date in 'YYYY-MM-DD' format.
-        :param end_date: End date in 'YYYY-MM-DD' format.
+        :param end_date: End date in 'YYYY-MM-DD' format (exclusive).
+        :param freq: Window size, 'month', 'week' or a pandas offset alias.
+        :param max_workers: Number of windows fetched concurrently.
+        :param checkpoint_dir: Directory for finished windows, enables resume.
         :return: DataFrame containing historical load data.
         """
-        start = pd.Timestamp("January 1, 2019").normalize()
-        end = pd.Timestamp.now().normalize()
-        historical_load = self.caiso.get_load(start, end= end)
-        # Convert 'Time' to datetime (removes timezone if present)
-        historical_load['Time'] = pd.to_datetime(historical_load['Time'], utc = True)
+        planner = BackfillPlanner(self._load_hourly_window, freq=freq,
+                                  max_workers=max_workers, checkpoint_dir=checkpoint_dir)
+        return planner.run(start_date, end_date)
 
+    def _load_hourly_window(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Fetch one window of 5-minute load and resample it to hourly means.
+
+        :param start: Window start.
+        :param end: Window end (exclusive).
+        :return: Hourly load for the window, indexed by UTC time.
+        """
+        load = self.caiso.get_load(start, end=end)
+        if load.empty:
+            # Nothing published for the window; gridstatus may not even type the columns
+            return pd.DataFrame(index=pd.DatetimeIndex([], tz="UTC", name="Time"))
+        # Drop readings stamped at the window end, they belong to the next window
+        end_time = end.tz_localize(load['Time'].dt.tz) if end.tzinfo is None else end
+        load = load[load['Time'] < end_time].copy()
+        # Convert 'Time' to datetime (removes timezone if present)
+        load['Time'] = pd.to_datetime(load['Time'], utc=True)
         # Now set index and resample (aggregate only numeric columns)
-        historical_hourly_load = historical_load.set_index("Time").resample("h").mean(numeric_only=True)
-        return historical_hourly_load
+        return load.set_index("Time").resample("h").mean(numeric_only=True)
     
     def current_load(self, prev_hours: int = 1):
         """
         Get current load data from the gridstatus API.
+
+        Polls go through a LiveLoadTracker kept on the extractor, so each call
+        only fetches the 5-minute intervals published since the previous one.
         
         :param prev_hours: Number of previous hours to include in the data.
         :return: DataFrame containing current load data.
         """
-        #get previous 24 hours of data:
-        start = pd.Timestamp.now() - pd.Timedelta(hours=prev_hours)
-        end = pd.Timestamp.now()
-        current_load = self.caiso.get_load(start, end=end)
-        # Convert 'Time' to datetime (removes timezone if present)
-        current_load['Time'] = pd.to_datetime(current_load['Time'], utc=True)
-        # Set index and resample (aggregate only numeric columns)
-        current_load = current_load.set_index("Time").resample("h").mean(numeric_only=True)
-        # If prev_hours is specified, filter the DataFrame to include only the last 'prev_hours' hours
-        if len(current_load) >= prev_hours:
-            current_load = current_load.tail(prev_hours)
-        
-
-        return current_load
\ No newline at end of file
+        # A longer window than the tracker holds needs a fresh, larger buffer
+        if self.live is None or self.live.capacity_hours < prev_hours + 1:
+            self.live = LiveLoadTracker(self.caiso, capacity_hours=max(prev_hours + 1, 24))
+        self.live.poll()
+        return self.live.hourly(prev_hours)
@@ -2,20 +2,280 @@
 pipeline.py
 This file defines full data pipeline VARtigrate data pipeline, mainly using gridstatus API
 
-Integrates functionality of extracting, transforming, and loading data into a SQL database.
+Builds the model feature matrix from the raw hourly data in a single streaming pass:
+rows are read in chunks, calendar, holiday and lag features are added incrementally,
+normalization statistics are accumulated online and typed Parquet is written per chunk.
+New hours are appended with FeaturePipeline.update() without touching the history.
 
 Date created: 2025-06-02
-Last modified: 2025-06-02
+Last modified: 2026-10-18
 Author: Gordon Doore
 """
-from typing import List, Dict, Any
-from gridstatus import CAISO
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
 import pandas as pd
-import numpy as np 
-from fastapi import FastAPI
-from database import engine, Base
-from routers import users
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+# Columns the notebooks leave out of normalization, plus the derived hour of day
+EXCLUDE_FROM_NORMALIZATION = ['Month', 'time', 'Holiday', 'Day of Week', 'hour']
+CATEGORICAL_COLUMNS = ['Day of Week', 'Month', 'Holiday']
+# Lags used by the saved demand model (Load_Lag_1 ... Load_Lag_24)
+DEFAULT_LAGS = [1, 2, 3, 4, 5, 6, 12, 24]
+
+
+class RunningStats:
+    """Per-column mean and variance accumulated one chunk at a time.
+
+    Chunks are merged with Chan's parallel update, so the result equals the
+    mean and sample standard deviation (ddof=1) of all rows seen, which is
+    what the notebooks' normalize() used, without holding the rows in memory.
+    """
+
+    def __init__(self):
+        self.count: Dict[str, int] = {}
+        self.mean: Dict[str, float] = {}
+        self.m2: Dict[str, float] = {}
+
+    def update(self, df: pd.DataFrame):
+        """Fold a chunk of numeric columns into the statistics."""
+        for column in df.columns:
+            values = df[column].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            n = len(values)
+            if n == 0:
+                continue
+            chunk_mean = values.mean()
+            chunk_m2 = ((values - chunk_mean) ** 2).sum()
+            count = self.count.get(column, 0)
+            if count == 0:
+                self.count[column], self.mean[column], self.m2[column] = n, chunk_mean, chunk_m2
+                continue
+            total = count + n
+            delta = chunk_mean - self.mean[column]
+            self.mean[column] += delta * n / total
+            self.m2[column] += chunk_m2 + delta ** 2 * count * n / total
+            self.count[column] = total
+
+    def std(self, column: str) -> float:
+        count = self.count.get(column, 0)
+        return float(np.sqrt(self.m2[column] / (count - 1))) if count > 1 else float('nan')
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Z-score every column that has statistics, leaving the others untouched."""
+        df = df.copy()
+        for column in df.columns:
+            if column in self.mean:
+                std = self.std(column)
+                df[column] = (df[column] - self.mean[column]) / (std if std > 0 else 1.0)
+        return df
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "RunningStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = dict(state['count']), dict(state['mean']), dict(state['m2'])
+        return stats
+
+
+def add_calendar_features(df: pd.DataFrame, time_column: str = 'time') -> pd.DataFrame:
+    """Add hour, Day of Week, Month and Holiday columns that are not already present."""
+    times = pd.to_datetime(df[time_column])
+    if 'hour' not in df:
+        df['hour'] = times.dt.hour.astype('int8')
+    if 'Day of Week' not in df:
+        df['Day of Week'] = times.dt.dayofweek.astype('int8')
+    if 'Month' not in df:
+        df['Month'] = times.dt.month.astype('int8')
+    if 'Holiday' not in df and len(df):
+        days = times.dt.normalize()
+        if days.dt.tz is not None:
+            days = days.dt.tz_localize(None)
+        holidays = USFederalHolidayCalendar().holidays(days.min(), days.max())
+        df['Holiday'] = days.isin(holidays).astype('int8')
+    return df
+
+
+class FeaturePipeline:
+    """Streams raw hourly rows into a typed Parquet feature store.
+
+    State kept between calls (in ``<out_dir>/_state.json``) is small and
+    bounded: the running normalization statistics and the last ``max(lags)``
+    values of each lagged column. Adding an hour therefore costs the same no
+    matter how much history has been processed.
+
+    Features are stored unnormalized as float32 (int8 for calendar columns);
+    normalized() applies the current statistics when reading them back.
+    """
+
+    def __init__(self, out_dir: str, time_column: str = 'time',
+                 lag_columns: Optional[Dict[str, List[int]]] = None,
+                 lag_name: str = "{column}_Lag_{lag}"):
+        self.out_dir = out_dir
+        self.time_column = time_column
+        self.lag_columns = lag_columns if lag_columns is not None else {'Load': DEFAULT_LAGS}
+        self.lag_name = lag_name
+        self.stats = RunningStats()
+        # Most recent values of each lagged column, oldest first
+        self.history: Dict[str, List[float]] = {column: [] for column in self.lag_columns}
+        self.last_time: Optional[pd.Timestamp] = None
+        self._parts = 0
+        os.makedirs(out_dir, exist_ok=True)
+        self._load_state()
+
+    @property
+    def _state_path(self) -> str:
+        return os.path.join(self.out_dir, '_state.json')
+
+    def _load_state(self):
+        if not os.path.exists(self._state_path):
+            return
+        with open(self._state_path) as f:
+            state = json.load(f)
+        self.stats = RunningStats.from_dict(state['stats'])
+        self.history = {column: list(values) for column, values in state['history'].items()}
+        self.last_time = pd.Timestamp(state['last_time']) if state['last_time'] else None
+        self._parts = state['parts']
+
+    def _save_state(self):
+        state = {
+            'stats': self.stats.to_dict(),
+            'history': self.history,
+            'last_time': self.last_time.isoformat() if self.last_time is not None else None,
+            'parts': self._parts,
+        }
+        with open(f"{self._state_path}.tmp", 'w') as f:
+            json.dump(state, f)
+        os.replace(f"{self._state_path}.tmp", self._state_path)
+
+    def _add_lags(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add lag columns, using the carried history for the first rows of the chunk."""
+        for column, lags in self.lag_columns.items():
+            if column not in df:
+                continue
+            carry = self.history[column]
+            values = np.concatenate([np.asarray(carry, dtype=float), df[column].to_numpy(dtype=float)])
+            offset = len(carry)
+            for lag in lags:
+                shifted = np.full(len(df), np.nan)
+                start = max(0, lag - offset)
+                if start < len(df):
+                    shifted[start:] = values[offset + start - lag:len(values) - lag]
+                df[self.lag_name.format(column=column, lag=lag)] = shifted
+            self.history[column] = values[-max(lags):].tolist()
+        return df
+
+    def _typed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast to the stored types: float32 values and int8 calendar codes."""
+        df = df.copy()
+        for column in df.columns:
+            if column == self.time_column:
+                df[column] = pd.to_datetime(df[column])
+            elif not pd.api.types.is_numeric_dtype(df[column]):
+                continue
+            elif column in CATEGORICAL_COLUMNS or column == 'hour':
+                df[column] = df[column].astype('int8')
+            else:
+                df[column] = df[column].astype('float32')
+        return df
+
+    def _hourly(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Reindex a chunk to every hour from the last processed one, so lags are by the clock."""
+        times = pd.to_datetime(chunk[self.time_column])
+        start = self.last_time + pd.Timedelta(hours=1) if self.last_time is not None else times.min()
+        hours = pd.date_range(start, times.max(), freq='h', name=self.time_column)
+        chunk = chunk.assign(**{self.time_column: times}).drop_duplicates(self.time_column, keep='last')
+        return chunk.set_index(self.time_column).reindex(hours).reset_index()
+
+    def _process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.dropna(subset=[self.time_column])
+        if chunk.empty:
+            return chunk
+        chunk = chunk.sort_values(self.time_column, kind='stable')
+        if self.last_time is not None:
+            # Rows already processed are skipped, which makes update() idempotent
+            chunk = chunk[pd.to_datetime(chunk[self.time_column]) > self.last_time]
+            if chunk.empty:
+                return chunk
+        # Lags are computed over every hour, then incomplete and missing hours are dropped
+        chunk = self._hourly(chunk)
+        complete = chunk.notna().all(axis=1).to_numpy()
+        chunk = add_calendar_features(chunk, self.time_column)
+        chunk = self._add_lags(chunk)
+        # The carried history now ends at the last hour, whether or not it is complete
+        self.last_time = chunk[self.time_column].max()
+        chunk = chunk[complete].reset_index(drop=True)
+        if chunk.empty:
+            return chunk
+
+        numeric = [column for column in chunk.select_dtypes(include=[np.number]).columns
+                   if column not in EXCLUDE_FROM_NORMALIZATION]
+        self.stats.update(chunk[numeric])
+
+        chunk = self._typed(chunk)
+        path = os.path.join(self.out_dir, f"part-{self._parts:05d}.parquet")
+        pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), path)
+        self._parts += 1
+        return chunk
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> int:
+        """Process an iterable of raw chunks. Returns the number of rows written."""
+        written = 0
+        for chunk in chunks:
+            written += len(self._process(chunk))
+        self._save_state()
+        return written
+
+    def run_csv(self, csv_path: str, chunksize: int = 50_000) -> int:
+        """Stream a raw hourly CSV such as caiso_merged_hourly_2019_2025_with_weather_and_solar.csv."""
+        return self.run(pd.read_csv(csv_path, chunksize=chunksize))
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """Append newly collected hours; only rows after the last processed hour are used."""
+        chunk = self._process(new_rows)
+        self._save_state()
+        return chunk
+
+    def read(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """All stored features, with calendar columns as categoricals like the notebooks."""
+        parts = sorted(name for name in os.listdir(self.out_dir) if name.startswith('part-'))
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        tables = [pq.read_table(os.path.join(self.out_dir, name), columns=columns, memory_map=True)
+                  for name in parts]
+        df = pa.concat_tables(tables, promote_options='default').to_pandas()
+        for column in CATEGORICAL_COLUMNS:
+            if column in df:
+                df[column] = df[column].astype('category')
+        return df
+
+    def normalized(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Stored features z-scored with the running statistics."""
+        return self.stats.normalize(self.read(columns))
 
-#code to insert into SQL database
+    def compact(self):
+        """Merge the part files, e.g. after many hourly update() calls."""
+        df = self.read()
+        for name in os.listdir(self.out_dir):
+            if name.startswith('part-'):
+                os.remove(os.path.join(self.out_dir, name))
+        self._parts = 0
+        if not df.empty:
+            df = self._typed(df.astype({column: df[column].cat.categories.dtype
+                                        for column in CATEGORICAL_COLUMNS if column in df}))
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                           os.path.join(self.out_dir, 'part-00000.parquet'))
+            self._parts = 1
+        self._save_state()
 
 
+if __name__ == "__main__":
+    pipeline = FeaturePipeline("data/processed/features")
+    rows = pipeline.run_csv("data/raw/caiso_merged_hourly_2019_2025_with_weather_and_solar.csv")
+    print(f"Wrote {rows} rows of features to {pipeline.out_dir}")
@@ -0,0 +1,43 @@
+#data collectors
+#collectors are looked up by name and imported on first use, so importing the package stays cheap
+
+import importlib
+from typing import Dict
+
+# Collector name -> "module:Class"
+COLLECTORS: Dict[str, str] = {
+    "eia": "data_collectors.eia_collector:EIADataCollector",
+    "noaa": "data_collectors.weather_collectors:NOAACollector",
+}
+
+# Class names importable from the package, resolved through the registry
+_EXPORTS = {"EIADataCollector": "eia", "NOAACollector": "noaa"}
+
+
+def register_collector(name: str, path: str):
+    """Add a collector, given as 'module:Class'; the module is not imported until it is used."""
+    if ":" not in path:
+        raise ValueError(f"Expected 'module:Class', got '{path}'.")
+    COLLECTORS[name] = path
+
+
+def collector_class(name: str) -> type:
+    """Import and return a registered collector class."""
+    if name not in COLLECTORS:
+        raise ValueError(f"Unknown collector '{name}', expected one of {sorted(COLLECTORS)}.")
+    module, cls = COLLECTORS[name].split(":")
+    return getattr(importlib.import_module(module), cls)
+
+
+def get_collector(name: str, **kwargs):
+    """Create a registered collector, e.g. get_collector('eia', requests_per_second=5)."""
+    return collector_class(name)(**kwargs)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return collector_class(_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["COLLECTORS", "register_collector", "collector_class", "get_collector", *_EXPORTS]
@@ -0,0 +1,127 @@
+#backfill planner
+#splits long history requests into time windows that are fetched in parallel and can be resumed
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Window sizes accepted by plan_windows, mapped to pandas offset aliases
+WINDOW_FREQUENCIES = {
+    "month": "MS",
+    "week": "W-MON",
+    "day": "D",
+}
+
+Window = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+class BackfillError(RuntimeError):
+    """Raised when one or more backfill windows could not be fetched."""
+
+    def __init__(self, failed: Dict[Window, Exception]):
+        self.failed = failed
+        windows = ", ".join(f"{start} -> {end}" for start, end in sorted(failed))
+        super().__init__(f"{len(failed)} backfill window(s) failed: {windows}")
+
+
+def plan_windows(start, end, freq: str = "month") -> List[Window]:
+    """Split the half-open range [start, end) into calendar-aligned windows.
+
+    :param start: Start of the range, anything pd.Timestamp accepts.
+    :param end: End of the range (exclusive).
+    :param freq: 'month', 'week', 'day' or any pandas offset alias.
+    :return: List of (window_start, window_end) pairs covering the range.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if end <= start:
+        return []
+    edges = pd.date_range(start, end, freq=WINDOW_FREQUENCIES.get(freq, freq))
+    bounds = [start] + [edge for edge in edges if start < edge < end] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class BackfillPlanner:
+    """Runs a windowed fetch function over a long date range.
+
+    Each window is fetched independently on a bounded thread pool. When a
+    checkpoint directory is given, every finished window is written there as
+    soon as it completes, so a rerun only fetches the windows that are missing
+    and a failure in one window never discards the others.
+    """
+
+    def __init__(self, fetch: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame],
+                 freq: str = "month", max_workers: int = 4,
+                 checkpoint_dir: Optional[str] = None):
+        self.fetch = fetch
+        self.freq = freq
+        self.max_workers = max_workers
+        self.checkpoint_dir = checkpoint_dir
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _checkpoint_path(self, window: Window) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        start, end = window
+        name = f"{start.strftime('%Y%m%dT%H%M')}_{end.strftime('%Y%m%dT%H%M')}.pkl"
+        return os.path.join(self.checkpoint_dir, name)
+
+    def pending(self, start, end) -> List[Window]:
+        """Windows in the range that have not been checkpointed yet."""
+        return [window for window in plan_windows(start, end, self.freq)
+                if not self._is_done(window)]
+
+    def _is_done(self, window: Window) -> bool:
+        path = self._checkpoint_path(window)
+        return path is not None and os.path.exists(path)
+
+    def _run_window(self, window: Window) -> Optional[pd.DataFrame]:
+        frame = self.fetch(*window)
+        path = self._checkpoint_path(window)
+        if path is None:
+            return frame
+        # Write then rename so an interrupted job never leaves a half-written window behind
+        tmp_path = f"{path}.tmp"
+        frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        return None
+
+    def run(self, start, end) -> pd.DataFrame:
+        """Fetch every window in [start, end) and return the combined frame."""
+        windows = plan_windows(start, end, self.freq)
+        todo = [window for window in windows if not self._is_done(window)]
+        logger.info(f"Backfill {start} -> {end}: {len(windows)} windows, {len(todo)} to fetch")
+
+        results: Dict[Window, pd.DataFrame] = {}
+        failed: Dict[Window, Exception] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._run_window, window): window for window in todo}
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    frame = future.result()
+                except Exception as e:
+                    logger.error(f"Backfill window {window[0]} -> {window[1]} failed: {e}")
+                    failed[window] = e
+                    continue
+                if frame is not None:
+                    results[window] = frame
+
+        if failed:
+            raise BackfillError(failed)
+
+        frames = []
+        for window in windows:
+            if window in results:
+                frames.append(results.pop(window))
+            else:
+                frames.append(pd.read_pickle(self._checkpoint_path(window)))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames)
@@ -0,0 +1,163 @@
+#series cache
+#local partitioned parquet store for collected series, with a watermark per series for incremental refresh
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "_meta.json"
+
+
+def series_key(*parts) -> str:
+    """Build a cache key such as 'eia/fuel-type-data/CISO/SUN/hourly' from its parts."""
+    return "/".join(re.sub(r"[^A-Za-z0-9_.-]+", "-", str(part)) for part in parts if part is not None)
+
+
+def _align(timestamp, tz: Optional[str]) -> pd.Timestamp:
+    """A timestamp in the same timezone as a series: naive bounds are taken to be in it."""
+    timestamp = pd.Timestamp(timestamp)
+    if tz is None:
+        return timestamp.tz_convert("UTC").tz_localize(None) if timestamp.tzinfo is not None else timestamp
+    return timestamp.tz_localize(tz) if timestamp.tzinfo is None else timestamp.tz_convert(tz)
+
+
+class SeriesCache:
+    """Partitioned Parquet store for hourly series.
+
+    Each series lives in its own directory, split into one Parquet file per
+    calendar year (``year=2024/part.parquet``) so that appending a few new hours
+    only rewrites the current year. A small metadata file records the series
+    watermark, the latest timestamp stored, which drives incremental refreshes.
+    Reads are memory-mapped and only touch the requested columns and years.
+    """
+
+    def __init__(self, root: str, time_column: str = "timestamp"):
+        self.root = root
+        self.time_column = time_column
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _series_dir(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def _partition_path(self, key: str, year: int) -> str:
+        return os.path.join(self._series_dir(key), f"year={year}", "part.parquet")
+
+    def _read_meta(self, key: str) -> Dict:
+        path = os.path.join(self._series_dir(key), META_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, key: str, meta: Dict):
+        path = os.path.join(self._series_dir(key), META_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _years(self, key: str) -> List[int]:
+        series_dir = self._series_dir(key)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(int(name.split("=", 1)[1]) for name in os.listdir(series_dir)
+                      if name.startswith("year="))
+
+    def _time_tz(self, key: str) -> Optional[str]:
+        """Timezone of a series' time column as stored, None when naive or not cached."""
+        years = self._years(key)
+        if not years:
+            return None
+        field = pq.read_schema(self._partition_path(key, years[-1])).field(self.time_column)
+        return field.type.tz if pa.types.is_timestamp(field.type) else None
+
+    def watermark(self, key: str) -> Optional[pd.Timestamp]:
+        """Latest timestamp stored for a series, or None if it is not cached."""
+        value = self._read_meta(key).get("watermark")
+        return pd.Timestamp(value) if value else None
+
+    def write(self, key: str, df: pd.DataFrame, keys: Optional[List[str]] = None):
+        """Merge rows into a series, replacing cached rows that share the same keys.
+
+        :param key: Series key, see series_key().
+        :param df: Rows to merge; must contain the time column.
+        :param keys: Columns identifying a row, defaults to the time column.
+        """
+        if df.empty:
+            return
+        keys = keys or [self.time_column]
+        times = pd.to_datetime(df[self.time_column])
+        with self._lock:
+            for year, part in df.groupby(times.dt.year):
+                path = self._partition_path(key, int(year))
+                if os.path.exists(path):
+                    part = pd.concat([pq.read_table(path).to_pandas(), part], ignore_index=True)
+                part = part.drop_duplicates(subset=keys, keep="last").sort_values(keys, kind="stable")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                pq.write_table(pa.Table.from_pandas(part, preserve_index=False), f"{path}.tmp")
+                os.replace(f"{path}.tmp", path)
+
+            meta = self._read_meta(key)
+            latest = times.max()
+            if meta.get("watermark"):
+                latest = max(latest, pd.Timestamp(meta["watermark"]))
+            meta.update(watermark=latest.isoformat(), keys=keys)
+            self._write_meta(key, meta)
+
+    def read(self, key: str, columns: Optional[List[str]] = None,
+             start=None, end=None) -> pd.DataFrame:
+        """Read a cached series, optionally limited to some columns and a time range.
+
+        :param key: Series key, see series_key().
+        :param columns: Columns to load; the rest are never read from disk.
+        :param start: Earliest timestamp to return (inclusive).
+        :param end: Latest timestamp to return (inclusive).
+        :return: Cached rows, empty if the series is not cached.
+        """
+        # Filters must match the stored column, e.g. UTC forecasts against naive bounds
+        tz = self._time_tz(key) if start is not None or end is not None else None
+        start = _align(start, tz) if start is not None else None
+        end = _align(end, tz) if end is not None else None
+        filters = []
+        if start is not None:
+            filters.append((self.time_column, ">=", start))
+        if end is not None:
+            filters.append((self.time_column, "<=", end))
+
+        tables = []
+        for year in self._years(key):
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            tables.append(pq.read_table(self._partition_path(key, year), columns=columns,
+                                        filters=filters or None, memory_map=True))
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        return pa.concat_tables(tables).to_pandas()
+
+    def refresh(self, key: str, fetch: Callable[[Optional[pd.Timestamp]], pd.DataFrame],
+                keys: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+                start=None, end=None) -> pd.DataFrame:
+        """Fetch rows newer than the watermark, merge them in and return the cached series.
+
+        :param fetch: Called with the current watermark (None when the series is
+            not cached yet); returns the rows collected after it.
+        :return: The refreshed series, read back through read().
+        """
+        since = self.watermark(key)
+        new_rows = fetch(since)
+        if since is not None and not new_rows.empty:
+            # Only keep hours strictly after the watermark
+            times = pd.to_datetime(new_rows[self.time_column])
+            new_rows = new_rows[times > _align(since, None if times.dt.tz is None else str(times.dt.tz))]
+        logger.info(f"Cache refresh {key}: {len(new_rows)} new rows after {since}")
+        self.write(key, new_rows, keys=keys)
+        return self.read(key, columns=columns, start=start, end=end)
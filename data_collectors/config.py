@@ -0,0 +1,41 @@
+#config
+#settings read from the environment on first use; .env is loaded then, never at import
+
+import os
+import threading
+from typing import Optional
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def _load_env():
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded:
+            return
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            # python-dotenv is optional; plain environment variables still work
+            pass
+        else:
+            load_dotenv()
+        _env_loaded = True
+
+
+def get_setting(name: str, default: Optional[str] = None, required: bool = False) -> Optional[str]:
+    """Value of a setting such as EIA_API_KEY or EMAIL.
+
+    The environment wins over .env, which is read the first time any setting
+    is asked for.
+
+    :param name: Environment variable name.
+    :param default: Returned when the variable is unset.
+    :param required: Raise ValueError instead of returning an empty value.
+    """
+    _load_env()
+    value = os.getenv(name, default)
+    if required and not value:
+        raise ValueError(f"{name} is not set in the environment variables.")
+    return value
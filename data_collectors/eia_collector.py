@@ -1,58 +1,175 @@
 #eia collector
 #class to collect data from the EIA API
 
+# Annotations stay strings, so pandas is only imported once a frame is built
+from __future__ import annotations
+
+import asyncio
 import requests
-import pandas as pd
-import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
 import logging
-from dotenv import load_dotenv
-import os
-import json
 
-load_dotenv()
+from data_collectors.config import get_setting
+from data_collectors.engine import CollectorEngine, get_engine
+from data_collectors.resilience import PageCheckpoint
 
-eia_api_key = os.getenv("EIA_API_KEY")
-if not eia_api_key:
-    raise ValueError("EIA_API_KEY is not set in the environment variables.")
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Largest page the EIA v2 API will return for a single request
+PAGE_LENGTH = 5000
+
 class EIADataCollector:
     """Class to collect data from the EIA API."""
 
-    def __init__(self, api_key:str):
-        self.api_key = api_key
+    def __init__(self, api_key: Optional[str] = None, max_workers: int = 4,
+                 requests_per_second: float = 10.0, cache=None,
+                 engine: Optional[CollectorEngine] = None,
+                 checkpoint_dir: Optional[str] = None):
+        # Without an explicit key, EIA_API_KEY is read from the environment or .env
+        self.api_key = api_key or get_setting("EIA_API_KEY", required=True)
         self.base_url = "https://api.eia.gov/v2"
-        self.session = requests.Session()
+        # Requests go through the shared engine, which keeps one pooled session per host
+        self.engine = engine or get_engine()
+        self.session = self.engine.register(self.base_url, requests_per_second=requests_per_second,
+                                            burst=max_workers)
         self.session.headers.update({
             "Content-Type": "application/json"
         })
+        self.max_workers = max_workers
+        # Optional data_collectors.cache.SeriesCache used by cached()
+        self.cache = cache
+        # Pages of unfinished paginated queries, so a failed pagination resumes where it stopped
+        self.pages = PageCheckpoint(checkpoint_dir) if checkpoint_dir else None
 
 
-    def _make_request(self, endpoint: str, body: Optional[Dict] = None) -> Dict:
+    async def _make_request_async(self, endpoint: str, body: Optional[Dict] = None) -> Dict:
         """Make a POST request to the EIA API."""
         if body is None:
             body = {}
 
         url = f"{self.base_url}/{endpoint}?api_key={self.api_key}"
 
+        event = self.engine.start_event("eia", endpoint, "POST")
         try:
-            response = self.session.post(url, json=body)
+            response = await self.engine.request("POST", url, event=event, json=body)
             response.raise_for_status()
-            print(json.dumps(response.json(), indent=2))  # For debugging
-            time.sleep(0.1)
-            return response.json()
+            data = response.json()
+            if event is not None:
+                event["rows"] = len(data.get('response', {}).get('data', []))
+            return data
         except requests.exceptions.RequestException as e:
             logger.error(f"EIA API request failed: {e}")
+            if event is not None:
+                event["error"] = event["error"] or str(e)
             raise
+        finally:
+            self.engine.finish_event(event)
+
+    def _make_request(self, endpoint: str, body: Optional[Dict] = None) -> Dict:
+        """Make a POST request to the EIA API."""
+        return self.engine.run(self._make_request_async(endpoint, body))
+
+    async def _fetch_rows_async(self, endpoint: str, body: Dict, paginate: bool = True,
+                                page_length: int = PAGE_LENGTH) -> List[Dict]:
+        """Fetch the data rows for a query, pulling every offset page when paginating.
+
+        The first page is requested on its own to learn the total row count; the
+        remaining offsets are then fetched concurrently, at most max_workers at a
+        time, paced by the engine's rate limiter for the EIA host.
+
+        With a checkpoint directory, every page is stored as it arrives. If any
+        page fails, the others are kept and the error is raised once all have
+        finished; calling again with the same query only requests the missing
+        pages. The stored pages are removed when the query completes.
+        """
+        key = self.pages.key(endpoint, dict(body, length=page_length)) if self.pages and paginate else None
+        if key is not None:
+            resumed = await asyncio.to_thread(self.pages.offsets, key)
+            if resumed:
+                logger.info(f"Resuming {endpoint} with {len(resumed)} checkpointed pages")
+
+        first = await self._fetch_page_async(endpoint, body, 0, page_length, key)
+        response = first.get('response', {})
+        rows = list(response.get('data', []))
+        if not paginate:
+            return rows
+
+        # EIA reports the total as a string
+        total = int(response.get('total') or len(rows))
+        offsets = range(page_length, total, page_length)
+
+        workers = asyncio.Semaphore(self.max_workers)
+
+        async def fetch_page(offset: int) -> List[Dict]:
+            async with workers:
+                page = await self._fetch_page_async(endpoint, body, offset, page_length, key)
+            return page.get('response', {}).get('data', [])
+
+        pages = await asyncio.gather(*(fetch_page(offset) for offset in offsets), return_exceptions=True)
+        failed = [page for page in pages if isinstance(page, BaseException)]
+        if failed:
+            logger.error(f"{len(failed)} of {len(offsets) + 1} pages of {endpoint} failed")
+            raise failed[0]
+        for page_rows in pages:
+            rows.extend(page_rows)
+
+        if key is not None:
+            await asyncio.to_thread(self.pages.discard, key)
+        if offsets:
+            logger.info(f"Fetched {len(rows)} of {total} rows from {endpoint} in {len(offsets) + 1} pages")
+        return rows
+
+    async def _fetch_page_async(self, endpoint: str, body: Dict, offset: int, page_length: int,
+                                key: Optional[str]) -> Dict:
+        """One page of a query, from the checkpoint when it was already fetched."""
+        if key is not None:
+            page = await asyncio.to_thread(self.pages.load, key, offset)
+            if page is not None:
+                return page
+        page = await self._make_request_async(endpoint, dict(body, offset=offset, length=page_length))
+        if key is not None:
+            await asyncio.to_thread(self.pages.save, key, offset, page)
+        return page
+
+    def _fetch_rows(self, endpoint: str, body: Dict, paginate: bool = True,
+                    page_length: int = PAGE_LENGTH) -> List[Dict]:
+        """Synchronous version of _fetch_rows_async."""
+        return self.engine.run(self._fetch_rows_async(endpoint, body, paginate, page_length))
+
+    @staticmethod
+    def _finalize(df: pd.DataFrame, sort_by: List[str], ascending: bool = True) -> pd.DataFrame:
+        """Drop rows repeated across pages and sort by time."""
+        if df.empty:
+            return df
+        df = df.drop_duplicates()
+        return df.sort_values(sort_by, ascending=ascending, kind='stable').reset_index(drop=True)
+
+    def gather(self, calls: List[Tuple[str, Dict]]) -> List[pd.DataFrame]:
+        """Run many getter calls at once and return their frames in order.
+
+        :param calls: (getter name, keyword arguments) pairs, e.g.
+            [('get_renewable_generation', {'region': 'CISO', 'fuel_type': 'WND'}), ...]
+        :return: One DataFrame per call.
+        """
+        return self.engine.gather([getattr(self, f"{name}_async")(**kwargs) for name, kwargs in calls])
 
 
 
     def get_electricity_demand(self, region: str = "US48", 
                                 start_date: str = None, 
-                                end_date: str = None) -> pd.DataFrame:
+                                end_date: str = None,
+                                paginate: bool = True) -> pd.DataFrame:
+        """Get hourly electricity demand data"""
+        return self.engine.run(self.get_electricity_demand_async(region, start_date, end_date, paginate))
+
+    async def get_electricity_demand_async(self, region: str = "US48",
+                                           start_date: str = None,
+                                           end_date: str = None,
+                                           paginate: bool = True) -> pd.DataFrame:
         """Get hourly electricity demand data"""
         if not start_date:
             start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%dT%H")
@@ -63,32 +180,35 @@ class EIADataCollector:
             "frequency": "hourly",
             "data": ["value"],
             "facets": {
-                "respondent": ["US48"],
+                "respondent": [region],
                 "type": ["D"]  # D = Demand
             },
             "start": start_date,
             "end": end_date,
             "sort": [{"column": "period", "direction": "asc"}],
-            "offset": 0,
-            "length": 5000,
         }
 
+        from data_collectors.parsing import eia_frame
 
-        data = self._make_request('electricity/rto/region-data', body)
+        rows = await self._fetch_rows_async('electricity/rto/region-data', body, paginate=paginate)
 
-        records = []
-        for item in data.get('response', {}).get('data', []):
-            records.append({
-                'timestamp': pd.to_datetime(item['period']),
-                'region': item['respondent'],
-                'demand_mw': item['value'],
-                'data_source': 'EIA'
-            })
-
-        return pd.DataFrame(records)
+        df = eia_frame(rows, {'period': 'timestamp', 'respondent': 'region', 'value': 'demand_mw'})
+        return self._finalize(df, ['timestamp', 'region'], ascending=True)
 
     def get_renewable_generation(self, region: str = "CISO",
-                                 fuel_type: str = "SUN") -> pd.DataFrame:
+                                 fuel_type: str = "SUN",
+                                 start_date: str = None,
+                                 end_date: str = None,
+                                 paginate: bool = True) -> pd.DataFrame:
+        """Get renewable generation data (SUN=solar, WND=wind)"""
+        return self.engine.run(self.get_renewable_generation_async(region, fuel_type, start_date,
+                                                                   end_date, paginate))
+
+    async def get_renewable_generation_async(self, region: str = "CISO",
+                                             fuel_type: str = "SUN",
+                                             start_date: str = None,
+                                             end_date: str = None,
+                                             paginate: bool = True) -> pd.DataFrame:
         """Get renewable generation data (SUN=solar, WND=wind)"""
         body = {
             "frequency": "hourly",
@@ -100,27 +220,32 @@ class EIADataCollector:
             "sort": [
                 {"column": "period", "direction": "desc"}
             ],
-            "offset": 0,
-            "length": 5000
         }
+        if start_date:
+            body["start"] = start_date
+        if end_date:
+            body["end"] = end_date
 
-        data = self._make_request('electricity/rto/fuel-type-data', body)
+        from data_collectors.parsing import eia_frame
 
-        records = []
-        for item in data.get('response', {}).get('data', []):
-            records.append({
-                'timestamp': pd.to_datetime(item['period']),
-                'region': item['respondent'],
-                'fuel_type': item['fueltype'],
-                'generation_mw': item['value'],
-                'data_source': 'EIA'
-            })
+        rows = await self._fetch_rows_async('electricity/rto/fuel-type-data', body, paginate=paginate)
 
-        return pd.DataFrame(records)
+        df = eia_frame(rows, {'period': 'timestamp', 'respondent': 'region',
+                              'fueltype': 'fuel_type', 'value': 'generation_mw'})
+        return self._finalize(df, ['timestamp', 'region', 'fuel_type'], ascending=False)
 
     def get_electric_hourly_demand_subregion(self, region: str = "US48",
                                              start_date: str = None,
-                                             end_date: str = None) -> pd.DataFrame:
+                                             end_date: str = None,
+                                             paginate: bool = True) -> pd.DataFrame:
+        """Get hourly electricity demand data for subregions"""
+        return self.engine.run(self.get_electric_hourly_demand_subregion_async(region, start_date,
+                                                                               end_date, paginate))
+
+    async def get_electric_hourly_demand_subregion_async(self, region: str = "US48",
+                                                         start_date: str = None,
+                                                         end_date: str = None,
+                                                         paginate: bool = True) -> pd.DataFrame:
         """Get hourly electricity demand data for subregions"""
         if not start_date:
             start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%dT%H")
@@ -138,35 +263,85 @@ class EIADataCollector:
             "sort": [
                 {"column": "period", "direction": "desc"}
             ],
-            "offset": 0,
-            "length": 5000
         }
 
-        data = self._make_request('electricity/rto/subregion-data', body)
-
-        records = []
-        for item in data.get('response', {}).get('data', []):
-            records.append({
-                'timestamp': pd.to_datetime(item['period']),
-                'region': item['respondent'],
-                'demand_mw': item['value'],
-                'data_source': 'EIA'
-            })
-
-        return pd.DataFrame(records)
+        from data_collectors.parsing import eia_frame
+
+        rows = await self._fetch_rows_async('electricity/rto/subregion-data', body, paginate=paginate)
+
+        df = eia_frame(rows, {'period': 'timestamp', 'respondent': 'region', 'value': 'demand_mw'})
+        return self._finalize(df, ['timestamp', 'region'], ascending=False)
+
+    def backfill(self, getter: str, start_date: str, end_date: str,
+                 freq: str = "month", checkpoint_dir: Optional[str] = None,
+                 max_workers: int = 2, **kwargs) -> pd.DataFrame:
+        """Fetch a long history with one of the getters, one time window at a time.
+
+        :param getter: Name of the getter to run, e.g. 'get_renewable_generation'.
+        :param start_date: Start of the range (inclusive).
+        :param end_date: End of the range (exclusive).
+        :param freq: Window size, 'month', 'week' or a pandas offset alias.
+        :param checkpoint_dir: Directory for finished windows; reruns resume from it.
+        :param max_workers: Windows fetched concurrently. Pages within a window
+            are still fetched through the engine and its rate limiter.
+        :return: Combined DataFrame for the whole range, oldest hour first.
+        """
+        import pandas as pd
+        from data_collectors.backfill import BackfillPlanner
+
+        fetch_window = getattr(self, getter)
+
+        def fetch(window_start: pd.Timestamp, window_end: pd.Timestamp) -> pd.DataFrame:
+            # EIA treats `end` as inclusive, so stop at the last hour before the next window
+            last_hour = window_end - pd.Timedelta(hours=1)
+            return fetch_window(start_date=window_start.strftime("%Y-%m-%dT%H"),
+                                end_date=last_hour.strftime("%Y-%m-%dT%H"), **kwargs)
+
+        planner = BackfillPlanner(fetch, freq=freq, max_workers=max_workers,
+                                  checkpoint_dir=checkpoint_dir)
+        df = planner.run(start_date, end_date)
+        if df.empty:
+            return df
+        return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    def cached(self, getter: str, start_date: str, end_date: str = None,
+               columns: Optional[List[str]] = None, refresh: bool = True,
+               **kwargs) -> pd.DataFrame:
+        """Get a series through the local cache, fetching only hours after its watermark.
+
+        :param getter: Name of the getter to run, e.g. 'get_renewable_generation'.
+        :param start_date: First hour wanted; also where an uncached series starts fetching.
+        :param end_date: Last hour wanted, defaults to now.
+        :param columns: Columns to read back from the cache.
+        :param refresh: When False, serve whatever is cached without calling the API.
+        :param kwargs: Getter arguments such as region and fuel_type; they form the series key.
+        :return: DataFrame for the requested range.
+        """
+        if self.cache is None:
+            raise ValueError("EIADataCollector was created without a cache.")
+        # Imported here so pyarrow is only needed when caching is used
+        import pandas as pd
+        from data_collectors.cache import series_key
+
+        key = series_key('eia', getter, *(kwargs[name] for name in sorted(kwargs)), 'hourly')
+        if not refresh:
+            return self.cache.read(key, columns=columns, start=start_date, end=end_date)
+
+        def fetch(since: Optional[pd.Timestamp]) -> pd.DataFrame:
+            start = start_date if since is None else (since + pd.Timedelta(hours=1)).strftime("%Y-%m-%dT%H")
+            return getattr(self, getter)(start_date=start, end_date=end_date, **kwargs)
+
+        keys = ['timestamp', 'region', 'fuel_type'] if getter == 'get_renewable_generation' else ['timestamp', 'region']
+        return self.cache.refresh(key, fetch, keys=keys, columns=columns,
+                                  start=start_date, end=end_date)
 
 
 if __name__ == "__main__":
     # Initialize collector
-    load_dotenv()
-    print(f"API Key from env: {os.getenv('EIA_API_KEY')}")
+    eia_api_key = get_setting("EIA_API_KEY", required=True)
+    print(f"API Key from env: {eia_api_key}")
 
-    eia_api_key = os.getenv("EIA_API_KEY")
-    if not eia_api_key:
-        raise ValueError("EIA_API_KEY is not set in the environment variables.")
-    
     collector = EIADataCollector(api_key = eia_api_key)
-    collector = EIADataCollector(eia_api_key)
     print(f"Collector has API key: {collector.api_key}")
 
     # Example: Get electricity demand for the last 3 days
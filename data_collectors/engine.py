@@ -0,0 +1,253 @@
+#collector engine
+#asyncio engine shared by the collectors: pooled sessions per host, token-bucket pacing, retries and circuit breakers
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_collectors.instrumentation import Instrumentation, new_event
+from data_collectors.rate_limiter import TokenBucket
+from data_collectors.resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Errors raised before any response arrives that are worth retrying
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header, as a number or an HTTP date."""
+    headers = getattr(response, "headers", None)
+    return parse_retry_after(headers.get("Retry-After")) if headers else None
+
+
+class CollectorEngine:
+    """Runs collector requests concurrently on an event loop of its own.
+
+    Every API host gets one ``requests.Session`` with a connection pool sized
+    for the engine's concurrency, and optionally a TokenBucket. Blocking
+    session calls run in worker threads, so hundreds of requests can be in
+    flight while the loop only schedules them. The loop lives in a daemon
+    thread, which lets the synchronous collector methods call run() from
+    scripts and from notebooks that already have a loop running.
+
+    Failed requests (429/5xx responses, connection errors and timeouts) are
+    retried with jittered exponential backoff, honouring Retry-After. Each
+    host also has a CircuitBreaker: once it keeps failing, requests to it
+    fail fast with CircuitOpenError until a probe succeeds again.
+    """
+
+    def __init__(self, max_concurrency: int = 32, max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 instrumentation: Optional[Instrumentation] = None,
+                 retry: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.retry = retry or RetryPolicy(max_retries=max_retries, backoff_base=backoff_base)
+        self.max_retries = self.retry.max_retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # No-op unless a MetricsRecorder/JsonLinesTrace or other hook is installed
+        self.instrumentation = instrumentation or Instrumentation()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # One semaphore per event loop, in case coroutines are awaited outside run()
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def register(self, base_url: str, requests_per_second: Optional[float] = None,
+                 burst: int = 1) -> requests.Session:
+        """Get the pooled session for an API host, creating it on first use.
+
+        :param base_url: Any URL on the host.
+        :param requests_per_second: Rate limit for the host if it has none yet. An
+            existing limit, and any backoff it is in, is kept; use set_rate() to change it.
+        :param burst: Requests allowed back to back before pacing starts.
+        :return: The shared session; collectors set their headers on it.
+        """
+        host = urlsplit(base_url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            if requests_per_second is not None and host not in self._limiters:
+                self._limiters[host] = TokenBucket(requests_per_second, burst=burst)
+        return session
+
+    def set_rate(self, base_url: str, requests_per_second: float, burst: int = 1) -> TokenBucket:
+        """Replace the rate limit for a host, dropping any backoff in progress."""
+        host = urlsplit(base_url).netloc
+        with self._lock:
+            limiter = self._limiters[host] = TokenBucket(requests_per_second, burst=burst)
+        return limiter
+
+    def limiter(self, base_url: str) -> Optional[TokenBucket]:
+        """The TokenBucket pacing a host, if one was registered."""
+        return self._limiters.get(urlsplit(base_url).netloc)
+
+    def breaker(self, base_url: str) -> CircuitBreaker:
+        """The circuit breaker guarding a host, created on first use."""
+        host = urlsplit(base_url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    host, failure_threshold=self.failure_threshold, reset_timeout=self.reset_timeout)
+        return breaker
+
+    def start_event(self, api: str, endpoint: str, method: str = "GET") -> Optional[Dict]:
+        """New instrumentation event for a request, or None when instrumentation is off."""
+        if not self.instrumentation.enabled:
+            return None
+        return new_event(api, endpoint, method)
+
+    def finish_event(self, event: Optional[Dict]):
+        """Hand a completed event to the instrumentation hook."""
+        if event is not None:
+            self.instrumentation.record(event)
+
+    async def request(self, method: str, url: str, event: Optional[Dict] = None,
+                      **kwargs) -> requests.Response:
+        """Send one request, pacing it per host and retrying transient failures.
+
+        The last response is returned as-is once retries run out, so callers
+        keep using raise_for_status() for error handling; connection errors
+        and timeouts are re-raised after the last attempt. CircuitOpenError is
+        raised without sending anything while the host's circuit is open. When
+        an event from start_event() is passed, latency, size, retries and
+        rate-limit waits are recorded in it.
+        """
+        session = self.register(url)
+        limiter = self.limiter(url)
+        breaker = self.breaker(url)
+        send = getattr(session, method.lower())
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        max_retries = self.retry.max_retries
+        for attempt in range(max_retries + 1):
+            probe = breaker.allow()
+            try:
+                if limiter is not None:
+                    waited = await limiter.wait_async()
+                    if event is not None:
+                        event["rate_limit_wait_s"] += waited
+                async with semaphore:
+                    if event is None:
+                        response = await asyncio.to_thread(send, url, **kwargs)
+                    else:
+                        response = await self._timed_send(send, url, event, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                breaker.record_failure()
+                if attempt == max_retries:
+                    raise
+                if event is not None:
+                    event["retries"] += 1
+                    event["error"] = None
+                wait = self.retry.delay(attempt)
+                logger.warning(f"{method} {urlsplit(url).path} failed ({type(e).__name__}), "
+                               f"retrying in {wait:.1f}s")
+                await asyncio.sleep(wait)
+                continue
+            except BaseException:
+                # Other errors and cancellation say nothing about the host, but must not hold the probe
+                if probe:
+                    breaker.release_probe()
+                raise
+
+            status = getattr(response, "status_code", None)
+            # Rate limiting is the limiter's business; only server errors count against the host
+            if status in RETRY_STATUSES and status != 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if status not in RETRY_STATUSES or attempt == max_retries:
+                if limiter is not None and status not in RETRY_STATUSES:
+                    limiter.recover()
+                return response
+
+            if event is not None:
+                event["retries"] += 1
+
+            wait = self.retry.delay(attempt, _retry_after(response))
+            if status == 429 and limiter is not None:
+                limiter.throttle(wait)
+            logger.warning(f"{method} {urlsplit(url).path} returned {status}, retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    async def _timed_send(send, url: str, event: Dict, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.to_thread(send, url, **kwargs)
+        except Exception as e:
+            event["error"] = repr(e)
+            raise
+        finally:
+            event["latency_s"] += time.perf_counter() - started
+        event["status"] = getattr(response, "status_code", None)
+        try:
+            event["bytes"] = len(response.content)
+        except TypeError:
+            pass
+        return response
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                             thread_name_prefix="collector-io"))
+                thread = threading.Thread(target=loop.run_forever, name="collector-engine", daemon=True)
+                thread.start()
+                self._loop = loop
+        return self._loop
+
+    def run(self, coro: Awaitable):
+        """Run a coroutine on the engine loop and block until it finishes."""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("CollectorEngine.run() cannot be called from the engine's own loop; await the coroutine instead.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def gather(self, coros: List[Awaitable]) -> List:
+        """Run many coroutines concurrently and return their results in order."""
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather())
+
+
+_default_engine: Optional[CollectorEngine] = None
+_default_lock = threading.Lock()
+
+
+def get_engine() -> CollectorEngine:
+    """The process-wide engine shared by collectors that are not given one."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = CollectorEngine()
+        return _default_engine
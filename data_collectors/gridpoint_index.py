@@ -0,0 +1,83 @@
+#gridpoint index
+#persistent lookup from coordinates to NWS gridpoints, so forecasts can skip the /points call
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Gridpoint = Tuple[str, int, int]
+
+# NWS gridpoints are 2.5 km cells; the /points endpoint itself only accepts 4 decimals
+DEFAULT_PRECISION = 4
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+class GridpointIndex:
+    """Maps rounded (lat, lon) pairs to their NWS (office, gridX, gridY).
+
+    Entries are kept in a JSON file and expire after ``ttl`` seconds, since NWS
+    occasionally redraws office boundaries. Changes are written back with
+    save(), which NOAACollector calls after each lookup or bulk warm-up.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, precision: int = DEFAULT_PRECISION):
+        self.path = path
+        self.ttl = ttl
+        self.precision = precision
+        self._lock = threading.Lock()
+        self._entries: Dict[str, list] = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+            self.evict_expired()
+
+    def key(self, lat: float, lon: float) -> str:
+        return f"{round(lat, self.precision):.{self.precision}f},{round(lon, self.precision):.{self.precision}f}"
+
+    def get(self, lat: float, lon: float) -> Optional[Gridpoint]:
+        """Cached gridpoint for a coordinate, or None if unknown or expired."""
+        entry = self._entries.get(self.key(lat, lon))
+        if entry is None:
+            return None
+        office, grid_x, grid_y, fetched_at = entry
+        if time.time() - fetched_at > self.ttl:
+            return None
+        return office, grid_x, grid_y
+
+    def put(self, lat: float, lon: float, gridpoint: Gridpoint):
+        office, grid_x, grid_y = gridpoint
+        with self._lock:
+            self._entries[self.key(lat, lon)] = [office, grid_x, grid_y, time.time()]
+            self._dirty = True
+
+    def evict_expired(self) -> int:
+        """Drop expired entries. Returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now - entry[3] > self.ttl]
+            for key in expired:
+                del self._entries[key]
+            self._dirty = self._dirty or bool(expired)
+        return len(expired)
+
+    def save(self):
+        """Write the index to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.tmp", "w") as f:
+                json.dump(self._entries, f)
+            os.replace(f"{self.path}.tmp", self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
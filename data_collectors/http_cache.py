@@ -0,0 +1,142 @@
+#http cache
+#validators and parsed results of collector responses, so unchanged data is neither downloaded nor parsed again
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: Optional[float] = None) -> float:
+    """Seconds a response may be reused without asking the server, from its headers.
+
+    Cache-Control max-age wins over Expires; no-cache and no-store mean the
+    response always has to be revalidated.
+    """
+    now = time.time() if now is None else now
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0.0
+    match = re.search(r"(?:^|[,\s])max-age=(\d+)", cache_control)
+    if match:
+        return float(match.group(1))
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
+
+
+def _sizeof(value: Any) -> int:
+    memory_usage = getattr(value, "memory_usage", None)
+    if memory_usage is not None:
+        # pandas objects report their buffers, including string contents
+        return int(memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+
+@dataclass
+class CachedResponse:
+    """A parsed response and the headers needed to revalidate it."""
+    value: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+    size: int
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers; a 304 answer means the value is still current."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Size-bounded LRU of parsed responses keyed by URL.
+
+    Collectors check get() before a request: a fresh entry is used as-is, a
+    stale one supplies validators() for a conditional request, and on a 304
+    revalidate() extends it. Entries beyond ``max_entries`` or ``max_bytes``
+    of parsed values are evicted least recently used first. Cached values are
+    shared, so callers copy them before modifying.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, response, value: Any) -> CachedResponse:
+        """Store the parsed value of a 200 response with its validators."""
+        headers = response.headers
+        entry = CachedResponse(
+            value=value,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            expires_at=time.time() + freshness_lifetime(headers),
+            size=_sizeof(value),
+        )
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[url] = entry
+            self._bytes += entry.size
+            self._evict()
+        return entry
+
+    def revalidate(self, url: str, entry: CachedResponse, response):
+        """Extend an entry after a 304, taking any new validators the server sent."""
+        headers = response.headers
+        entry.etag = headers.get("ETag") or entry.etag
+        entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+        entry.expires_at = time.time() + freshness_lifetime(headers)
+        with self._lock:
+            if url not in self._entries:
+                self._entries[url] = entry
+                self._bytes += entry.size
+            self._entries.move_to_end(url)
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes
+                                  and len(self._entries) > 1)):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
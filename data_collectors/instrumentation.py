@@ -0,0 +1,86 @@
+#instrumentation
+#optional per-request metrics and traces for the collectors; off unless a hook is installed
+
+import json
+import threading
+import time
+from typing import Dict
+
+
+class Instrumentation:
+    """Hook the collector engine reports requests to.
+
+    The base class is the default and records nothing; when ``enabled`` is
+    False the engine does not even build the per-request event. Subclasses
+    receive one event dict per request with these keys:
+
+    api, endpoint, method, status, latency_s (time on the wire, summed over
+    retries), bytes, rows, retries, rate_limit_wait_s, error, started_at.
+    """
+
+    enabled = False
+
+    def record(self, event: Dict):
+        pass
+
+
+class MetricsRecorder(Instrumentation):
+    """Aggregates request events into per-API counters."""
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict] = {}
+
+    def record(self, event: Dict):
+        with self._lock:
+            metrics = self._metrics.setdefault(event["api"], {
+                "requests": 0, "errors": 0, "retries": 0, "rows": 0, "bytes": 0,
+                "latency_s": 0.0, "max_latency_s": 0.0, "rate_limit_wait_s": 0.0,
+            })
+            metrics["requests"] += 1
+            metrics["errors"] += event.get("error") is not None
+            metrics["retries"] += event.get("retries", 0)
+            metrics["rows"] += event.get("rows") or 0
+            metrics["bytes"] += event.get("bytes") or 0
+            metrics["latency_s"] += event.get("latency_s", 0.0)
+            metrics["max_latency_s"] = max(metrics["max_latency_s"], event.get("latency_s", 0.0))
+            metrics["rate_limit_wait_s"] += event.get("rate_limit_wait_s", 0.0)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Counters per API, with the mean latency added."""
+        with self._lock:
+            summary = {api: dict(metrics) for api, metrics in self._metrics.items()}
+        for metrics in summary.values():
+            metrics["mean_latency_s"] = metrics["latency_s"] / metrics["requests"]
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+class JsonLinesTrace(Instrumentation):
+    """Appends every request event to a JSON-lines file."""
+
+    enabled = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def new_event(api: str, endpoint: str, method: str) -> Dict:
+    """Blank event for one request, filled in by the engine and the collector."""
+    return {
+        "api": api, "endpoint": endpoint, "method": method, "status": None,
+        "latency_s": 0.0, "bytes": None, "rows": None, "retries": 0,
+        "rate_limit_wait_s": 0.0, "error": None, "started_at": time.time(),
+    }
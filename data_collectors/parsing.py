@@ -0,0 +1,80 @@
+#parsing
+#columnar parsing of collector responses: frames are built straight from the json arrays
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Hourly EIA periods look like '2024-01-01T05'
+EIA_PERIOD_FORMAT = "%Y-%m-%dT%H"
+
+MPH_TO_MS = 0.44704
+
+
+def parse_periods(values, fmt: str = EIA_PERIOD_FORMAT, utc: bool = False) -> pd.Series:
+    """Convert a column of timestamp strings in one call.
+
+    The expected format is tried first since it is much faster than inference;
+    anything else falls back to ISO 8601 parsing.
+    """
+    try:
+        return pd.to_datetime(values, format=fmt, utc=utc)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, format="ISO8601", utc=utc)
+
+
+def eia_frame(rows: List[Dict], fields: Dict[str, str]) -> pd.DataFrame:
+    """Build a collector frame from EIA data rows.
+
+    :param rows: The response.data array of one or more pages.
+    :param fields: Source field -> output column, in output order; 'period'
+        becomes the timestamp and 'value' is converted to numbers.
+    :return: DataFrame with the mapped columns plus data_source.
+    """
+    df = pd.DataFrame.from_records(rows, columns=list(fields)).rename(columns=fields)
+    if 'period' in fields:
+        df[fields['period']] = parse_periods(df[fields['period']])
+    if 'value' in fields:
+        # EIA sends values as strings for some series
+        df[fields['value']] = pd.to_numeric(df[fields['value']], errors='coerce')
+    df['data_source'] = 'EIA'
+    return df
+
+
+def parse_wind_speeds(values: pd.Series) -> np.ndarray:
+    """Convert NWS wind speed strings like '10 mph' or '5 to 10 mph' to m/s.
+
+    Ranges use their first number ('5 to 10 mph' -> 5 mph); missing or
+    unparseable values become 0.
+    """
+    speeds = values.astype("string").str.extract(r"^\s*(\d+(?:\.\d+)?)", expand=False)
+    return pd.to_numeric(speeds, errors='coerce').fillna(0.0).to_numpy(dtype=float) * MPH_TO_MS
+
+
+def nws_forecast_frame(periods: List[Dict], lat: float, lon: float) -> pd.DataFrame:
+    """Build the hourly forecast frame from the NWS properties.periods array.
+
+    Timestamps are returned in UTC; a forecast can cross a DST change, so the
+    local offsets in startTime are not uniform.
+    """
+    raw = pd.DataFrame.from_records(periods)
+    n = len(raw)
+
+    def column(name: str, default) -> pd.Series:
+        if name in raw:
+            return raw[name] if default is None else raw[name].fillna(default)
+        return pd.Series([default] * n, index=raw.index)
+
+    temperature = pd.to_numeric(column('temperature', np.nan), errors='coerce').to_numpy(dtype=float)
+    fahrenheit = column('temperatureUnit', 'F').eq('F').to_numpy()
+    return pd.DataFrame({
+        'timestamp': parse_periods(column('startTime', None), fmt="ISO8601", utc=True),
+        'latitude': lat,
+        'longitude': lon,
+        'temperature_c': np.where(fahrenheit, (temperature - 32) * 5 / 9, temperature),
+        'wind_speed_ms': parse_wind_speeds(column('windSpeed', '0 mph')),
+        'wind_direction': column('windDirection', 'N').to_numpy(),
+        'forecast_text': column('shortForecast', '').to_numpy(),
+        'data_source': 'NOAA',
+    })
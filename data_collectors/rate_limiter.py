@@ -0,0 +1,69 @@
+#rate limiter
+#shared request pacing for the collectors
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to one API.
+
+    Up to ``burst`` requests go out immediately, after which requests are
+    spaced at ``rate`` per second. The rate adapts: throttle() halves it and
+    blocks the bucket when the API pushes back (HTTP 429), and recover()
+    grows it back toward the configured rate after successful requests.
+    A rate of 0 disables pacing.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._blocked_until - now)
+            if self.rate <= 0:
+                return delay
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def wait(self) -> float:
+        """Block until a request may be sent. Returns the time waited."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self) -> float:
+        """Asyncio version of wait()."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def throttle(self, retry_after: float):
+        """Back off after the API rejected a request for exceeding its limit."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            if self.rate > 0:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        """Step the rate back toward its configured maximum after a success."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
@@ -0,0 +1,186 @@
+#resilience
+#retry timing, per-host circuit breakers and page checkpoints shared by the collectors through the engine
+
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while a host's circuit breaker is open.
+
+    It is a RequestException, so collectors log and surface it like any
+    other failed request, and backfill windows that hit it are retried on
+    the next run.
+    """
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit for {host} is open after repeated failures; retry in {retry_in:.0f}s")
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds asked for by a Retry-After header, given as seconds or an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class RetryPolicy:
+    """How many times to retry and how long to wait in between.
+
+    Waits use full jitter, a uniform draw up to ``backoff_base * 2**attempt``
+    capped at ``backoff_max``, so parallel workers hitting the same outage do
+    not come back in lockstep. A Retry-After from the server takes precedence
+    over the backoff, up to ``backoff_max``.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 60.0,
+                 seed: Optional[int] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._random = random.Random(seed)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number ``attempt + 1``."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Stops requests to a host that keeps failing.
+
+    After ``failure_threshold`` consecutive failures (5xx responses or
+    connection errors) the circuit opens and requests fail at once with
+    CircuitOpenError. After ``reset_timeout`` seconds one probe request is let
+    through: success closes the circuit, failure opens it again. A probe that
+    ends any other way must call release_probe(); one that never reports back
+    is given up on after another ``reset_timeout``.
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now.
+
+        :return: Whether the request is the half-open probe.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            now = time.monotonic()
+            waited = now - self.opened_at
+            if waited < self.reset_timeout:
+                raise CircuitOpenError(self.host, self.reset_timeout - waited)
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                raise CircuitOpenError(self.host, self.reset_timeout - (now - self._probe_started))
+            self._probe_started = now
+            return True
+
+    def release_probe(self):
+        """Let another probe through after one ended without a verdict, e.g. cancelled."""
+        with self._lock:
+            self._probe_started = None
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.host} closed")
+            self.failures = 0
+            self.opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # Requests already in flight when the circuit opened do not extend it
+            if self._probe_started is not None or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"Circuit for {self.host} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+
+class PageCheckpoint:
+    """Completed pages of paginated queries, kept on disk until the query finishes.
+
+    Each query (endpoint plus request body without the offset) gets its own
+    directory of ``page-<offset>.json`` files, written atomically as pages
+    arrive. If a long pagination fails part way, rerunning the same query
+    only requests the missing offsets; discard() removes the pages once every
+    page is in.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, body: Dict) -> str:
+        query = {name: value for name, value in body.items() if name != "offset"}
+        text = json.dumps([endpoint, query], sort_keys=True, default=str)
+        return hashlib.sha1(text.encode()).hexdigest()[:20]
+
+    def _path(self, key: str, offset: int) -> str:
+        return os.path.join(self.directory, key, f"page-{offset:09d}.json")
+
+    def load(self, key: str, offset: int) -> Optional[Dict]:
+        path = self._path(key, offset)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save(self, key: str, offset: int, page: Dict):
+        path = self._path(key, offset)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(page, f)
+        os.replace(f"{path}.tmp", path)
+
+    def offsets(self, key: str) -> List[int]:
+        """Offsets already stored for a query."""
+        directory = os.path.join(self.directory, key)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(name[5:-5]) for name in os.listdir(directory)
+                      if name.startswith("page-") and name.endswith(".json"))
+
+    def discard(self, key: str):
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
@@ -0,0 +1,89 @@
+#sites
+#registry of forecast sites, bucketed by location so shared NWS gridpoints are resolved and fetched once
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from data_collectors.gridpoint_index import DEFAULT_PRECISION, Gridpoint
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+Coordinate = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class Site:
+    """A named location that needs weather, e.g. a plant or a demand zone's reference city."""
+    name: str
+    latitude: float
+    longitude: float
+
+
+class SiteRegistry:
+    """Named sites indexed by location.
+
+    Sites are hashed into buckets by coordinates rounded to ``precision``
+    decimals (the resolution the NWS /points endpoint accepts), so co-located
+    sites need a single gridpoint lookup. Resolved gridpoints are kept on the
+    registry, so only buckets added since the last refresh need a /points call,
+    and by_gridpoint() groups the sites per NWS forecast cell, which is the
+    unit NOAACollector.get_site_forecasts() fetches.
+    """
+
+    def __init__(self, sites: Iterable[Site] = (), precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self._sites: Dict[str, Site] = {}
+        self._buckets: Dict[Coordinate, List[Site]] = {}
+        self.gridpoints: Dict[Coordinate, Gridpoint] = {}
+        for site in sites:
+            self.add(site)
+
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame", precision: int = DEFAULT_PRECISION) -> "SiteRegistry":
+        """Build a registry from a frame with name, latitude and longitude columns."""
+        return cls((Site(str(name), float(lat), float(lon))
+                    for name, lat, lon in df[['name', 'latitude', 'longitude']].itertuples(index=False)),
+                   precision=precision)
+
+    def bucket(self, lat: float, lon: float) -> Coordinate:
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def add(self, site: Site):
+        if site.name in self._sites:
+            raise ValueError(f"Site '{site.name}' is already registered.")
+        self._sites[site.name] = site
+        self._buckets.setdefault(self.bucket(site.latitude, site.longitude), []).append(site)
+
+    def coordinates(self) -> List[Coordinate]:
+        """Distinct rounded coordinates, one gridpoint lookup each."""
+        return list(self._buckets)
+
+    def unresolved(self) -> List[Coordinate]:
+        """Coordinates whose gridpoint is not known yet."""
+        return [coordinate for coordinate in self._buckets if coordinate not in self.gridpoints]
+
+    def resolve(self, gridpoints: Dict[Coordinate, Gridpoint]):
+        """Record the gridpoints of some coordinates."""
+        self.gridpoints.update({coordinate: tuple(gridpoint) for coordinate, gridpoint in gridpoints.items()})
+
+    def by_gridpoint(self, gridpoints: Optional[Dict[Coordinate, Gridpoint]] = None) -> Dict[Gridpoint, List[Site]]:
+        """Group sites by forecast cell.
+
+        :param gridpoints: Gridpoint of every coordinate returned by coordinates(),
+            by default the ones recorded with resolve().
+        """
+        gridpoints = self.gridpoints if gridpoints is None else gridpoints
+        groups: Dict[Gridpoint, List[Site]] = {}
+        for coordinate, sites in self._buckets.items():
+            groups.setdefault(tuple(gridpoints[coordinate]), []).extend(sites)
+        return groups
+
+    def __getitem__(self, name: str) -> Site:
+        return self._sites[name]
+
+    def __iter__(self):
+        return iter(self._sites.values())
+
+    def __len__(self) -> int:
+        return len(self._sites)
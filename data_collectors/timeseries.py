@@ -0,0 +1,239 @@
+#hourly table
+#compact columnar container for hourly grid data: epoch-hour index, float32 values, dictionary-encoded dimensions
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+HOUR_NS = 3600 * 10 ** 9
+
+
+def epoch_hours(times) -> np.ndarray:
+    """Whole hours since 1970-01-01 UTC. Naive timestamps are taken to be UTC."""
+    times = pd.DatetimeIndex(pd.to_datetime(times))
+    if times.tz is not None:
+        times = times.tz_convert("UTC").tz_localize(None)
+    if times.hasnans:
+        raise ValueError("Timestamps contain missing values.")
+    ns = times.to_numpy(dtype="datetime64[ns]").view("int64")
+    off_hour = np.count_nonzero(ns % HOUR_NS)
+    if off_hour:
+        raise ValueError(f"{off_hour} timestamps are not on the hour; resample to hourly first.")
+    return ns // HOUR_NS
+
+
+def hour_timestamps(hours: np.ndarray, tz: Optional[str] = "UTC") -> pd.DatetimeIndex:
+    """Inverse of epoch_hours; tz=None gives naive UTC timestamps."""
+    index = pd.DatetimeIndex((np.asarray(hours, dtype="int64") * HOUR_NS).view("datetime64[ns]"))
+    return index.tz_localize(tz) if tz else index
+
+
+class HourlyTable:
+    """Hourly rows stored as flat typed arrays instead of an object-heavy DataFrame.
+
+    The time index is int64 hours since the epoch, values are float32 and
+    repeated labels (region, fuel_type, site, data_source, forecast_text,
+    ...) are dictionary encoded: each row keeps a small integer code into
+    the column's categories. A year of hourly rows for one region and
+    value costs about 13 bytes per row instead of the hundreds a frame with
+    Python strings and datetimes takes.
+
+    Alignment and joins go through one int64 key per row built from the hour
+    and the dimension codes, so join() and unstack() are a sort and a binary
+    search with no Python loop over rows.
+    """
+
+    def __init__(self, hours: np.ndarray, dims: Optional[Dict[str, pd.Categorical]] = None,
+                 values: Optional[Dict[str, np.ndarray]] = None):
+        self.hours = np.asarray(hours, dtype="int64")
+        self.dims = {name: dim if isinstance(dim, pd.Categorical) else pd.Categorical(dim)
+                     for name, dim in (dims or {}).items()}
+        self.values = {name: np.asarray(value, dtype="float32") for name, value in (values or {}).items()}
+        overlap = set(self.dims) & set(self.values)
+        if overlap:
+            raise ValueError(f"Columns are both dimensions and values: {sorted(overlap)}")
+        for name, column in {**self.dims, **self.values}.items():
+            if len(column) != len(self.hours):
+                raise ValueError(f"Column '{name}' has {len(column)} rows, expected {len(self.hours)}.")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, time_column: str = "timestamp",
+                   dims: Optional[Sequence[str]] = None,
+                   values: Optional[Sequence[str]] = None) -> "HourlyTable":
+        """Encode a collector frame.
+
+        :param dims: Label columns, by default every string, object, bool or categorical column.
+        :param values: Numeric columns, by default every other numeric column.
+        """
+        columns = [column for column in df.columns if column != time_column]
+        if dims is None:
+            dims = [column for column in columns
+                    if isinstance(df[column].dtype, pd.CategoricalDtype)
+                    or pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column])
+                    or pd.api.types.is_bool_dtype(df[column])]
+        if values is None:
+            values = [column for column in columns if column not in dims
+                      and pd.api.types.is_numeric_dtype(df[column])]
+        return cls(epoch_hours(df[time_column]),
+                   {column: pd.Categorical(df[column]) for column in dims},
+                   {column: df[column].to_numpy(dtype="float32", na_value=np.nan) for column in values})
+
+    def to_frame(self, time_column: str = "timestamp", tz: Optional[str] = "UTC") -> pd.DataFrame:
+        """Decode to a DataFrame with a datetime column, categoricals and float32 values."""
+        return pd.DataFrame({time_column: hour_timestamps(self.hours, tz), **self.dims, **self.values})
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def __repr__(self) -> str:
+        return (f"HourlyTable({len(self)} rows, dims={list(self.dims)}, values={list(self.values)}, "
+                f"{self.nbytes / 2 ** 20:.1f} MB)")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays, including the category labels."""
+        total = self.hours.nbytes + sum(value.nbytes for value in self.values.values())
+        for dim in self.dims.values():
+            total += dim.codes.nbytes + int(dim.categories.memory_usage(deep=True))
+        return total
+
+    def take(self, indexer: np.ndarray) -> "HourlyTable":
+        """Rows at the given positions or boolean mask."""
+        return HourlyTable(self.hours[indexer],
+                           {name: dim[indexer] for name, dim in self.dims.items()},
+                           {name: value[indexer] for name, value in self.values.items()})
+
+    def between(self, start=None, end=None) -> "HourlyTable":
+        """Rows with start <= hour < end."""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.hours >= epoch_hours([start])[0]
+        if end is not None:
+            mask &= self.hours < epoch_hours([end])[0]
+        return self.take(mask)
+
+    def sort(self) -> "HourlyTable":
+        """Order rows by dimensions, then hour."""
+        order = np.lexsort([self.hours, *(dim.codes for dim in reversed(list(self.dims.values())))])
+        return self.take(order)
+
+    @classmethod
+    def concat(cls, tables: Iterable["HourlyTable"]) -> "HourlyTable":
+        """Stack tables with the same columns; categories are merged."""
+        tables = list(tables)
+        if not tables:
+            return cls(np.empty(0, dtype="int64"))
+        first = tables[0]
+        for table in tables[1:]:
+            if set(table.dims) != set(first.dims) or set(table.values) != set(first.values):
+                raise ValueError("Tables have different columns.")
+        return cls(np.concatenate([table.hours for table in tables]),
+                   {name: pd.api.types.union_categoricals([table.dims[name] for table in tables],
+                                                           sort_categories=True)
+                    for name in first.dims},
+                   {name: np.concatenate([table.values[name] for table in tables]) for name in first.values})
+
+    def _keys(self, dims: List[str], codes: Optional[Dict[str, np.ndarray]] = None,
+              hours: Optional[np.ndarray] = None, base: int = 0) -> np.ndarray:
+        """One int64 per row from the hour and dimension codes, in mixed radix.
+
+        Codes are shifted by one so -1 (a missing label) stays distinct.
+        """
+        hours = self.hours if hours is None else hours
+        if codes is None:
+            codes = {name: self.dims[name].codes for name in dims}
+        radix = 1
+        for name in dims:
+            radix *= len(self.dims[name].categories) + 1
+        span = int(hours.max(initial=base)) - base + 1
+        if span * radix >= 2 ** 62:
+            raise ValueError("Too many hour and label combinations to key in int64.")
+        key = hours - base
+        for name in dims:
+            key = key * (len(self.dims[name].categories) + 1) + (codes[name].astype("int64") + 1)
+        return key
+
+    def join(self, other: "HourlyTable", how: str = "left", suffix: str = "_right") -> "HourlyTable":
+        """Add another table's values on matching hours and shared dimensions.
+
+        Every dimension of ``other`` must also be one of this table's, and
+        ``other`` may have at most one row per hour and label combination;
+        unstack() it first otherwise (e.g. weather by site). Unmatched rows get
+        NaN for a left join and are dropped for an inner join.
+        """
+        if how not in ("left", "inner"):
+            raise ValueError(f"Unknown join '{how}', expected 'left' or 'inner'.")
+        missing = [name for name in other.dims if name not in self.dims]
+        if missing:
+            raise ValueError(f"Dimensions {missing} are not in the left table; unstack them first.")
+        on = list(other.dims)
+        # Express the right table's labels as codes into this table's categories
+        codes = {name: pd.Index(self.dims[name].categories).get_indexer(other.dims[name].categories)
+                 [other.dims[name].codes] for name in on}
+        known = np.all([code >= 0 for code in codes.values()], axis=0) if on else np.ones(len(other), bool)
+        both = np.concatenate([self.hours, other.hours])
+        base = int(both.min()) if len(both) else 0
+        right = self._keys(on, codes={name: code[known] for name, code in codes.items()},
+                           hours=other.hours[known], base=base)
+        order = np.argsort(right, kind="stable")
+        right = right[order]
+        if len(right) > 1 and (right[1:] == right[:-1]).any():
+            raise ValueError("The right table has several rows for some hour and labels.")
+        left = self._keys(on, base=base)
+        position = np.minimum(np.searchsorted(right, left), max(len(right) - 1, 0))
+        if len(right):
+            matched = right[position] == left
+            source = np.flatnonzero(known)[order][position]
+        else:
+            # Nothing on the right shares this table's labels
+            matched = np.zeros(len(left), bool)
+            source = np.zeros(len(left), dtype="int64")
+
+        values = dict(self.values)
+        for name, value in other.values.items():
+            joined = np.full(len(self), np.nan, dtype="float32")
+            joined[matched] = value[source[matched]]
+            values[f"{name}{suffix}" if name in values else name] = joined
+        table = HourlyTable(self.hours, self.dims, values)
+        return table.take(matched) if how == "inner" else table
+
+    def unstack(self, dim: str, name: str = "{category} {value}") -> "HourlyTable":
+        """Move one dimension into the columns, e.g. site -> 'Sacramento temperature_c'.
+
+        Raises ValueError if a label occurs twice for the same hour and other labels.
+        """
+        rest = [other for other in self.dims if other != dim]
+        groups, first, inverse = np.unique(self._keys(rest), return_index=True, return_inverse=True)
+        categories = self.dims[dim].categories
+        codes = self.dims[dim].codes
+        labelled = codes >= 0
+        cells = inverse[labelled] * len(categories) + codes[labelled]
+        if np.bincount(cells, minlength=1).max(initial=0) > 1:
+            raise ValueError(f"Several rows share an hour and '{dim}' label.")
+
+        values = {}
+        for value_name, value in self.values.items():
+            wide = np.full((len(groups), len(categories)), np.nan, dtype="float32")
+            wide[inverse[labelled], codes[labelled]] = value[labelled]
+            for i, category in enumerate(categories):
+                values[name.format(category=category, value=value_name)] = wide[:, i]
+        return HourlyTable(self.hours[first], {other: self.dims[other][first] for other in rest}, values)
+
+    def grid(self, value: str, start=None, end=None) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """Dense (label combination, hour) matrix of one value, NaN where a row is missing.
+
+        :return: The label combinations as a frame, the epoch hours of the
+            columns and the float32 matrix, e.g. regions x hours for dispatch.
+        """
+        dims = list(self.dims)
+        first_hour = epoch_hours([start])[0] if start is not None else int(self.hours.min()) if len(self) else 0
+        end_hour = epoch_hours([end])[0] if end is not None else int(self.hours.max(initial=-1)) + 1
+        inside = (self.hours >= first_hour) & (self.hours < end_hour)
+        groups, first, inverse = np.unique(self._keys(dims, hours=np.zeros(len(self), "int64"))[inside],
+                                           return_index=True, return_inverse=True)
+        matrix = np.full((len(groups), max(end_hour - first_hour, 0)), np.nan, dtype="float32")
+        matrix[inverse, self.hours[inside] - first_hour] = self.values[value][inside]
+        rows = np.flatnonzero(inside)[first]
+        labels = pd.DataFrame({name: self.dims[name][rows] for name in dims})
+        return labels, np.arange(first_hour, end_hour, dtype="int64"), matrix
@@ -1,31 +1,78 @@
+# Annotations stay strings, so numpy and pandas are only imported once a frame is built
+from __future__ import annotations
+
+import asyncio
 import requests
-import pandas as pd
-import time
-from typing import Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import logging
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-mail = os.getenv("EMAIL")
+from data_collectors.config import get_setting
+from data_collectors.engine import CollectorEngine, get_engine
+from data_collectors.gridpoint_index import GridpointIndex
+from data_collectors.http_cache import ResponseCache
+from data_collectors.sites import Site, SiteRegistry
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Numeric forecast columns pivoted into the wide site frame
+WIDE_FORECAST_COLUMNS = ['temperature_c', 'wind_speed_ms']
+
 
 
 class NOAACollector:
     """Collector for NOAA/NWS data"""
-    def __init__(self):
+    def __init__(self, cache=None, requests_per_second: float = 5.0, burst: int = 10,
+                 engine: Optional[CollectorEngine] = None,
+                 gridpoint_index: Optional[GridpointIndex] = None,
+                 response_cache: Optional[ResponseCache] = None):
         self.base_url = "https://api.weather.gov"
-        self.session = requests.Session()
+        # Requests go through the shared engine, which keeps one pooled session per host
+        self.engine = engine or get_engine()
+        self.session = self.engine.register(self.base_url, requests_per_second=requests_per_second,
+                                            burst=burst)
         # Set User-Agent as required by NWS API
         self.session.headers.update({
-            'User-Agent': f'VARtigrate/1.0 ({mail})'
+            'User-Agent': f'VARtigrate/1.0 ({get_setting("EMAIL")})'
         })
+        # Optional data_collectors.cache.SeriesCache; forecasts are stored per gridpoint
+        self.cache = cache
+        # Optional persistent coordinate -> gridpoint lookup, skips the /points call when warm
+        self.gridpoint_index = gridpoint_index
+        # Optional HTTP cache; unchanged forecasts are answered with a 304 and not parsed again
+        self.response_cache = response_cache
     
     def get_gridpoint(self, lat: float, lon: float) -> Tuple[str, int, int]:
         """Get NWS point for coordinates"""
+        return self.engine.run(self.get_gridpoint_async(lat, lon))
+
+    async def get_gridpoint_async(self, lat: float, lon: float) -> Tuple[str, int, int]:
+        """Get NWS point for coordinates"""
+        if self.gridpoint_index is not None:
+            gridpoint = self.gridpoint_index.get(lat, lon)
+            if gridpoint is not None:
+                return gridpoint
+            gridpoint = await self._fetch_gridpoint(lat, lon)
+            self.gridpoint_index.put(lat, lon, gridpoint)
+            return gridpoint
+        return await self._fetch_gridpoint(lat, lon)
+
+    def warm_gridpoints(self, locations: List[Tuple[float, float]]) -> int:
+        """Resolve and store gridpoints for many sites at once. Returns how many were fetched"""
+        if self.gridpoint_index is None:
+            raise ValueError("NOAACollector was created without a gridpoint index.")
+        missing = [(lat, lon) for lat, lon in locations if self.gridpoint_index.get(lat, lon) is None]
+        self.engine.gather([self.get_gridpoint_async(lat, lon) for lat, lon in missing])
+        self.gridpoint_index.save()
+        return len(missing)
+
+    async def _fetch_gridpoint(self, lat: float, lon: float) -> Tuple[str, int, int]:
+        """Look up the NWS point for coordinates through the /points endpoint"""
+        event = self.engine.start_event("nws", "points")
         try:
-            response = self.session.get(f"{self.base_url}/points/{lat},{lon}")
+            response = await self.engine.request("GET", f"{self.base_url}/points/{lat},{lon}", event=event)
             response.raise_for_status()
             data = response.json()
             
@@ -38,48 +85,130 @@ class NOAACollector:
             
         except requests.exceptions.RequestException as e:
             logger.error(f"NOAA gridpoint request failed: {e}")
+            if event is not None:
+                event["error"] = event["error"] or str(e)
             raise
+        finally:
+            self.engine.finish_event(event)
     
     def get_forecast(self, lat: float, lon: float) -> pd.DataFrame:
         """Get 7-day hourly forecast from NOAA"""
+        df = self.engine.run(self.get_forecast_async(lat, lon))
+        if self.gridpoint_index is not None:
+            self.gridpoint_index.save()
+        return df
+
+    def get_forecasts(self, locations: List[Tuple[float, float]]) -> pd.DataFrame:
+        """Get hourly forecasts for many (lat, lon) locations at once, as one frame"""
+        import pandas as pd
+
+        frames = self.engine.gather([self.get_forecast_async(lat, lon) for lat, lon in locations])
+        if self.gridpoint_index is not None:
+            self.gridpoint_index.save()
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    async def get_forecast_async(self, lat: float, lon: float) -> pd.DataFrame:
+        """Get 7-day hourly forecast from NOAA"""
+        office, grid_x, grid_y = await self.get_gridpoint_async(lat, lon)
+        cell, downloaded = await self._fetch_cell_forecast(office, grid_x, grid_y)
+
+        df = cell.assign(latitude=lat, longitude=lon)
+        if self.cache is not None and downloaded:
+            # Newer forecasts replace the cached values for the hours they cover
+            await asyncio.to_thread(self.cache.write, self.forecast_key(office, grid_x, grid_y), df,
+                                    keys=['timestamp', 'latitude', 'longitude'])
+        return df
+
+    def get_site_forecasts(self, registry: SiteRegistry, wide: bool = False) -> pd.DataFrame:
+        """Get hourly forecasts for every site in a registry, fetching each NWS gridpoint once
+
+        The long frame has one row per site and hour with a 'site' column. The wide
+        frame is indexed by timestamp with a '<site> <column>' column per site for
+        each of WIDE_FORECAST_COLUMNS.
+        """
+        df = self.engine.run(self.get_site_forecasts_async(registry))
+        if self.gridpoint_index is not None:
+            self.gridpoint_index.save()
+        return wide_site_forecasts(df) if wide else df
+
+    async def get_site_forecasts_async(self, registry: SiteRegistry) -> pd.DataFrame:
+        """Get hourly forecasts for every site in a registry, fetching each NWS gridpoint once"""
+        import pandas as pd
+
+        # Gridpoints stay on the registry, so refreshes only look up sites added since the last one
+        coordinates = registry.unresolved()
+        gridpoints = await asyncio.gather(*(self.get_gridpoint_async(lat, lon) for lat, lon in coordinates))
+        registry.resolve(dict(zip(coordinates, gridpoints)))
+        groups = registry.by_gridpoint()
+        frames = await asyncio.gather(*(self._cell_forecast_async(gridpoint, sites)
+                                        for gridpoint, sites in groups.items()))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    async def _cell_forecast_async(self, gridpoint: Tuple[str, int, int], sites: List[Site]) -> pd.DataFrame:
+        """Fetch one gridpoint's forecast and repeat it for each site in the cell"""
+        import numpy as np
+
+        cell, downloaded = await self._fetch_cell_forecast(*gridpoint)
+        hours = len(cell)
+        df = cell.iloc[np.tile(np.arange(hours), len(sites))].reset_index(drop=True)
+        df['latitude'] = np.repeat([site.latitude for site in sites], hours)
+        df['longitude'] = np.repeat([site.longitude for site in sites], hours)
+        df.insert(0, 'site', np.repeat([site.name for site in sites], hours))
+        if self.cache is not None and downloaded:
+            await asyncio.to_thread(self.cache.write, self.forecast_key(*gridpoint), df.drop(columns='site'),
+                                    keys=['timestamp', 'latitude', 'longitude'])
+        return df
+
+    async def _fetch_cell_forecast(self, office: str, grid_x: int, grid_y: int) -> Tuple[pd.DataFrame, bool]:
+        """Get the hourly forecast frame of a gridpoint, without coordinates
+
+        Returns the frame and whether it was downloaded. With a response cache, an
+        unexpired forecast is returned without a request and an unchanged one after
+        a 304; the cached frame is shared, so callers copy it before modifying it.
+        """
+        url = f"{self.base_url}/gridpoints/{office}/{grid_x},{grid_y}/forecast/hourly"
+        entry = self.response_cache.get(url) if self.response_cache is not None else None
+        if entry is not None and entry.is_fresh():
+            return entry.value, False
+
+        event = self.engine.start_event("nws", "forecast/hourly")
         try:
-            office, grid_x, grid_y = self.get_gridpoint(lat, lon)
-            time.sleep(0.5)  # Rate limiting
-            
-            # Get hourly forecast
-            response = self.session.get(
-                f"{self.base_url}/gridpoints/{office}/{grid_x},{grid_y}/forecast/hourly"
-            )
-            print(response.url)  # For debugging
+            # Get hourly forecast, conditional on the cached validators
+            headers = entry.validators() if entry is not None else {}
+            response = await self.engine.request("GET", url, event=event, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                self.response_cache.revalidate(url, entry, response)
+                return entry.value, False
             response.raise_for_status()
-            data = response.json()
-
-            records = []
-            for period in data['properties']['periods']:
-                records.append({
-                    'timestamp': pd.to_datetime(period['startTime']),
-                    'latitude': lat,
-                    'longitude': lon,
-                    'temperature_c': (period['temperature'] - 32) * 5/9 if period['temperatureUnit'] == 'F' else period['temperature'],
-                    'wind_speed_ms': self._parse_wind_speed(period.get('windSpeed', '0 mph')),
-                    'wind_direction': period.get('windDirection', 'N'),
-                    'forecast_text': period.get('shortForecast', ''),
-                    'data_source': 'NOAA'
-                })
-            
-            return pd.DataFrame(records)
-            
+            periods = response.json()['properties']['periods']
+            if event is not None:
+                event["rows"] = len(periods)
         except requests.exceptions.RequestException as e:
             logger.error(f"NOAA forecast request failed: {e}")
+            if event is not None:
+                event["error"] = event["error"] or str(e)
             raise
+        finally:
+            self.engine.finish_event(event)
+
+        from data_collectors.parsing import nws_forecast_frame
+
+        cell = nws_forecast_frame(periods, float('nan'), float('nan'))
+        if self.response_cache is not None:
+            self.response_cache.put(url, response, cell)
+        return cell, True
     
-    def _parse_wind_speed(self, wind_speed_str: str) -> float:
-        """Parse wind speed string like '10 mph' to m/s"""
-        try:
-            speed_mph = float(wind_speed_str.split()[0])
-            return speed_mph * 0.44704  # Convert mph to m/s
-        except (ValueError, IndexError):
-            return 0.0
+    @staticmethod
+    def forecast_key(office: str, grid_x: int, grid_y: int) -> str:
+        """Cache key of the hourly forecast series for a gridpoint"""
+        return f"noaa/forecast-hourly/{office}/{grid_x}_{grid_y}"
+
+
+def wide_site_forecasts(df: pd.DataFrame) -> pd.DataFrame:
+    """Pivot a long site forecast frame to one row per hour and '<site> <column>' columns"""
+    wide = df.pivot(index='timestamp', columns='site', values=WIDE_FORECAST_COLUMNS)
+    wide.columns = [f"{site} {column}" for column, site in wide.columns]
+    return wide
 
 
 
@@ -93,5 +222,14 @@ def main():
     noaa_forecast_df = noaa.get_forecast(lat, lon)
     print(noaa_forecast_df)
 
+    # Several sites at once; sites sharing a gridpoint cost one forecast request
+    print("\n=== NOAA Site Forecasts ===")
+    sites = SiteRegistry([
+        Site("Sacramento", 38.5816, -121.4944),
+        Site("San Jose", 37.3382, -121.8863),
+        Site("New York", lat, lon),
+    ])
+    print(noaa.get_site_forecasts(sites, wide=True))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
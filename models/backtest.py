@@ -0,0 +1,221 @@
+#backtest
+#rolling-origin cross-validation over the hourly history, with folds fitted in parallel processes
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METRICS = ["mae", "rmse", "mape", "r2"]
+TIMINGS = ["fit_s", "predict_s"]
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Row ranges of one fold: train on [train_start, train_end), test on [test_start, test_end)."""
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def rolling_origin_folds(n_samples: int, horizon: int, initial: int, step: Optional[int] = None,
+                         window: str = "expanding", train_size: Optional[int] = None,
+                         gap: int = 0, n_folds: Optional[int] = None) -> List[Fold]:
+    """Forecast origins moving forward through the history.
+
+    The first test block starts after ``initial`` rows and each following one
+    ``step`` rows later. Folds are anchored at the start of the data, so
+    appending new hours adds folds without moving the existing ones, which
+    keeps their cached results valid.
+
+    :param n_samples: Rows in the history, oldest first.
+    :param horizon: Rows in each test block, e.g. 168 for a week of hours.
+    :param initial: Rows before the first origin.
+    :param step: Rows between origins, defaults to horizon.
+    :param window: 'expanding' trains on all rows before the origin, 'rolling'
+        on the last ``train_size`` of them.
+    :param gap: Rows skipped between training and test, e.g. to match lag features.
+    :param n_folds: Keep only the most recent folds.
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown window '{window}', expected 'expanding' or 'rolling'.")
+    if window == "rolling" and not train_size:
+        raise ValueError("A rolling window needs a train_size.")
+    step = step or horizon
+    origins = range(initial + gap, n_samples - horizon + 1, step)
+    folds = []
+    for index, test_start in enumerate(origins):
+        train_end = test_start - gap
+        train_start = max(0, train_end - train_size) if window == "rolling" else 0
+        folds.append(Fold(index, train_start, train_end, test_start, test_start + horizon))
+    return folds[-n_folds:] if n_folds else folds
+
+
+def score(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """Error metrics of one test block."""
+    y_true, y_pred = np.ravel(y_true), np.ravel(y_pred)
+    errors = y_pred - y_true
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    nonzero = y_true != 0
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors ** 2).mean())),
+        "mape": float(np.abs(errors[nonzero] / y_true[nonzero]).mean()) if nonzero.any() else float("nan"),
+        "r2": float(1 - (errors ** 2).sum() / total) if total > 0 else float("nan"),
+    }
+
+
+# Arrays shared with this process, attached once per worker: name -> (SharedMemory, array)
+_shared: Dict[str, Tuple[Optional[shared_memory.SharedMemory], np.ndarray]] = {}
+
+
+def _attach(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]):
+    """Pool initializer: map the parent's shared blocks as arrays, without copying them."""
+    for name, (block, shape, dtype) in specs.items():
+        memory = shared_memory.SharedMemory(name=block)
+        _shared[name] = (memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+
+
+def _fit_fold(model, fold: Fold) -> Dict[str, float]:
+    X, y = _shared["X"][1], _shared["y"][1]
+    estimator = copy.deepcopy(model)
+    started = time.perf_counter()
+    estimator.fit(X[fold.train_start:fold.train_end], y[fold.train_start:fold.train_end])
+    fitted = time.perf_counter()
+    predictions = estimator.predict(X[fold.test_start:fold.test_end])
+    predicted = time.perf_counter()
+    metrics = score(y[fold.test_start:fold.test_end], predictions)
+    metrics.update(fit_s=fitted - started, predict_s=predicted - fitted)
+    return metrics
+
+
+class Backtester:
+    """Evaluates models on rolling-origin folds of one feature matrix.
+
+    The feature matrix and target are copied once into shared memory; pool
+    workers map them as NumPy arrays, so each task only ships a model and
+    a pair of row ranges. Models are anything with scikit-learn style
+    fit(X, y) and predict(X) and must be picklable; every fold fits a fresh
+    deep copy.
+
+    With a cache directory, each fold's metrics and timings are stored under
+    a hash of the model, the fold's row ranges and the data in them. Rerunning
+    after adding hours or another model only fits the new combinations.
+    """
+
+    def __init__(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray],
+                 folds: List[Fold], max_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        self.X = np.ascontiguousarray(X.to_numpy(dtype=float) if isinstance(X, pd.DataFrame) else X, dtype=float)
+        self.y = np.ascontiguousarray(np.ravel(y), dtype=float)
+        if len(self.X) != len(self.y):
+            raise ValueError(f"X has {len(self.X)} rows but y has {len(self.y)}.")
+        self.columns = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        self.folds = folds
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, model_bytes: bytes, fold: Fold) -> str:
+        digest = hashlib.blake2b(model_bytes, digest_size=16)
+        digest.update(json.dumps([fold.train_start, fold.train_end, fold.test_start, fold.test_end,
+                                  self.columns]).encode())
+        rows = slice(min(fold.train_start, fold.test_start), max(fold.train_end, fold.test_end))
+        digest.update(self.X[rows].tobytes())
+        digest.update(self.y[rows].tobytes())
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, float]]:
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _store(self, key: str, metrics: Dict[str, float]):
+        path = self._cache_path(key)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(metrics, f)
+        os.replace(f"{path}.tmp", path)
+
+    def run(self, models: Dict[str, object]) -> pd.DataFrame:
+        """Fit and score every model on every fold.
+
+        :param models: Name -> unfitted estimator.
+        :return: One row per model and fold with the fold ranges, METRICS,
+            TIMINGS and whether the row came from the cache.
+        """
+        rows, keys, todo = [], [], []
+        for name, model in models.items():
+            # Hashing the fold data is only worth it when there is a cache to look in
+            model_bytes = pickle.dumps(model) if self.cache_dir else None
+            for fold in self.folds:
+                row = dict(model=name, **asdict(fold), cached=False)
+                key = self._key(model_bytes, fold) if self.cache_dir else None
+                cached = self._load(key) if key else None
+                if cached is not None:
+                    row.update(cached, cached=True)
+                else:
+                    todo.append((len(rows), model))
+                rows.append(row)
+                keys.append(key)
+        logger.info(f"Backtest: {len(rows)} model-folds, {len(todo)} to fit")
+
+        if todo:
+            for (position, _), metrics in zip(todo, self._fit_all(todo, rows)):
+                rows[position].update(metrics)
+                if keys[position]:
+                    self._store(keys[position], metrics)
+
+        results = pd.DataFrame(rows)
+        return results[["model", "index", "train_start", "train_end", "test_start", "test_end",
+                        *METRICS, *TIMINGS, "cached"]].rename(columns={"index": "fold"})
+
+    def _fit_all(self, todo: List[Tuple[int, object]], rows: List[Dict]) -> List[Dict[str, float]]:
+        folds = {fold.index: fold for fold in self.folds}
+        tasks = [(model, folds[rows[position]["index"]]) for position, model in todo]
+        if self.max_workers == 1:
+            _shared.update(X=(None, self.X), y=(None, self.y))
+            try:
+                return [_fit_fold(model, fold) for model, fold in tasks]
+            finally:
+                _shared.clear()
+
+        blocks = []
+        try:
+            specs = {}
+            for name, array in (("X", self.X), ("y", self.y)):
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                     initializer=_attach, initargs=(specs,)) as pool:
+                return list(pool.map(_fit_fold, *zip(*tasks)))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Mean metrics and timings per model, best RMSE first."""
+    return results.groupby("model")[METRICS + TIMINGS].mean().sort_values("rmse")
@@ -0,0 +1,190 @@
+#dispatch
+#renewable dispatch over a forecast horizon, solved for every region and hour as one linear program
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+
+# Per region-hour quantities in a plan
+VARIABLES = ["used_mw", "charge_mw", "discharge_mw", "curtailed_mw", "residual_mw", "soc_mwh"]
+
+# Per-region storage settings plan_dispatch reads from the storage frame, with their defaults
+STORAGE_DEFAULTS = {"charge_efficiency": 0.95, "discharge_efficiency": 0.95, "initial_soc": 0.5}
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+@dataclass
+class DispatchPlan:
+    """Hourly allocation for each region; every array is (regions, hours).
+
+    used_mw: renewable output serving load directly.
+    charge_mw / discharge_mw: storage flows.
+    curtailed_mw: renewable output that is spilled.
+    residual_mw: demand left for other generation or imports.
+    soc_mwh: storage state of charge at the end of each hour.
+    """
+    regions: List[str]
+    timestamps: pd.DatetimeIndex
+    used_mw: np.ndarray
+    charge_mw: np.ndarray
+    discharge_mw: np.ndarray
+    curtailed_mw: np.ndarray
+    residual_mw: np.ndarray
+    soc_mwh: np.ndarray
+    cost: float
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long frame with one row per region and hour."""
+        n_regions, n_hours = self.used_mw.shape
+        df = pd.DataFrame({
+            "region": np.repeat(self.regions, n_hours),
+            "timestamp": np.tile(self.timestamps, n_regions),
+        })
+        for name in VARIABLES:
+            df[name] = getattr(self, name).ravel()
+        return df
+
+
+def _per_region(value: ArrayLike, n_regions: int, name: str) -> np.ndarray:
+    values = np.asarray(value, dtype=float)
+    try:
+        return np.broadcast_to(values, (n_regions,)).copy()
+    except ValueError:
+        raise ValueError(f"{name} must be a scalar or have one value per region, got shape {values.shape}.")
+
+
+def solve_dispatch(renewable_mw: np.ndarray, demand_mw: np.ndarray,
+                   storage_energy_mwh: ArrayLike = 0.0, storage_power_mw: ArrayLike = 0.0,
+                   charge_efficiency: ArrayLike = STORAGE_DEFAULTS["charge_efficiency"],
+                   discharge_efficiency: ArrayLike = STORAGE_DEFAULTS["discharge_efficiency"],
+                   initial_soc: ArrayLike = STORAGE_DEFAULTS["initial_soc"], residual_cost: float = 1.0,
+                   curtailment_cost: float = 0.0, cycling_cost: float = 1e-4,
+                   hours_per_step: float = 1.0, regions: Optional[List[str]] = None,
+                   timestamps: Optional[pd.DatetimeIndex] = None) -> DispatchPlan:
+    """Allocate forecast renewable output against forecast demand for all regions at once.
+
+    Each region-hour balances ``renewable = used + charge + curtailed`` and
+    ``demand = used + discharge + residual``; storage carries energy between
+    hours with the given efficiencies and power/energy limits and must end
+    the horizon at least as full as it started. The objective minimizes
+    residual generation, plus optional curtailment and a small cycling cost
+    that keeps storage idle when it does not help. All regions and hours
+    are one sparse LP solved by HiGHS, built without Python loops.
+
+    :param renewable_mw: Solar + wind forecast, shape (regions, hours).
+    :param demand_mw: Demand forecast, same shape.
+    :param storage_energy_mwh: Storage capacity per region (scalar or per region).
+    :param storage_power_mw: Charge/discharge limit per region.
+    :param charge_efficiency: Fraction of charged energy that is stored.
+    :param discharge_efficiency: Fraction of stored energy delivered on discharge.
+    :param initial_soc: Starting state of charge as a fraction of capacity.
+    :param hours_per_step: Length of one step in hours.
+    :return: DispatchPlan with the optimal allocation.
+    """
+    renewable = np.atleast_2d(np.asarray(renewable_mw, dtype=float))
+    demand = np.atleast_2d(np.asarray(demand_mw, dtype=float))
+    if renewable.shape != demand.shape:
+        raise ValueError(f"Renewable and demand forecasts differ in shape: {renewable.shape} vs {demand.shape}.")
+    if np.isnan(renewable).any() or np.isnan(demand).any():
+        raise ValueError("Forecasts contain missing values.")
+    n_regions, n_hours = renewable.shape
+    n = n_regions * n_hours
+
+    energy = _per_region(storage_energy_mwh, n_regions, "storage_energy_mwh")
+    power = _per_region(storage_power_mw, n_regions, "storage_power_mw")
+    eta_c = _per_region(charge_efficiency, n_regions, "charge_efficiency")
+    eta_d = _per_region(discharge_efficiency, n_regions, "discharge_efficiency")
+    soc0 = _per_region(initial_soc, n_regions, "initial_soc") * energy
+
+    if ((eta_c <= 0) | (eta_c > 1) | (eta_d <= 0) | (eta_d > 1)).any():
+        raise ValueError("Storage efficiencies must be in (0, 1].")
+
+    # With efficiencies <= 1, sending energy through storage within an hour never
+    # beats using it directly, so direct use is min(renewable, demand); only the
+    # surplus can charge and only the deficit can be discharged against. That
+    # leaves charge, discharge and state of charge as the LP variables.
+    used = np.minimum(renewable, demand)
+    surplus = (renewable - used).ravel()
+    deficit = (demand - used).ravel()
+
+    # soc[t] - soc[t-1] - eta_c * charge * dt + discharge * dt / eta_d = 0 within each
+    # region; the first hour's soc[t-1] is soc0 on the right-hand side
+    step = sparse.identity(n_hours) - sparse.eye(n_hours, k=-1)
+    a_eq = sparse.hstack([
+        sparse.diags(-np.repeat(eta_c, n_hours) * hours_per_step),
+        sparse.diags(np.repeat(1.0 / eta_d, n_hours) * hours_per_step),
+        sparse.kron(sparse.identity(n_regions), step),
+    ], format="csr")
+    b_eq = np.zeros((n_regions, n_hours))
+    b_eq[:, 0] = soc0
+
+    power_bound = np.repeat(power, n_hours)
+    # Storage has to end the horizon at least as full as it started
+    soc_lower = np.zeros((n_regions, n_hours))
+    soc_lower[:, -1] = soc0
+    lower = np.concatenate([np.zeros(2 * n), soc_lower.ravel()])
+    upper = np.concatenate([np.minimum(surplus, power_bound), np.minimum(deficit, power_bound),
+                            np.repeat(energy, n_hours)])
+    # Charging avoids curtailment and discharging avoids residual generation
+    cost = np.concatenate([np.full(n, cycling_cost - curtailment_cost),
+                           np.full(n, cycling_cost - residual_cost), np.zeros(n)]) * hours_per_step
+
+    result = linprog(cost, A_eq=a_eq, b_eq=b_eq.ravel(), bounds=np.column_stack([lower, upper]),
+                     method="highs")
+    if result.status != 0:
+        raise RuntimeError(f"Dispatch optimization failed: {result.message}")
+
+    charge, discharge, soc = np.clip(result.x, 0.0, None).reshape(3, n_regions, n_hours)
+    curtailed = surplus.reshape(n_regions, n_hours) - charge
+    residual = deficit.reshape(n_regions, n_hours) - discharge
+    total = (residual_cost * residual.sum() + curtailment_cost * curtailed.sum()
+             + cycling_cost * (charge.sum() + discharge.sum())) * hours_per_step
+    if timestamps is None:
+        timestamps = pd.RangeIndex(n_hours)
+    return DispatchPlan(
+        regions=list(regions) if regions is not None else [str(i) for i in range(n_regions)],
+        timestamps=timestamps,
+        used_mw=used, charge_mw=charge, discharge_mw=discharge,
+        curtailed_mw=np.clip(curtailed, 0.0, None), residual_mw=np.clip(residual, 0.0, None),
+        soc_mwh=soc, cost=float(total),
+    )
+
+
+def plan_dispatch(forecasts: pd.DataFrame, storage: Optional[pd.DataFrame] = None,
+                  renewable_columns: Sequence[str] = ("solar_mw", "wind_mw"),
+                  demand_column: str = "demand_mw", **kwargs) -> DispatchPlan:
+    """Plan dispatch from the long forecast frame the models produce.
+
+    :param forecasts: One row per region and hour with 'region', 'timestamp',
+        the demand column and any of the renewable columns.
+    :param storage: Optional frame indexed by region with energy_mwh and
+        power_mw (and optionally charge_efficiency, discharge_efficiency,
+        initial_soc); regions without a row have no storage.
+    :param kwargs: Passed on to solve_dispatch, e.g. curtailment_cost.
+    """
+    renewable_columns = [column for column in renewable_columns if column in forecasts]
+    if not renewable_columns:
+        raise ValueError("Forecasts have none of the renewable columns.")
+    wide = (forecasts.groupby(["region", "timestamp"])[[demand_column, *renewable_columns]]
+            .sum(min_count=1).unstack("timestamp"))
+    demand = wide[demand_column]
+    if demand.isna().to_numpy().any():
+        raise ValueError("Demand forecast is missing for some region-hours.")
+    renewable = sum(wide[column].fillna(0.0).to_numpy() for column in renewable_columns)
+
+    regions = list(demand.index)
+    options: Dict = dict(kwargs)
+    if storage is not None:
+        storage = storage.reindex(regions)
+        options["storage_energy_mwh"] = storage["energy_mwh"].fillna(0.0).to_numpy()
+        options["storage_power_mw"] = storage["power_mw"].fillna(0.0).to_numpy()
+        for column, default in STORAGE_DEFAULTS.items():
+            if column in storage:
+                options[column] = storage[column].fillna(options.get(column, default)).to_numpy()
+    return solve_dispatch(renewable, demand.to_numpy(), regions=regions,
+                          timestamps=pd.DatetimeIndex(demand.columns), **options)
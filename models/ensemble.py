@@ -0,0 +1,197 @@
+#ensemble
+#weighted scoring across several models at once, with predictions memoized per batch and model version
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+Batch = Union[pd.DataFrame, np.ndarray]
+
+
+def batch_hash(X: Batch) -> str:
+    """Digest of a feature batch: its values, shape and column names."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(X, pd.DataFrame):
+        digest.update(repr(list(X.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    else:
+        X = np.ascontiguousarray(X)
+        digest.update(f"{X.shape}{X.dtype}".encode())
+        digest.update(X.tobytes())
+    return digest.hexdigest()
+
+
+def model_version(model) -> str:
+    """The model's own ``version`` attribute, else a digest of its pickled state."""
+    version = getattr(model, "version", None)
+    if version is not None:
+        return str(version)
+    return hashlib.blake2b(pickle.dumps(model), digest_size=8).hexdigest()
+
+
+# Members of the ensemble in a process pool worker, set once by the initializer
+_worker_members: Dict[str, object] = {}
+
+
+def _init_worker(members: Dict[str, object]):
+    _worker_members.update(members)
+
+
+def _score_in_worker(name: str, X: Batch) -> np.ndarray:
+    return np.ravel(_worker_members[name].predict(X))
+
+
+class Ensemble:
+    """Scores a batch with several models in parallel and combines them by weight.
+
+    Members are anything with predict(X): the folded QuadraticModel, a
+    version from the online ArtifactStore, or pickled scikit-learn/XGBoost
+    estimators added with add_artifact(). They run on a thread pool by
+    default, which scales because NumPy and XGBoost release the GIL; pass
+    ``processes=True`` for pure-Python models, in which case members are
+    pickled to the workers once when the pool starts.
+
+    Each member's predictions are memoized in an LRU keyed by the member's
+    version and a hash of the feature batch, so a repeated dashboard query
+    is answered without scoring, and replacing one member only rescores
+    that member.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, processes: bool = False,
+                 cache_size: int = 256):
+        self.max_workers = max_workers
+        self.processes = processes
+        self.cache_size = cache_size
+        self.members: Dict[str, object] = {}
+        self.weights: Dict[str, float] = {}
+        self.versions: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    def add(self, name: str, model, weight: float = 1.0, version: Optional[str] = None) -> "Ensemble":
+        """Add or replace a member. Its version defaults to model_version(model)."""
+        if weight < 0:
+            raise ValueError(f"Weight of '{name}' must not be negative.")
+        with self._lock:
+            self.members[name] = model
+            self.weights[name] = float(weight)
+            self.versions[name] = version or model_version(model)
+            self._reset_executor()
+        return self
+
+    def add_artifact(self, name: str, path: str, weight: float = 1.0) -> "Ensemble":
+        """Add a pickled estimator; the digest of the file is its version."""
+        import joblib
+
+        with open(path, "rb") as f:
+            version = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+        return self.add(name, joblib.load(path), weight=weight, version=version)
+
+    def set_weights(self, weights: Dict[str, float]):
+        """Change the combination weights; cached member predictions stay valid."""
+        unknown = [name for name in weights if name not in self.members]
+        if unknown:
+            raise ValueError(f"Unknown ensemble members: {unknown}")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Weights must not be negative.")
+        self.weights.update({name: float(weight) for name, weight in weights.items()})
+
+    def remove(self, name: str):
+        with self._lock:
+            del self.members[name], self.weights[name], self.versions[name]
+            self._reset_executor()
+
+    def _reset_executor(self):
+        # Sized for the members, and process workers hold copies of them, so restart on change
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _pool(self) -> Executor:
+        # Called with the lock held, so process workers start with the caller's snapshot
+        if self._executor is None:
+            workers = self.max_workers or min(len(self.members), os.cpu_count() or 1)
+            if self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                     initargs=(dict(self.members),))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ensemble")
+        return self._executor
+
+    def _submit(self, pool: Executor, model, name: str, X: Batch):
+        if self.processes:
+            return pool.submit(_score_in_worker, name, X)
+        return pool.submit(lambda: np.ravel(model.predict(X)))
+
+    def predict_members(self, X: Batch) -> Dict[str, np.ndarray]:
+        """Each member's predictions for the batch, from the cache where possible."""
+        digest = batch_hash(X)
+        results, missing, futures = {}, [], {}
+        with self._lock:
+            # Members may be added or replaced while this batch is scored; stick to this snapshot
+            members = dict(self.members)
+            if not members:
+                raise ValueError("The ensemble has no members.")
+            keys = {name: (name, self.versions[name], digest) for name in members}
+            for name, key in keys.items():
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[name] = self._cache[key]
+                    self.hits += 1
+                else:
+                    missing.append(name)
+                    self.misses += 1
+            if len(missing) > 1:
+                # Submitted under the lock, before add() or remove() can shut this pool down
+                pool = self._pool()
+                futures = {name: self._submit(pool, members[name], name, X) for name in missing}
+
+        if len(missing) == 1:
+            results[missing[0]] = np.ravel(members[missing[0]].predict(X))
+        results.update({name: future.result() for name, future in futures.items()})
+
+        with self._lock:
+            for name in missing:
+                results[name].setflags(write=False)
+                self._cache[keys[name]] = results[name]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {name: results[name] for name in members}
+
+    def predict(self, X: Batch) -> np.ndarray:
+        """Weighted mean of the member predictions."""
+        members = self.predict_members(X)
+        # A member removed since scoring started no longer counts
+        weights = {name: self.weights.get(name, 0.0) for name in members}
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError("Ensemble weights sum to zero.")
+        return sum(weights[name] / total * prediction for name, prediction in members.items())
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "Ensemble":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,163 @@
+#feature store
+#model inputs per (site, forecast hour), recomputed only for the hours whose forecast changed
+
+import threading
+from functools import partial
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.scripts.pipeline import add_calendar_features
+from data_collectors.timeseries import epoch_hours, hour_timestamps
+
+# Forecast columns that feed the features by default; their values decide whether an hour changed
+DEFAULT_INPUTS = ["temperature_c", "wind_speed_ms"]
+CALENDAR_FEATURES = ["hour", "Day of Week", "Month", "Holiday"]
+
+# Keys pack the site code above the epoch hour
+_SITE_SHIFT = np.int64(2 ** 32)
+
+
+def forecast_features(df: pd.DataFrame, inputs: Sequence[str] = DEFAULT_INPUTS,
+                      tz: str = "America/Los_Angeles") -> pd.DataFrame:
+    """Raw features of forecast rows: the input columns plus calendar flags in local time."""
+    calendar = add_calendar_features(
+        pd.DataFrame({"time": pd.to_datetime(df["timestamp"], utc=True).dt.tz_convert(tz)}), "time")
+    features = df[list(inputs)].astype(float).reset_index(drop=True)
+    for column in CALENDAR_FEATURES:
+        features[column] = calendar[column].to_numpy()
+    return features
+
+
+class ForecastFeatureStore:
+    """Transformed model inputs for every (site, forecast hour), ready to score.
+
+    ingest() takes the long frame NOAACollector.get_site_forecasts() returns.
+    Each row's input columns are hashed; only rows that are new or whose
+    inputs changed since the last ingest go through the feature builder and
+    the transform, and they overwrite their old vectors in place. Re-polling
+    an unchanged forecast therefore costs one hash per row, and an NWS update
+    that revises a few hours recomputes just those hours.
+
+    Vectors are kept as one float32 matrix sorted by (site, hour), so read()
+    is a slice rather than a rebuild. Values the features depend on besides
+    the forecast (e.g. lagged load) must be columns of the ingested frame and
+    listed in ``inputs`` so that changing them invalidates the hour.
+
+    :param transform: Applied to the raw feature matrix of changed rows, e.g. a
+        fitted scaler or CompactPolynomialFeatures: an object with transform()
+        or a callable.
+    :param inputs: Forecast columns the features are built from.
+    :param features: Builds the raw feature frame from forecast rows, by
+        default forecast_features() over ``inputs``.
+    """
+
+    def __init__(self, transform=None, inputs: Sequence[str] = DEFAULT_INPUTS,
+                 features: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 tz: str = "America/Los_Angeles"):
+        self.inputs = list(inputs)
+        self.features = features or partial(forecast_features, inputs=self.inputs, tz=tz)
+        self.transform = getattr(transform, "transform", transform)
+        self.feature_names: Optional[List[str]] = None
+        self.sites: List[str] = []
+        self._site_codes = {}
+        self._keys = np.empty(0, dtype="int64")
+        self._hashes = np.empty(0, dtype="uint64")
+        self._values: Optional[np.ndarray] = None
+        self.computed = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _site_code(self, names: np.ndarray) -> np.ndarray:
+        for name in pd.unique(names):
+            if name not in self._site_codes:
+                self._site_codes[name] = len(self.sites)
+                self.sites.append(name)
+        return pd.Series(names).map(self._site_codes).to_numpy(dtype="int64")
+
+    def ingest(self, forecast: pd.DataFrame) -> int:
+        """Store features for new or changed forecast hours.
+
+        :param forecast: One row per site and hour with 'site', 'timestamp' and the input columns.
+        :return: Number of rows recomputed.
+        """
+        if forecast.empty:
+            return 0
+        forecast = forecast.drop_duplicates(["site", "timestamp"], keep="last")
+        hashes = pd.util.hash_pandas_object(forecast[self.inputs], index=False).to_numpy()
+        with self._lock:
+            keys = self._site_code(forecast["site"].to_numpy()) * _SITE_SHIFT + epoch_hours(forecast["timestamp"])
+            position = np.searchsorted(self._keys, keys)
+            if len(self._keys):
+                position = np.minimum(position, len(self._keys) - 1)
+                found = self._keys[position] == keys
+                changed = ~found | (self._hashes[position] != hashes)
+            else:
+                found = np.zeros(len(keys), dtype=bool)
+                changed = ~found
+            self.reused += int((~changed).sum())
+            if not changed.any():
+                return 0
+
+            raw = self.features(forecast[changed])
+            if self.feature_names is None:
+                self.feature_names = list(raw.columns) if self.transform is None else None
+            values = raw.to_numpy(dtype=float)
+            if self.transform is not None:
+                values = self.transform(values)
+            values = np.asarray(values, dtype="float32")
+
+            update = found[changed]
+            targets = position[changed][update]
+            if self._values is None:
+                self._values = np.empty((0, values.shape[1]), dtype="float32")
+            self._values[targets] = values[update]
+            self._hashes[targets] = hashes[changed][update]
+
+            added = ~update
+            if added.any():
+                merged_keys = np.concatenate([self._keys, keys[changed][added]])
+                order = np.argsort(merged_keys, kind="stable")
+                self._keys = merged_keys[order]
+                self._hashes = np.concatenate([self._hashes, hashes[changed][added]])[order]
+                self._values = np.concatenate([self._values, values[added]])[order]
+            self.computed += int(changed.sum())
+            return int(changed.sum())
+
+    def read(self, sites: Optional[Sequence[str]] = None, start=None,
+             end=None) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Stored vectors for some sites and hours (start inclusive, end exclusive).
+
+        :return: A frame of site and timestamp (UTC) per row and the matching
+            float32 matrix, ordered by site then hour.
+        """
+        with self._lock:
+            codes = self._keys // _SITE_SHIFT
+            hours = self._keys % _SITE_SHIFT
+            mask = np.ones(len(self._keys), dtype=bool)
+            if sites is not None:
+                mask &= np.isin(codes, [self._site_codes[site] for site in sites if site in self._site_codes])
+            if start is not None:
+                mask &= hours >= epoch_hours([start])[0]
+            if end is not None:
+                mask &= hours < epoch_hours([end])[0]
+            values = self._values[mask] if self._values is not None else np.empty((0, 0), dtype="float32")
+            index = pd.DataFrame({
+                "site": np.asarray(self.sites, dtype=object)[codes[mask]] if self.sites else [],
+                "timestamp": hour_timestamps(hours[mask]),
+            })
+        return index, values
+
+    def evict(self, before) -> int:
+        """Drop hours before a time, e.g. once they are in the past. Returns rows removed."""
+        with self._lock:
+            keep = self._keys % _SITE_SHIFT >= epoch_hours([before])[0]
+            removed = int((~keep).sum())
+            if removed:
+                self._keys, self._hashes = self._keys[keep], self._hashes[keep]
+                self._values = self._values[keep]
+            return removed
@@ -0,0 +1,143 @@
+#inference
+#batch scoring for the pickled polynomial regression models, folded into one numpy evaluation
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from models.polynomial import selected_powers
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Artifacts saved by the notebooks for each model. The demand model was fit on a
+# standardized target, so its scaler is applied in reverse to get MW back. A model
+# trained on selected polynomial terms lists its fitted selector under 'selector'.
+ARTIFACTS = {
+    "demand": {
+        "transformer": "polynomial_features_transformer.pkl",
+        "model": "polynomial_regression_model.pkl",
+        "target_scaler": "polynomial_regression_scaler.pkl",
+    },
+    "renewable": {
+        "transformer": "polynomial_features_transformer_renewable.pkl",
+        "model": "polynomial_regression_model_renewable.pkl",
+    },
+}
+
+
+class QuadraticModel:
+    """A degree-2 polynomial regression folded into closed form.
+
+    PolynomialFeatures followed by LinearRegression computes
+    ``intercept + sum_k coef_k * prod_i x_i ** powers_ki``. With degree 2 that
+    is exactly ``c + x @ b + x @ Q @ x`` for a constant c, a vector b and an
+    upper-triangular matrix Q, so a batch is scored with two matrix products
+    and never builds the wide expanded feature matrix.
+    """
+
+    def __init__(self, feature_names: List[str], intercept: float, linear: np.ndarray,
+                 quadratic: np.ndarray, target_mean: float = 0.0, target_scale: float = 1.0):
+        self.feature_names = list(feature_names)
+        # Fold the target de-standardization into the coefficients
+        self.intercept = float(intercept) * target_scale + target_mean
+        self.linear = np.asarray(linear, dtype=float) * target_scale
+        self.quadratic = np.asarray(quadratic, dtype=float) * target_scale
+
+    @classmethod
+    def from_estimators(cls, transformer, model, target_scaler=None,
+                        selector=None) -> "QuadraticModel":
+        """Build from fitted PolynomialFeatures, LinearRegression and optional target StandardScaler.
+
+        When the model was trained on a selection of the polynomial terms, pass
+        the selector too; only its surviving terms get coefficients.
+        """
+        powers = selected_powers(transformer, selector)
+        if powers.sum(axis=1).max() > 2:
+            raise ValueError("QuadraticModel only supports polynomial features up to degree 2.")
+        coef = np.ravel(model.coef_)
+        if len(coef) != len(powers):
+            raise ValueError(f"Model has {len(coef)} coefficients for {len(powers)} polynomial terms.")
+        n_features = powers.shape[1]
+
+        intercept = float(np.ravel(model.intercept_)[0])
+        linear = np.zeros(n_features)
+        quadratic = np.zeros((n_features, n_features))
+        for term, weight in zip(powers, coef):
+            variables = np.flatnonzero(term)
+            degree = term.sum()
+            if degree == 0:
+                intercept += weight
+            elif degree == 1:
+                linear[variables[0]] += weight
+            elif len(variables) == 1:
+                quadratic[variables[0], variables[0]] += weight
+            else:
+                quadratic[variables[0], variables[1]] += weight
+
+        names = getattr(transformer, "feature_names_in_", None)
+        if names is None:
+            names = [f"x{i}" for i in range(n_features)]
+        mean, scale = 0.0, 1.0
+        if target_scaler is not None:
+            mean, scale = float(target_scaler.mean_[0]), float(target_scaler.scale_[0])
+        return cls(names, intercept, linear, quadratic, target_mean=mean, target_scale=scale)
+
+    def _matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            missing = [name for name in self.feature_names if name not in X.columns]
+            if missing:
+                raise ValueError(f"Missing model features: {missing}")
+            X = X[self.feature_names].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}.")
+        return X
+
+    def predict(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Score a batch of rows. DataFrames are matched to the training columns by name."""
+        X = self._matrix(X)
+        return self.intercept + X @ self.linear + np.einsum("ij,ij->i", X @ self.quadratic, X)
+
+
+_models: Dict[str, QuadraticModel] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name: str, models_dir: Optional[str] = None) -> QuadraticModel:
+    """Load a model's artifacts once per process and return its folded form.
+
+    :param name: Key of ARTIFACTS, 'demand' or 'renewable'.
+    :param models_dir: Directory holding the .pkl files, defaults to this package.
+    """
+    if name not in ARTIFACTS:
+        raise ValueError(f"Unknown model '{name}', expected one of {sorted(ARTIFACTS)}.")
+    models_dir = models_dir or MODELS_DIR
+    cache_key = f"{models_dir}:{name}"
+    with _models_lock:
+        if cache_key not in _models:
+            import joblib
+
+            artifacts = {role: joblib.load(os.path.join(models_dir, filename))
+                         for role, filename in ARTIFACTS[name].items()}
+            _models[cache_key] = QuadraticModel.from_estimators(**artifacts)
+            logger.info(f"Loaded {name} model with {len(_models[cache_key].feature_names)} features")
+        return _models[cache_key]
+
+
+def set_model(name: str, model: QuadraticModel, models_dir: Optional[str] = None):
+    """Serve a new fit of a model in this process, e.g. the latest online version."""
+    with _models_lock:
+        _models[f"{models_dir or MODELS_DIR}:{name}"] = model
+
+
+def predict(name: str, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+    """Score a batch of site-hours with one of the saved models."""
+    return load_model(name).predict(X)
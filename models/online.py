@@ -0,0 +1,242 @@
+#online
+#incremental updates of the quadratic regressors from sufficient statistics, saved as versioned artifacts
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+
+from models.inference import QuadraticModel
+
+logger = logging.getLogger(__name__)
+
+class OnlineQuadraticModel:
+    """A degree-2 regression refit from running sums instead of the full history.
+
+    The model's terms are the constant, every feature and every product
+    ``x_i * x_j`` with i <= j, the same expansion QuadraticModel scores in
+    closed form. Each observed hour adds to ``Z'Z``, ``Z'y`` and ``y'y`` of
+    those terms, so solve() is one Cholesky factorization of a
+    (terms x terms) matrix however many hours have been seen.
+
+    Rows are buffered and folded in with one matrix product per
+    ``batch_size`` rows, which keeps update() cheap enough to call every hour.
+    Older hours can be down-weighted by ``decay`` per row. The fit is pulled
+    towards the starting coefficients (usually the notebook model) by a
+    ridge penalty of ``alpha`` times the diagonal of Z'Z, which does not
+    depend on the units of the features and lets a handful of hours nudge the
+    model rather than replace it.
+    """
+
+    def __init__(self, feature_names: List[str], prior: Optional[np.ndarray] = None,
+                 alpha: float = 1.0, decay: float = 1.0, batch_size: int = 256):
+        if not 0 < decay <= 1:
+            raise ValueError("decay must be in (0, 1].")
+        self.feature_names = list(feature_names)
+        n_features = len(self.feature_names)
+        self._left, self._right = np.triu_indices(n_features)
+        self.n_terms = 1 + n_features + len(self._left)
+        self.prior = np.zeros(self.n_terms) if prior is None else np.asarray(prior, dtype=float)
+        if self.prior.shape != (self.n_terms,):
+            raise ValueError(f"Expected {self.n_terms} prior coefficients, got {self.prior.shape}.")
+        self.alpha = alpha
+        self.decay = decay
+        self.batch_size = batch_size
+
+        self.zz = np.zeros((self.n_terms, self.n_terms))
+        self.zy = np.zeros(self.n_terms)
+        self.yy = 0.0
+        self.n_observations = 0
+        self._pending_x: List[np.ndarray] = []
+        self._pending_y: List[np.ndarray] = []
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model: QuadraticModel, **kwargs) -> "OnlineQuadraticModel":
+        """Start from a fitted model's coefficients, e.g. load_model('demand')."""
+        # Fold any lower-triangle weights onto the matching x_i * x_j term
+        quadratic = np.triu(model.quadratic) + np.tril(model.quadratic, k=-1).T
+        online = cls(model.feature_names, **kwargs)
+        online.prior = np.concatenate([[model.intercept], model.linear, quadratic[online._left, online._right]])
+        return online
+
+    def _terms(self, X: np.ndarray) -> np.ndarray:
+        return np.hstack([np.ones((len(X), 1)), X, X[:, self._left] * X[:, self._right]])
+
+    def _matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            missing = [name for name in self.feature_names if name not in X.columns]
+            if missing:
+                raise ValueError(f"Missing model features: {missing}")
+            X = X[self.feature_names].to_numpy(dtype=float)
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}.")
+        return X
+
+    def update(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> int:
+        """Add observed hours. Rows with a missing feature or target are skipped.
+
+        :return: Number of rows accepted.
+        """
+        X = self._matrix(X)
+        y = np.ravel(np.asarray(y, dtype=float))
+        if len(X) != len(y):
+            raise ValueError(f"X has {len(X)} rows but y has {len(y)}.")
+        valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        X, y = X[valid], y[valid]
+        with self._lock:
+            self._pending_x.append(X)
+            self._pending_y.append(y)
+            self._pending += len(y)
+            if self._pending >= self.batch_size:
+                self._flush()
+        return len(y)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        X, y = np.concatenate(self._pending_x), np.concatenate(self._pending_y)
+        self._pending_x, self._pending_y, self._pending = [], [], 0
+        Z = self._terms(X)
+        if self.decay < 1:
+            # The newest row keeps weight 1, the one before it decay, and so on
+            weights = self.decay ** np.arange(len(y) - 1, -1, -1)
+            carried = self.decay ** len(y)
+            self.zz *= carried
+            self.zy *= carried
+            self.yy *= carried
+            self.zz += (Z * weights[:, None]).T @ Z
+            self.zy += Z.T @ (weights * y)
+            self.yy += float(weights @ (y * y))
+        else:
+            self.zz += Z.T @ Z
+            self.zy += Z.T @ y
+            self.yy += float(y @ y)
+        self.n_observations += len(y)
+
+    def coefficients(self) -> np.ndarray:
+        """Solve the penalized normal equations for the term coefficients."""
+        with self._lock:
+            self._flush()
+            if self.n_observations == 0:
+                return self.prior.copy()
+            penalty = self.alpha * np.diag(self.zz).copy()
+            # Terms the data never exercised stay at their prior values
+            penalty += 1e-9 * max(penalty.max(), 1.0)
+            a = self.zz + np.diag(penalty)
+            b = self.zy + penalty * self.prior
+        try:
+            return linalg.cho_solve(linalg.cho_factor(a, check_finite=False), b, check_finite=False)
+        except linalg.LinAlgError:
+            return linalg.lstsq(a, b, check_finite=False)[0]
+
+    def solve(self) -> QuadraticModel:
+        """The current fit in the closed form the scoring code uses."""
+        beta = self.coefficients()
+        n_features = len(self.feature_names)
+        quadratic = np.zeros((n_features, n_features))
+        quadratic[self._left, self._right] = beta[1 + n_features:]
+        return QuadraticModel(self.feature_names, beta[0], beta[1:1 + n_features], quadratic)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Everything needed to resume updating, as arrays for np.savez."""
+        with self._lock:
+            self._flush()
+            return {
+                "feature_names": np.array(self.feature_names), "prior": self.prior,
+                "zz": self.zz, "zy": self.zy, "yy": np.array(self.yy),
+                "n_observations": np.array(self.n_observations),
+                "settings": np.array([self.alpha, self.decay, self.batch_size]),
+            }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> "OnlineQuadraticModel":
+        alpha, decay, batch_size = state["settings"]
+        online = cls([str(name) for name in state["feature_names"]], prior=state["prior"],
+                     alpha=float(alpha), decay=float(decay), batch_size=int(batch_size))
+        online.zz = np.array(state["zz"], dtype=float)
+        online.zy = np.array(state["zy"], dtype=float)
+        online.yy = float(state["yy"])
+        online.n_observations = int(state["n_observations"])
+        return online
+
+
+class ArtifactStore:
+    """Numbered versions of each online model under ``<directory>/<name>/``.
+
+    A version is one ``v0001.npz`` holding the solved coefficients and the
+    running sums to resume from; ``manifest.json`` lists the versions with
+    when they were saved and how many hours they had seen. Both are written
+    to a temporary file and renamed, so readers never see a partial version.
+    Like SeriesCache and FeaturePipeline, it needs an explicit data directory
+    so that versions are never written into the package.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _manifest_path(self, name: str) -> str:
+        return os.path.join(self.directory, name, "manifest.json")
+
+    def versions(self, name: str) -> List[Dict]:
+        path = self._manifest_path(name)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)
+
+    def save(self, name: str, online: OnlineQuadraticModel, **metadata) -> int:
+        """Solve and store a new version of a model.
+
+        :param metadata: Extra JSON values recorded in the manifest, e.g. the last timestamp.
+        :return: The new version number.
+        """
+        model = online.solve()
+        state = online.state()
+        with self._lock:
+            versions = self.versions(name)
+            version = versions[-1]["version"] + 1 if versions else 1
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+            path = os.path.join(self.directory, name, f"v{version:04d}.npz")
+            with open(f"{path}.tmp", "wb") as f:
+                np.savez(f, intercept=np.array(model.intercept), linear=model.linear,
+                         quadratic=model.quadratic, **state)
+            os.replace(f"{path}.tmp", path)
+
+            versions.append(dict(metadata, version=version, file=os.path.basename(path),
+                                 saved_at=time.time(), n_observations=online.n_observations))
+            manifest = self._manifest_path(name)
+            with open(f"{manifest}.tmp", "w") as f:
+                json.dump(versions, f, indent=2)
+            os.replace(f"{manifest}.tmp", manifest)
+        logger.info(f"Saved {name} model version {version} after {online.n_observations} hours")
+        return version
+
+    def _read(self, name: str, version: Optional[int]) -> Tuple[int, Dict[str, np.ndarray]]:
+        versions = self.versions(name)
+        if not versions:
+            raise FileNotFoundError(f"No saved versions of '{name}' in {self.directory}.")
+        entry = versions[-1] if version is None else next((v for v in versions if v["version"] == version), None)
+        if entry is None:
+            raise FileNotFoundError(f"Version {version} of '{name}' does not exist.")
+        with np.load(os.path.join(self.directory, name, entry["file"])) as data:
+            return entry["version"], dict(data)
+
+    def load(self, name: str, version: Optional[int] = None) -> QuadraticModel:
+        """A saved version (the latest by default) ready for scoring."""
+        _, data = self._read(name, version)
+        return QuadraticModel([str(n) for n in data["feature_names"]], float(data["intercept"]),
+                              data["linear"], data["quadratic"])
+
+    def resume(self, name: str, version: Optional[int] = None) -> OnlineQuadraticModel:
+        """The running sums of a saved version, to keep updating from."""
+        return OnlineQuadraticModel.from_state(self._read(name, version)[1])
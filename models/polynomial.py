@@ -0,0 +1,71 @@
+#polynomial
+#compact evaluation of the degree-2 polynomial terms that survive feature selection
+
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+def selected_powers(transformer, selector=None) -> np.ndarray:
+    """Exponent rows of the polynomial terms kept by a selector.
+
+    :param transformer: Fitted PolynomialFeatures.
+    :param selector: Optional selector fitted on the transformer's output
+        (anything with get_support(), e.g. SelectKBest).
+    :return: (n_terms, n_features) array of exponents, one row per kept term.
+    """
+    powers = np.asarray(transformer.powers_)
+    if selector is None:
+        return powers
+    support = selector.get_support()
+    if len(support) != len(powers):
+        raise ValueError(
+            f"Selector was fit on {len(support)} features but the transformer produces "
+            f"{len(powers)} terms; it must be fit on the polynomial output."
+        )
+    return powers[support]
+
+
+class CompactPolynomialFeatures:
+    """Computes only the selected degree-2 monomials, as products of column pairs.
+
+    ``transform(X)`` equals ``selector.transform(transformer.transform(X))``
+    but never builds the full expansion: each kept term is a constant, one
+    input column, or the product of two input columns, so the output costs
+    one gather and one multiply per kept term.
+    """
+
+    def __init__(self, transformer, selector=None):
+        powers = selected_powers(transformer, selector)
+        degrees = powers.sum(axis=1)
+        if degrees.max(initial=0) > 2:
+            raise ValueError("CompactPolynomialFeatures only supports terms up to degree 2.")
+
+        names = getattr(transformer, "feature_names_in_", None)
+        self.feature_names = list(names) if names is not None else None
+        self.n_features_in = powers.shape[1]
+        self.n_terms = len(powers)
+
+        # A degree-2 term is x[left] * x[right] with left == right for squares;
+        # linear terms only use left, and constant terms stay at 1
+        left = np.argmax(powers > 0, axis=1)
+        right = powers.shape[1] - 1 - np.argmax(powers[:, ::-1] > 0, axis=1)
+        self._linear = np.flatnonzero(degrees == 1)
+        self._quadratic = np.flatnonzero(degrees == 2)
+        self._linear_index = left[self._linear]
+        self._left = left[self._quadratic]
+        self._right = right[self._quadratic]
+
+    def transform(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names] if self.feature_names is not None else X
+            X = X.to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.shape[1] != self.n_features_in:
+            raise ValueError(f"Expected {self.n_features_in} features, got {X.shape[1]}.")
+
+        out = np.ones((X.shape[0], self.n_terms))
+        out[:, self._linear] = X[:, self._linear_index]
+        out[:, self._quadratic] = X[:, self._left] * X[:, self._right]
+        return out
@@ -0,0 +1,61 @@
+#service
+#persistent scoring worker: loads each model once and serves batch predictions over http
+#run with: uvicorn models.service:app
+
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from models.inference import ARTIFACTS, load_model
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Unpickle every model when the worker starts rather than on the first request."""
+    for name in ARTIFACTS:
+        load_model(name)
+    yield
+
+
+app = FastAPI(title="VARtigrate model scoring", lifespan=lifespan)
+
+
+class ScoringBatch(BaseModel):
+    """A batch of rows to score; ``columns`` names the values in each row."""
+    columns: List[str]
+    rows: List[List[Optional[float]]]
+
+
+@app.get("/models")
+def list_models() -> Dict[str, List[str]]:
+    """Feature names expected by each model."""
+    return {name: load_model(name).feature_names for name in ARTIFACTS}
+
+
+@app.post("/predict/{name}")
+def predict(name: str, batch: ScoringBatch) -> Dict[str, List[float]]:
+    """Score every row of the batch with one model."""
+    if name not in ARTIFACTS:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+    model = load_model(name)
+    missing = [feature for feature in model.feature_names if feature not in batch.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing model features: {missing}")
+
+    ragged = [i for i, row in enumerate(batch.rows) if len(row) != len(batch.columns)]
+    if ragged:
+        raise HTTPException(status_code=422,
+                            detail=f"Rows {ragged[:10]} do not have {len(batch.columns)} values")
+
+    values = np.array(batch.rows, dtype=float).reshape(len(batch.rows), len(batch.columns))
+    order = [batch.columns.index(feature) for feature in model.feature_names]
+    values = values[:, order]
+    # NaN would come back as a prediction that cannot be serialized
+    invalid = np.flatnonzero(~np.isfinite(values).all(axis=1))
+    if len(invalid):
+        raise HTTPException(status_code=422,
+                            detail=f"Rows {invalid[:10].tolist()} have missing or non-finite features")
+    return {"predictions": model.predict(values).tolist()}
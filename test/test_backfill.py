@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data_collectors.backfill import BackfillError, BackfillPlanner, plan_windows
+
+
+def hourly_frame(start, end):
+    index = pd.date_range(start, end, freq="h", inclusive="left")
+    return pd.DataFrame({"value": range(len(index))}, index=index)
+
+
+class TestPlanWindows(unittest.TestCase):
+
+    def test_month_windows_cover_range(self):
+        windows = plan_windows("2024-01-15", "2024-04-01", freq="month")
+        self.assertEqual(windows, [
+            (pd.Timestamp("2024-01-15"), pd.Timestamp("2024-02-01")),
+            (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-01")),
+            (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-04-01")),
+        ])
+
+    def test_empty_range(self):
+        self.assertEqual(plan_windows("2024-02-01", "2024-01-01"), [])
+
+
+class TestBackfillPlanner(unittest.TestCase):
+
+    def test_combines_windows_in_order(self):
+        planner = BackfillPlanner(hourly_frame, freq="week", max_workers=3)
+        df = planner.run("2024-01-01", "2024-02-01")
+        self.assertEqual(len(df), 31 * 24)
+        self.assertTrue(df.index.is_monotonic_increasing)
+
+    def test_resumes_after_failed_window(self):
+        calls = []
+
+        def flaky(start, end):
+            calls.append(start)
+            if start == pd.Timestamp("2024-02-01") and calls.count(start) == 1:
+                raise ConnectionError("503")
+            return hourly_frame(start, end)
+
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            planner = BackfillPlanner(flaky, checkpoint_dir=checkpoint_dir)
+            with self.assertRaises(BackfillError) as ctx:
+                planner.run("2024-01-01", "2024-04-01")
+            self.assertEqual(list(ctx.exception.failed), [(pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-01"))])
+            self.assertEqual(len(planner.pending("2024-01-01", "2024-04-01")), 1)
+
+            df = planner.run("2024-01-01", "2024-04-01")
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(len(df), (31 + 29 + 31) * 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from models.backtest import Backtester, Fold, rolling_origin_folds, score, summarize
+
+
+class LeastSquares:
+    """Minimal fit/predict estimator; module level so pool workers can unpickle it."""
+
+    def __init__(self, intercept=True):
+        self.intercept = intercept
+
+    def _design(self, X):
+        return np.column_stack([X, np.ones(len(X))]) if self.intercept else X
+
+    def fit(self, X, y):
+        self.coef_ = np.linalg.lstsq(self._design(X), y, rcond=None)[0]
+        return self
+
+    def predict(self, X):
+        return self._design(X) @ self.coef_
+
+
+class TestFolds(unittest.TestCase):
+
+    def test_expanding_folds_start_at_the_first_row(self):
+        folds = rolling_origin_folds(100, horizon=10, initial=50, step=20)
+
+        self.assertEqual(folds, [Fold(0, 0, 50, 50, 60), Fold(1, 0, 70, 70, 80), Fold(2, 0, 90, 90, 100)])
+
+    def test_rolling_window_and_gap(self):
+        folds = rolling_origin_folds(100, horizon=10, initial=50, window="rolling", train_size=30, gap=5)
+
+        self.assertEqual(folds[0], Fold(0, 20, 50, 55, 65))
+        self.assertTrue(all(f.train_end - f.train_start == 30 for f in folds))
+        self.assertTrue(all(f.test_start - f.train_end == 5 for f in folds))
+
+    def test_appending_rows_keeps_existing_folds(self):
+        before = rolling_origin_folds(100, horizon=10, initial=50)
+        after = rolling_origin_folds(130, horizon=10, initial=50)
+
+        self.assertEqual(after[:len(before)], before)
+        self.assertEqual(rolling_origin_folds(130, horizon=10, initial=50, n_folds=2), after[-2:])
+
+    def test_rolling_window_needs_a_size(self):
+        with self.assertRaises(ValueError):
+            rolling_origin_folds(100, horizon=10, initial=50, window="rolling")
+
+
+class TestScore(unittest.TestCase):
+
+    def test_metrics(self):
+        metrics = score(np.array([1.0, 2.0, 3.0, 4.0]), np.array([1.0, 2.0, 3.0, 6.0]))
+
+        self.assertAlmostEqual(metrics["mae"], 0.5)
+        self.assertAlmostEqual(metrics["rmse"], 1.0)
+        self.assertAlmostEqual(metrics["mape"], 0.125)
+        self.assertAlmostEqual(metrics["r2"], 1 - 4 / 5)
+
+
+class TestBacktester(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(rng.standard_normal((600, 3)), columns=["a", "b", "c"])
+        self.y = pd.Series(self.X.to_numpy() @ [2.0, -1.0, 0.5] + 10 + 0.1 * rng.standard_normal(600))
+        self.folds = rolling_origin_folds(600, horizon=50, initial=300, step=100)
+        self.models = {"ols": LeastSquares(), "no_intercept": LeastSquares(intercept=False)}
+
+    def test_results_per_model_and_fold(self):
+        backtester = Backtester(self.X, self.y, self.folds, max_workers=1)
+        with patch.object(Backtester, "_key") as key:
+            results = backtester.run(self.models)
+        # Without a cache directory the fold data is never hashed
+        key.assert_not_called()
+
+        self.assertEqual(len(results), 2 * len(self.folds))
+        self.assertEqual(list(results["fold"][:3]), [0, 1, 2])
+        self.assertTrue((results.loc[results["model"] == "ols", "rmse"] < 0.2).all())
+        self.assertFalse(results["cached"].any())
+        self.assertEqual(list(summarize(results).index), ["ols", "no_intercept"])
+
+    def test_pool_matches_in_process_run(self):
+        serial = Backtester(self.X, self.y, self.folds, max_workers=1).run(self.models)
+        parallel = Backtester(self.X, self.y, self.folds, max_workers=2).run(self.models)
+
+        pd.testing.assert_frame_equal(parallel.drop(columns=["fit_s", "predict_s"]),
+                                      serial.drop(columns=["fit_s", "predict_s"]))
+
+    def test_cache_reuses_unchanged_folds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = Backtester(self.X, self.y, self.folds, max_workers=1, cache_dir=directory).run(self.models)
+            again = Backtester(self.X, self.y, self.folds, max_workers=1, cache_dir=directory).run(self.models)
+
+            self.assertTrue(again["cached"].all())
+            pd.testing.assert_frame_equal(again.drop(columns="cached"), first.drop(columns="cached"))
+            self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(directory)))
+
+            # A revised value in the last test block only invalidates the folds that contain it
+            y = self.y.copy()
+            y.iloc[520] += 1.0
+            revised = Backtester(self.X, y, self.folds, max_workers=1, cache_dir=directory).run(self.models)
+            self.assertEqual(list(revised.loc[~revised["cached"], "fold"]), [2, 2])
+
+    def test_mismatched_lengths_raise(self):
+        with self.assertRaises(ValueError):
+            Backtester(self.X, self.y[:-1], self.folds)
+
+
+if __name__ == "__main__":
+    unittest.main()
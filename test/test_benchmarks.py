@@ -0,0 +1,30 @@
+import unittest
+from dataclasses import asdict
+
+from benchmarks.run import CASES, compare, load_thresholds, run_suite
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_every_case_runs_offline_at_small_scale(self):
+        results = run_suite(scale=0.002, repeat=1)
+
+        self.assertEqual(set(results), set(CASES))
+        for result in results.values():
+            self.assertGreater(result.units, 0)
+            self.assertGreater(result.throughput, 0)
+            self.assertGreaterEqual(result.peak_mb, 0)
+
+    def test_compare_flags_slower_and_larger_runs(self):
+        result = run_suite(["parse_eia"], scale=0.002, repeat=1)["parse_eia"]
+        baseline = asdict(result)
+        thresholds = load_thresholds()
+        self.assertEqual(compare({"parse_eia": result}, {"parse_eia": baseline}, thresholds), [])
+
+        baseline.update(throughput=result.throughput * 10, peak_mb=result.peak_mb / 10 - 5)
+        regressions = compare({"parse_eia": result}, {"parse_eia": baseline}, thresholds)
+        self.assertEqual(len(regressions), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
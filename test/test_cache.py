@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data_collectors.cache import SeriesCache, series_key
+
+
+def hourly(start, periods, value=1.0):
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=periods, freq="h"),
+        "region": "CISO",
+        "generation_mw": value,
+    })
+
+
+class TestSeriesCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SeriesCache(self.tmp.name)
+        self.key = series_key("eia", "get_renewable_generation", "SUN", "CISO", "hourly")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_partitions_by_year_and_sets_watermark(self):
+        self.cache.write(self.key, hourly("2023-12-31 22:00", 4))
+
+        years = sorted(name for name in os.listdir(os.path.join(self.tmp.name, *self.key.split("/")))
+                       if name.startswith("year="))
+        self.assertEqual(years, ["year=2023", "year=2024"])
+        self.assertEqual(self.cache.watermark(self.key), pd.Timestamp("2024-01-01 01:00"))
+
+    def test_read_prunes_columns_and_range(self):
+        self.cache.write(self.key, hourly("2023-12-31 00:00", 48))
+
+        df = self.cache.read(self.key, columns=["timestamp", "generation_mw"], start="2024-01-01")
+
+        self.assertEqual(list(df.columns), ["timestamp", "generation_mw"])
+        self.assertEqual(len(df), 24)
+
+    def test_refresh_fetches_only_after_watermark(self):
+        self.cache.write(self.key, hourly("2024-01-01", 24))
+        seen = []
+
+        def fetch(since):
+            seen.append(since)
+            # the API may return the watermark hour again
+            return hourly("2024-01-01 23:00", 3, value=2.0)
+
+        df = self.cache.refresh(self.key, fetch)
+
+        self.assertEqual(seen, [pd.Timestamp("2024-01-01 23:00")])
+        self.assertEqual(len(df), 26)
+        self.assertEqual(df["generation_mw"].iloc[23], 1.0)
+        self.assertEqual(self.cache.watermark(self.key), pd.Timestamp("2024-01-02 01:00"))
+
+    def test_bounds_match_a_utc_series(self):
+        utc = hourly("2023-12-31 20:00", 12).assign(timestamp=lambda df: df["timestamp"].dt.tz_localize("UTC"))
+        self.cache.write(self.key, utc)
+
+        naive = self.cache.read(self.key, start="2024-01-01 00:00", end="2024-01-01 03:00")
+        aware = self.cache.read(self.key, start=pd.Timestamp("2023-12-31 16:00", tz="US/Pacific"))
+        self.assertEqual(len(naive), 4)
+        self.assertEqual(naive["timestamp"].iloc[0], pd.Timestamp("2024-01-01 00:00", tz="UTC"))
+        self.assertEqual(len(aware), 8)
+
+        # The API repeats the watermark hour, in local time
+        newer = hourly("2024-01-01 07:00", 2, value=2.0).assign(
+            timestamp=lambda df: df["timestamp"].dt.tz_localize("UTC").dt.tz_convert("US/Pacific"))
+        df = self.cache.refresh(self.key, lambda since: newer, start="2024-01-01 07:00")
+        self.assertEqual(list(df["generation_mw"]), [1.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data.scripts.database import Database
+
+
+def demand(start, periods, value=100.0, region="CISO"):
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=periods, freq="h"),
+        "region": region,
+        "demand_mw": value,
+        "data_source": "EIA",
+    })
+
+
+class DatabaseTests:
+    backend = None
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, f"grid.{self.backend}"), backend=self.backend)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_upsert_replaces_rows_with_same_key(self):
+        self.db.upsert("demand", demand("2024-01-01", 48))
+        self.db.upsert("demand", demand("2024-01-02", 48, value=200.0))
+
+        df = self.db.query("demand")
+        self.assertEqual(len(df), 72)
+        self.assertEqual(df["demand_mw"].iloc[0], 100.0)
+        self.assertTrue((df["demand_mw"].iloc[24:] == 200.0).all())
+
+    def test_query_filters_time_range_and_regions(self):
+        self.db.upsert("demand", pd.concat([demand("2024-01-01", 24),
+                                            demand("2024-01-01", 24, region="ERCO")]))
+
+        df = self.db.query("demand", start="2024-01-01 05:00", end="2024-01-01 09:00",
+                           regions=["ERCO"], columns=["timestamp", "demand_mw"])
+        self.assertEqual(list(df.columns), ["timestamp", "demand_mw"])
+        self.assertEqual(len(df), 5)
+        self.assertEqual(df["timestamp"].iloc[0], pd.Timestamp("2024-01-01 05:00"))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["timestamp"]))
+
+    def test_aware_timestamps_are_stored_as_utc(self):
+        df = demand("2024-01-01", 2)
+        df["timestamp"] = df["timestamp"].dt.tz_localize("US/Pacific")
+        self.db.upsert("demand", df)
+
+        self.assertEqual(self.db.query("demand")["timestamp"].iloc[0], pd.Timestamp("2024-01-01 08:00"))
+
+    def test_missing_key_column_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.upsert("generation", demand("2024-01-01", 2))
+
+    def test_regions_on_a_table_without_regions_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.db.query("weather_forecast", regions=["CISO"])
+
+
+class TestSQLiteDatabase(DatabaseTests, unittest.TestCase):
+    backend = "sqlite"
+
+
+@unittest.skipIf(importlib.util.find_spec("duckdb") is None, "duckdb is not installed")
+class TestDuckDBDatabase(DatabaseTests, unittest.TestCase):
+    backend = "duckdb"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models.dispatch import plan_dispatch, solve_dispatch
+
+
+class TestSolveDispatch(unittest.TestCase):
+
+    def test_without_storage_surplus_is_curtailed_and_deficit_is_residual(self):
+        plan = solve_dispatch(np.array([[100.0, 20.0]]), np.array([[60.0, 50.0]]))
+
+        np.testing.assert_allclose(plan.used_mw, [[60, 20]])
+        np.testing.assert_allclose(plan.curtailed_mw, [[40, 0]])
+        np.testing.assert_allclose(plan.residual_mw, [[0, 30]])
+
+    def test_storage_shifts_surplus_with_losses(self):
+        plan = solve_dispatch(np.array([[100.0, 0.0]]), np.array([[50.0, 50.0]]),
+                              storage_energy_mwh=100, storage_power_mw=100,
+                              charge_efficiency=0.9, discharge_efficiency=0.9, initial_soc=0.0)
+
+        np.testing.assert_allclose(plan.charge_mw, [[50, 0]], atol=1e-6)
+        np.testing.assert_allclose(plan.discharge_mw, [[0, 40.5]], atol=1e-6)
+        np.testing.assert_allclose(plan.residual_mw, [[0, 9.5]], atol=1e-6)
+        np.testing.assert_allclose(plan.soc_mwh, [[45, 0]], atol=1e-6)
+
+    def test_limits_and_balances_hold_across_regions(self):
+        rng = np.random.default_rng(0)
+        hour = np.arange(168) % 24
+        renewable = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None) * rng.uniform(500, 3000, (5, 1))
+        demand = (1500 + 500 * np.sin(2 * np.pi * (hour - 9) / 24)) * rng.uniform(0.8, 1.5, (5, 1))
+        energy, power = np.array([0, 500, 1000, 2000, 4000]), np.array([0, 100, 250, 500, 1000])
+
+        plan = solve_dispatch(renewable, demand, storage_energy_mwh=energy, storage_power_mw=power)
+
+        np.testing.assert_allclose(plan.used_mw + plan.charge_mw + plan.curtailed_mw, renewable, atol=1e-6)
+        np.testing.assert_allclose(plan.used_mw + plan.discharge_mw + plan.residual_mw, demand, atol=1e-6)
+        self.assertTrue((plan.charge_mw <= power[:, None] + 1e-6).all())
+        self.assertTrue((plan.soc_mwh <= energy[:, None] + 1e-6).all())
+        self.assertTrue((plan.soc_mwh[:, -1] >= 0.5 * energy - 1e-6).all())
+        self.assertLess(plan.residual_mw[4].sum(), plan.residual_mw[0].sum())
+
+    def test_rejects_mismatched_forecasts(self):
+        with self.assertRaises(ValueError):
+            solve_dispatch(np.zeros((2, 24)), np.zeros((2, 23)))
+
+
+class TestPlanDispatch(unittest.TestCase):
+
+    def test_plans_from_long_forecast_frame(self):
+        times = pd.date_range("2024-07-01", periods=48, freq="h")
+        hour = times.hour.to_numpy()
+        forecasts = pd.concat([pd.DataFrame({
+            "region": region, "timestamp": times,
+            "solar_mw": scale * np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None),
+            "wind_mw": 100.0,
+            "demand_mw": 800.0,
+        }) for region, scale in [("CISO", 2000.0), ("ERCO", 500.0)]])
+        storage = pd.DataFrame({"energy_mwh": [4000.0], "power_mw": [1000.0]}, index=["CISO"])
+
+        plan = plan_dispatch(forecasts, storage=storage)
+        df = plan.to_frame()
+
+        self.assertEqual(plan.regions, ["CISO", "ERCO"])
+        self.assertEqual(len(df), 96)
+        self.assertGreater(df.loc[df["region"] == "CISO", "discharge_mw"].sum(), 0)
+        self.assertEqual(df.loc[df["region"] == "ERCO", "charge_mw"].sum(), 0)
+
+    def test_missing_demand_is_rejected(self):
+        forecasts = pd.DataFrame({"region": ["CISO", "CISO", "ERCO"],
+                                  "timestamp": pd.to_datetime(["2024-01-01 00:00", "2024-01-01 01:00",
+                                                               "2024-01-01 00:00"]),
+                                  "solar_mw": 0.0, "demand_mw": 10.0})
+        with self.assertRaises(ValueError):
+            plan_dispatch(forecasts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,17 @@
 import unittest
 from unittest.mock import patch, Mock
-from eia_collector import EIADataCollector  # adjust import if needed
+
+from data_collectors.eia_collector import EIADataCollector
 import pandas as pd
 
 class TestEIADataCollector(unittest.TestCase):
 
     def setUp(self):
         self.api_key = "test_api_key"
-        self.collector = EIADataCollector(api_key=self.api_key)
+        self.collector = EIADataCollector(api_key=self.api_key, requests_per_second=0)
 
-    @patch("eia_collector.requests.Session.get")
-    def test_get_electricity_demand(self, mock_get):
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_get_electricity_demand(self, mock_post):
         mock_data = {
             "response": {
                 "data": [
@@ -25,7 +26,7 @@ class TestEIADataCollector(unittest.TestCase):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_data
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
 
         df = self.collector.get_electricity_demand()
 
@@ -34,8 +35,8 @@ class TestEIADataCollector(unittest.TestCase):
         self.assertIn("timestamp", df.columns)
         self.assertEqual(df.iloc[0]["demand_mw"], 12345)
 
-    @patch("eia_collector.requests.Session.get")
-    def test_get_renewable_generation(self, mock_get):
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_get_renewable_generation(self, mock_post):
         mock_data = {
             "response": {
                 "data": [
@@ -51,7 +52,7 @@ class TestEIADataCollector(unittest.TestCase):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_data
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
 
         df = self.collector.get_renewable_generation()
 
@@ -59,8 +60,8 @@ class TestEIADataCollector(unittest.TestCase):
         self.assertEqual(df.iloc[0]["generation_mw"], 6789)
         self.assertEqual(df.iloc[0]["fuel_type"], "SUN")
 
-    @patch("eia_collector.requests.Session.get")
-    def test_get_electric_hourly_demand_subregion(self, mock_get):
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_get_electric_hourly_demand_subregion(self, mock_post):
         mock_data = {
             "response": {
                 "data": [
@@ -75,16 +76,16 @@ class TestEIADataCollector(unittest.TestCase):
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_data
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
 
         df = self.collector.get_electric_hourly_demand_subregion()
 
         self.assertEqual(df.iloc[0]["demand_mw"], 1111)
         self.assertEqual(df.iloc[0]["region"], "US48")
 
-    @patch("eia_collector.requests.Session.get")
-    def test_make_request_error_handling(self, mock_get):
-        mock_get.side_effect = Exception("API down")
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_make_request_error_handling(self, mock_post):
+        mock_post.side_effect = Exception("API down")
 
         with self.assertRaises(Exception):
             self.collector._make_request("invalid-endpoint")
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from data_collectors.eia_collector import EIADataCollector
+import pandas as pd
+
+
+def make_page(rows, total):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {"response": {"total": str(total), "data": rows}}
+    return response
+
+
+class TestEIAPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = EIADataCollector(api_key="test_api_key", requests_per_second=0)
+
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_fetches_every_offset_page(self, mock_post):
+        hours = pd.date_range("2024-01-01", periods=5, freq="h").strftime("%Y-%m-%dT%H")
+        rows = [{"period": p, "respondent": "CISO", "value": i} for i, p in enumerate(hours)]
+
+        def respond(url, json):
+            offset, length = json["offset"], json["length"]
+            # later pages overlap the previous one, as happens when data shifts between calls
+            start = offset - 1 if offset else 0
+            return make_page(rows[start:offset + length], total=len(rows))
+
+        mock_post.side_effect = respond
+        fetched = self.collector._fetch_rows("electricity/rto/region-data", {}, page_length=2)
+
+        offsets = sorted(call.kwargs["json"]["offset"] for call in mock_post.call_args_list)
+        self.assertEqual(offsets, [0, 2, 4])
+        self.assertEqual(len(fetched), 7)
+
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_getter_returns_deduplicated_sorted_frame(self, mock_post):
+        rows = [
+            {"period": "2024-01-01T02", "respondent": "CISO", "value": 3},
+            {"period": "2024-01-01T00", "respondent": "CISO", "value": 1},
+            {"period": "2024-01-01T02", "respondent": "CISO", "value": 3},
+            {"period": "2024-01-01T01", "respondent": "CISO", "value": 2},
+        ]
+        mock_post.return_value = make_page(rows, total=len(rows))
+
+        df = self.collector.get_electricity_demand(region="CISO")
+
+        self.assertEqual(len(df), 3)
+        self.assertTrue(df["timestamp"].is_monotonic_increasing)
+        self.assertEqual(list(df["demand_mw"]), [1, 2, 3])
+        body = mock_post.call_args[1]["json"]
+        self.assertEqual(body["facets"]["respondent"], ["CISO"])
+
+    @patch("data_collectors.eia_collector.requests.Session.post")
+    def test_single_page_mode_skips_pagination(self, mock_post):
+        rows = [{"period": "2024-01-01T00", "respondent": "CISO", "fueltype": "SUN", "value": 1}]
+        mock_post.return_value = make_page(rows, total=20000)
+
+        df = self.collector.get_renewable_generation(paginate=False)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(len(df), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
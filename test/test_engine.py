@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+from data_collectors.engine import CollectorEngine
+from data_collectors.rate_limiter import TokenBucket
+
+
+def make_response(status, headers=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        delays = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(delays[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(delays[3], 0.1, places=2)
+        self.assertAlmostEqual(delays[4], 0.2, places=2)
+
+    def test_throttle_halves_rate_and_recover_restores_it(self):
+        bucket = TokenBucket(rate=8)
+        bucket.throttle(0)
+        self.assertEqual(bucket.rate, 4)
+        for _ in range(10):
+            bucket.recover()
+        self.assertEqual(bucket.rate, 8)
+
+
+class TestCollectorEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = CollectorEngine(max_concurrency=16, backoff_base=0)
+        self.engine.register("https://api.example.com", requests_per_second=0)
+
+    @patch("requests.Session.get")
+    def test_retries_on_503_honoring_retry_after(self, mock_get):
+        mock_get.side_effect = [make_response(503, {"Retry-After": "0"}), make_response(200)]
+
+        response = self.engine.run(self.engine.request("GET", "https://api.example.com/x"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("requests.Session.get")
+    def test_gives_up_after_max_retries(self, mock_get):
+        mock_get.return_value = make_response(500)
+
+        response = self.engine.run(self.engine.request("GET", "https://api.example.com/x"))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(mock_get.call_count, self.engine.max_retries + 1)
+
+    @patch("requests.Session.get")
+    def test_gather_runs_requests_concurrently(self, mock_get):
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def slow_get(url):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return make_response(200)
+
+        mock_get.side_effect = slow_get
+        urls = [f"https://api.example.com/{i}" for i in range(32)]
+
+        responses = self.engine.gather([self.engine.request("GET", url) for url in urls])
+
+        self.assertEqual(len(responses), 32)
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 16)
+
+    def test_registering_again_keeps_the_limiter_and_its_backoff(self):
+        limiter = self.engine.limiter("https://api.example.com")
+        self.engine.register("https://api.example.com/v2", requests_per_second=10)
+        self.assertIs(self.engine.limiter("https://api.example.com"), limiter)
+
+        limiter = self.engine.set_rate("https://api.example.com", 8)
+        limiter.throttle(5)
+        self.engine.register("https://api.example.com", requests_per_second=20)
+
+        self.assertIs(self.engine.limiter("https://api.example.com"), limiter)
+        self.assertEqual(limiter.rate, 4)
+
+    @patch("requests.Session.get")
+    def test_run_works_inside_a_running_loop(self, mock_get):
+        mock_get.return_value = make_response(200)
+
+        async def notebook_cell():
+            return self.engine.run(self.engine.request("GET", "https://api.example.com/x"))
+
+        self.assertEqual(asyncio.run(notebook_cell()).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
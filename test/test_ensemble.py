@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.ensemble import Ensemble, batch_hash
+from models.inference import QuadraticModel
+
+
+class Scaled:
+    """Picklable stand-in model that counts its calls."""
+
+    def __init__(self, factor, version=None):
+        self.factor = factor
+        self.calls = 0
+        if version is not None:
+            self.version = version
+
+    def predict(self, X):
+        self.calls += 1
+        return np.asarray(X, dtype=float).sum(axis=1) * self.factor
+
+
+class Swapping(Scaled):
+    """Replaces or removes ensemble members while it is being scored."""
+
+    def __init__(self, factor, change):
+        super().__init__(factor, version="swapping")
+        self.change = change
+
+    def predict(self, X):
+        self.change()
+        return super().predict(X)
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.arange(12, dtype=float).reshape(4, 3)
+        self.ensemble = Ensemble(max_workers=2)
+        self.addCleanup(self.ensemble.close)
+
+    def test_weighted_mean_of_members(self):
+        quadratic = QuadraticModel(["a", "b", "c"], 0.0, np.ones(3), np.zeros((3, 3)))
+        self.ensemble.add("sum", quadratic, weight=1).add("double", Scaled(2.0), weight=3)
+
+        members = self.ensemble.predict_members(self.X)
+
+        np.testing.assert_allclose(members["sum"], [3, 12, 21, 30])
+        np.testing.assert_allclose(self.ensemble.predict(self.X), np.array([3, 12, 21, 30]) * 1.75)
+        self.ensemble.set_weights({"sum": 1, "double": 0})
+        np.testing.assert_allclose(self.ensemble.predict(self.X), [3, 12, 21, 30])
+
+    def test_repeated_batches_are_served_from_the_cache(self):
+        first, second = Scaled(1.0), Scaled(2.0)
+        self.ensemble.add("first", first).add("second", second)
+
+        self.ensemble.predict(self.X)
+        self.ensemble.predict(self.X.copy())
+        self.assertEqual((first.calls, second.calls), (1, 1))
+        self.assertEqual(self.ensemble.hits, 2)
+
+        self.ensemble.predict(self.X + 1)
+        self.assertEqual((first.calls, second.calls), (2, 2))
+
+    def test_new_member_version_only_rescores_that_member(self):
+        first = Scaled(1.0)
+        self.ensemble.add("first", first).add("second", Scaled(2.0, version="v1"))
+        self.ensemble.predict(self.X)
+
+        replacement = Scaled(3.0, version="v2")
+        self.ensemble.add("second", replacement)
+        self.ensemble.predict(self.X)
+
+        self.assertEqual((first.calls, replacement.calls), (1, 1))
+
+    def test_members_changed_during_scoring_do_not_mix_versions(self):
+        sums = self.X.sum(axis=1)
+        self.ensemble.add("first", Scaled(1.0))
+        self.ensemble.add("second", Swapping(2.0, lambda: self.ensemble.add("second", Scaled(5.0, version="v2"))))
+
+        np.testing.assert_allclose(self.ensemble.predict_members(self.X)["second"], sums * 2)
+        np.testing.assert_allclose(self.ensemble.predict_members(self.X)["second"], sums * 5)
+
+        self.ensemble.add("third", Swapping(3.0, lambda: self.ensemble.remove("first")))
+        self.ensemble.clear_cache()
+        np.testing.assert_allclose(self.ensemble.predict(self.X), sums * 4)
+
+    def test_process_pool_and_pickled_artifacts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.pkl")
+            joblib.dump(Scaled(2.0), path)
+            with Ensemble(processes=True, max_workers=2) as ensemble:
+                ensemble.add_artifact("pickled", path).add("inline", Scaled(4.0))
+
+                np.testing.assert_allclose(ensemble.predict(self.X), np.array([3, 12, 21, 30]) * 3.0)
+                self.assertEqual(len(ensemble.versions["pickled"]), 16)
+
+    def test_frame_hash_depends_on_values_and_columns(self):
+        df = pd.DataFrame(self.X, columns=["a", "b", "c"])
+
+        self.assertEqual(batch_hash(df), batch_hash(df.copy()))
+        self.assertNotEqual(batch_hash(df), batch_hash(df.rename(columns={"a": "z"})))
+        self.assertNotEqual(batch_hash(self.X), batch_hash(self.X.reshape(3, 4)))
+
+    def test_empty_ensemble_raises(self):
+        with self.assertRaises(ValueError):
+            self.ensemble.predict(self.X)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models.feature_store import CALENDAR_FEATURES, ForecastFeatureStore, forecast_features
+
+
+def site_forecast(sites=("Fresno", "Sacramento"), hours=6, start="2024-07-04 07:00"):
+    timestamps = pd.date_range(start, periods=hours, freq="h", tz="UTC")
+    n = len(sites) * hours
+    return pd.DataFrame({
+        "site": np.repeat(sites, hours),
+        "timestamp": np.tile(timestamps, len(sites)),
+        "temperature_c": np.arange(n, dtype=float),
+        "wind_speed_ms": np.full(n, 2.0),
+        "forecast_text": "Sunny",
+    })
+
+
+class TestForecastFeatures(unittest.TestCase):
+
+    def test_calendar_flags_are_local(self):
+        features = forecast_features(site_forecast(hours=1))
+
+        self.assertEqual(list(features.columns), ["temperature_c", "wind_speed_ms", *CALENDAR_FEATURES])
+        # 07:00 UTC on July 4th is midnight in California, a holiday
+        self.assertEqual(list(features["hour"]), [0, 0])
+        self.assertEqual(list(features["Holiday"]), [1, 1])
+
+
+class TestForecastFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def transform(X):
+            self.calls.append(len(X))
+            return np.column_stack([X[:, 0], X[:, 0] ** 2])
+
+        self.store = ForecastFeatureStore(transform=transform)
+
+    def test_only_changed_hours_are_recomputed(self):
+        forecast = site_forecast()
+        self.assertEqual(self.store.ingest(forecast), 12)
+        self.assertEqual(self.store.ingest(forecast), 0)
+
+        revised = forecast.copy()
+        revised.loc[3, "temperature_c"] = 30.0
+        # Text the features do not use does not invalidate anything
+        revised["forecast_text"] = "Cloudy"
+        self.assertEqual(self.store.ingest(revised), 1)
+        self.assertEqual(self.calls, [12, 1])
+
+        index, values = self.store.read(sites=["Fresno"])
+        self.assertEqual(len(index), 6)
+        np.testing.assert_array_equal(values[3], [30.0, 900.0])
+        self.assertEqual(self.store.reused, 23)
+
+    def test_new_hours_are_merged_in_site_and_hour_order(self):
+        self.store.ingest(site_forecast(hours=4))
+        self.store.ingest(site_forecast(hours=4, start="2024-07-04 09:00").assign(temperature_c=-1.0))
+
+        index, values = self.store.read()
+
+        self.assertEqual(len(self.store), 12)
+        self.assertEqual(list(index["site"]), ["Fresno"] * 6 + ["Sacramento"] * 6)
+        self.assertTrue(index.groupby("site")["timestamp"].apply(lambda t: t.is_monotonic_increasing).all())
+        np.testing.assert_array_equal(values[:6, 0], [0, 1, -1, -1, -1, -1])
+
+    def test_read_window_and_evict(self):
+        self.store.ingest(site_forecast())
+
+        index, values = self.store.read(start="2024-07-04 09:00", end="2024-07-04 11:00")
+        self.assertEqual(len(index), 4)
+        self.assertEqual(str(index["timestamp"].iloc[0]), "2024-07-04 09:00:00+00:00")
+
+        self.assertEqual(self.store.evict("2024-07-04 10:00"), 6)
+        self.assertEqual(len(self.store.read()[0]), 6)
+
+    def test_raw_features_without_transform_keep_their_names(self):
+        store = ForecastFeatureStore()
+        store.ingest(site_forecast(hours=2))
+
+        self.assertEqual(store.feature_names, ["temperature_c", "wind_speed_ms", *CALENDAR_FEATURES])
+        self.assertEqual(store.read()[1].dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
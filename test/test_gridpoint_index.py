@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from data_collectors.gridpoint_index import GridpointIndex
+from data_collectors.weather_collectors import NOAACollector
+
+
+def points_response(url):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {"properties": {"gridId": "STO", "gridX": 41, "gridY": 68}}
+    return response
+
+
+class TestGridpointIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "gridpoints.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rounds_keys_and_persists(self):
+        index = GridpointIndex(self.path)
+        index.put(38.58157, -121.4944, ("STO", 41, 68))
+        index.save()
+
+        reloaded = GridpointIndex(self.path)
+        self.assertEqual(reloaded.get(38.58161, -121.49438), ("STO", 41, 68))
+        self.assertIsNone(reloaded.get(38.6, -121.5))
+
+    def test_expired_entries_are_evicted(self):
+        index = GridpointIndex(self.path, ttl=60)
+        index.put(38.5816, -121.4944, ("STO", 41, 68))
+        with patch("data_collectors.gridpoint_index.time.time", return_value=index._entries["38.5816,-121.4944"][3] + 120):
+            self.assertIsNone(index.get(38.5816, -121.4944))
+            self.assertEqual(index.evict_expired(), 1)
+        self.assertEqual(len(index), 0)
+
+    @patch("requests.Session.get", side_effect=points_response)
+    def test_collector_warms_index_once(self, mock_get):
+        collector = NOAACollector(requests_per_second=0, gridpoint_index=GridpointIndex(self.path))
+        sites = [(38.5816, -121.4944), (37.3382, -121.8863)]
+
+        self.assertEqual(collector.warm_gridpoints(sites), 2)
+        self.assertEqual(collector.warm_gridpoints(sites), 0)
+        self.assertEqual(collector.get_gridpoint(*sites[0]), ("STO", 41, 68))
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
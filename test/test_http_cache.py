@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+import pandas as pd
+
+from data_collectors.engine import CollectorEngine
+from data_collectors.gridpoint_index import GridpointIndex
+from data_collectors.http_cache import ResponseCache, freshness_lifetime
+from data_collectors.weather_collectors import NOAACollector
+
+FORECAST = {"properties": {"periods": [
+    {"startTime": "2024-01-01T00:00:00-08:00", "temperature": 50, "temperatureUnit": "F"},
+    {"startTime": "2024-01-01T01:00:00-08:00", "temperature": 49, "temperatureUnit": "F"},
+]}}
+
+
+def make_response(status, headers=None, payload=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = payload
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_freshness_from_headers(self):
+        self.assertEqual(freshness_lifetime({"Cache-Control": "public, max-age=600"}), 600)
+        self.assertEqual(freshness_lifetime({"Cache-Control": "no-cache, max-age=600"}), 0)
+        self.assertAlmostEqual(freshness_lifetime({"Expires": "Mon, 01 Jan 2024 00:10:00 GMT"},
+                                                  now=pd.Timestamp("2024-01-01", tz="UTC").timestamp()), 600)
+        self.assertEqual(freshness_lifetime({}), 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        for url in ["a", "b"]:
+            cache.put(url, make_response(200), url)
+        cache.get("a")
+        cache.put("c", make_response(200), "c")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a").value, "a")
+        self.assertEqual(len(cache), 2)
+
+    def test_byte_budget_bounds_parsed_values(self):
+        frame = pd.DataFrame({"x": range(1000)})
+        cache = ResponseCache(max_bytes=int(frame.memory_usage(deep=True).sum() * 2.5))
+        for url in ["a", "b", "c"]:
+            cache.put(url, make_response(200), frame)
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+
+
+class TestConditionalForecasts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        index = GridpointIndex(os.path.join(self.tmp.name, "gridpoints.json"))
+        index.put(38.58, -121.49, ("STO", 41, 68))
+        index.put(38.6, -121.5, ("STO", 41, 68))
+        self.cache = ResponseCache()
+        self.collector = NOAACollector(requests_per_second=0, engine=CollectorEngine(backoff_base=0),
+                                       gridpoint_index=index, response_cache=self.cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("requests.Session.get")
+    def test_not_modified_reuses_parsed_frame(self, mock_get):
+        mock_get.side_effect = [
+            make_response(200, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, FORECAST),
+            make_response(304, {"Cache-Control": "max-age=0"}),
+        ]
+
+        first = self.collector.get_forecast(38.58, -121.49)
+        second = self.collector.get_forecast(38.58, -121.49)
+
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(mock_get.call_args_list[1].kwargs["headers"],
+                         {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    @patch("requests.Session.get")
+    def test_fresh_entry_skips_the_request(self, mock_get):
+        mock_get.return_value = make_response(200, {"Cache-Control": "max-age=3600"}, FORECAST)
+
+        self.collector.get_forecast(38.58, -121.49)
+        df = self.collector.get_forecast(38.6, -121.5)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(df["latitude"].iloc[0], 38.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import data_collectors
+from data_collectors.config import get_setting
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_isolated(code):
+    """Run code in a fresh interpreter without EIA_API_KEY and return its stdout."""
+    env = {key: value for key, value in os.environ.items() if key != "EIA_API_KEY"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_creating_collectors_does_not_import_heavy_dependencies(self):
+        loaded = run_isolated(
+            "import sys\n"
+            "from data_collectors import get_collector\n"
+            "get_collector('eia', api_key='key')\n"
+            "get_collector('noaa')\n"
+            "print(','.join(m for m in ('pandas', 'numpy', 'pyarrow') if m in sys.modules))"
+        )
+        self.assertEqual(loaded, "")
+
+    def test_importing_without_a_key_succeeds(self):
+        self.assertEqual(run_isolated("import data_collectors.eia_collector; print('ok')"), "ok")
+
+    def test_registry(self):
+        from data_collectors.weather_collectors import NOAACollector
+
+        self.assertIs(data_collectors.NOAACollector, NOAACollector)
+        self.assertIs(data_collectors.collector_class("noaa"), NOAACollector)
+        with self.assertRaises(ValueError):
+            data_collectors.collector_class("openweather")
+        with self.assertRaises(AttributeError):
+            data_collectors.NotACollector
+
+    def test_required_setting_raises_when_missing(self):
+        with self.assertRaises(ValueError):
+            get_setting("VARTIGRATE_UNSET_SETTING", required=True)
+        self.assertEqual(get_setting("VARTIGRATE_UNSET_SETTING", default="x"), "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
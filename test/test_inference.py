@@ -0,0 +1,52 @@
+import os
+import unittest
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.inference import ARTIFACTS, MODELS_DIR, QuadraticModel, load_model
+
+
+def load_artifacts(name):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return {role: joblib.load(os.path.join(MODELS_DIR, filename))
+                for role, filename in ARTIFACTS[name].items()}
+
+
+class TestQuadraticModel(unittest.TestCase):
+
+    def assert_matches_pipeline(self, name):
+        artifacts = load_artifacts(name)
+        transformer, model = artifacts["transformer"], artifacts["model"]
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(200, transformer.n_features_in_)),
+                         columns=transformer.feature_names_in_)
+
+        expected = model.predict(transformer.transform(X))
+        if "target_scaler" in artifacts:
+            expected = artifacts["target_scaler"].inverse_transform(expected.reshape(-1, 1)).ravel()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fused = load_model(name)
+        np.testing.assert_allclose(fused.predict(X), expected, rtol=1e-9, atol=1e-6)
+        # columns are matched by name, not position
+        np.testing.assert_allclose(fused.predict(X[X.columns[::-1]]), expected, rtol=1e-9, atol=1e-6)
+
+    def test_demand_matches_pipeline(self):
+        self.assert_matches_pipeline("demand")
+
+    def test_renewable_matches_pipeline(self):
+        self.assert_matches_pipeline("renewable")
+
+    def test_rejects_missing_features(self):
+        model = QuadraticModel(["a", "b"], 0.0, np.zeros(2), np.zeros((2, 2)))
+        with self.assertRaises(ValueError):
+            model.predict(pd.DataFrame({"a": [1.0]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
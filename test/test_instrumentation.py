@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from data_collectors.engine import CollectorEngine
+from data_collectors.instrumentation import JsonLinesTrace, MetricsRecorder
+from data_collectors.weather_collectors import NOAACollector
+
+
+def make_response(status, payload=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = {"Retry-After": "0"}
+    response.content = b"x" * 100
+    response.json.return_value = payload
+    return response
+
+
+FORECAST = {"properties": {"periods": [
+    {"startTime": "2024-01-01T00:00:00-08:00", "temperature": 50, "temperatureUnit": "F"},
+    {"startTime": "2024-01-01T01:00:00-08:00", "temperature": 49, "temperatureUnit": "F"},
+]}}
+POINT = {"properties": {"gridId": "STO", "gridX": 41, "gridY": 68}}
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    @patch("requests.Session.get")
+    def test_metrics_record_requests_rows_and_retries(self, mock_get):
+        mock_get.side_effect = [make_response(200, POINT), make_response(503), make_response(200, FORECAST)]
+        metrics = MetricsRecorder()
+        collector = NOAACollector(requests_per_second=0,
+                                  engine=CollectorEngine(backoff_base=0, instrumentation=metrics))
+
+        collector.get_forecast(38.58, -121.49)
+
+        summary = metrics.summary()["nws"]
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["rows"], 2)
+        self.assertEqual(summary["bytes"], 200)
+        self.assertEqual(summary["errors"], 0)
+
+    @patch("requests.Session.get")
+    def test_json_lines_trace(self, mock_get):
+        mock_get.side_effect = [make_response(200, POINT), make_response(200, FORECAST)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl")
+            collector = NOAACollector(requests_per_second=0,
+                                      engine=CollectorEngine(instrumentation=JsonLinesTrace(path)))
+            collector.get_forecast(38.58, -121.49)
+            with open(path) as f:
+                events = [json.loads(line) for line in f]
+
+        self.assertEqual([event["endpoint"] for event in events], ["points", "forecast/hourly"])
+        self.assertEqual(events[1]["rows"], 2)
+
+    def test_off_by_default(self):
+        self.assertIsNone(CollectorEngine().start_event("eia", "x"))
+
+
+if __name__ == "__main__":
+    unittest.main()
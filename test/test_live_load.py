@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from data.scripts.extract import GridStatusExtractor, LiveLoadTracker
+
+
+class FakeCAISO:
+    """Serves 5-minute load up to a moving 'now'."""
+
+    def __init__(self, start, periods):
+        times = pd.date_range(start, periods=periods, freq="5min", tz="US/Pacific")
+        self.load = pd.DataFrame({"Time": times, "Load": np.arange(periods, dtype=float)})
+        self.calls = []
+
+    def get_load(self, start, end):
+        self.calls.append(start)
+        times = self.load["Time"].dt.tz_convert("UTC")
+        return self.load[(times >= pd.Timestamp(start)) & (times <= pd.Timestamp(end))].copy()
+
+
+class TestLiveLoadTracker(unittest.TestCase):
+
+    def test_incremental_polls_match_resample(self):
+        caiso = FakeCAISO("2024-06-01 00:00", 12 * 30)
+        tracker = LiveLoadTracker(caiso, capacity_hours=6)
+        first = caiso.load["Time"].iloc[0].tz_convert("UTC")
+
+        for minutes in range(6 * 60, 30 * 60, 25):
+            previous = tracker.last_time
+            with patch("pandas.Timestamp.now", return_value=first + pd.Timedelta(minutes=minutes)):
+                tracker.poll()
+            if previous is not None:
+                # each poll only asks for intervals after the newest one held
+                self.assertEqual(caiso.calls[-1], previous)
+
+        seen = caiso.load[caiso.load["Time"] <= tracker.last_time]
+        expected = (seen.assign(Time=seen["Time"].dt.tz_convert("UTC")).tail(6 * 12)
+                    .set_index("Time").resample("h").mean()["Load"])
+        hourly = tracker.hourly(prev_hours=4)
+        np.testing.assert_allclose(hourly["Load"], expected.tail(4))
+        self.assertEqual(tracker.size, 6 * 12)
+
+    def test_push_evicts_oldest_hours(self):
+        tracker = LiveLoadTracker(caiso=None, capacity_hours=1)
+        hour = 3_600_000_000_000
+        times = np.arange(24, dtype=np.int64) * (hour // 12)
+        tracker.push(times, np.ones(24))
+        self.assertEqual(list(tracker.hourly_sums), [hour])
+        self.assertEqual(tracker.hourly_sums[hour], [12.0, 12])
+
+
+class TestHistoricalLoad(unittest.TestCase):
+
+    @patch("data.scripts.extract.CAISO")
+    def test_window_without_published_load_is_empty(self, caiso):
+        caiso.return_value.get_load.return_value = pd.DataFrame()
+
+        hourly = GridStatusExtractor()._load_hourly_window(pd.Timestamp("2024-06-01"), pd.Timestamp("2024-07-01"))
+
+        self.assertTrue(hourly.empty)
+        self.assertEqual(str(hourly.index.tz), "UTC")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models.inference import QuadraticModel
+from models.online import ArtifactStore, OnlineQuadraticModel
+
+
+def quadratic_target(X):
+    return 3.0 + X @ [1.0, -2.0, 0.5] + 0.7 * X[:, 0] * X[:, 1] - 0.3 * X[:, 2] ** 2
+
+
+class TestOnlineQuadraticModel(unittest.TestCase):
+
+    def setUp(self):
+        self.names = ["a", "b", "c"]
+        self.X = np.random.default_rng(0).standard_normal((500, 3))
+        self.y = quadratic_target(self.X)
+
+    def test_recovers_quadratic_from_hourly_updates(self):
+        online = OnlineQuadraticModel(self.names, alpha=0.0, batch_size=64)
+        for i in range(len(self.X)):
+            online.update(self.X[i:i + 1], self.y[i:i + 1])
+
+        model = online.solve()
+
+        self.assertEqual(online.n_observations, 500)
+        np.testing.assert_allclose(model.predict(self.X), self.y, atol=1e-8)
+        self.assertAlmostEqual(model.quadratic[0, 1], 0.7)
+
+    def test_starts_from_and_is_pulled_towards_a_fitted_model(self):
+        base = QuadraticModel(self.names, 1.0, np.array([1.0, 1.0, 1.0]), np.zeros((3, 3)))
+        online = OnlineQuadraticModel.from_model(base, alpha=1.0)
+
+        np.testing.assert_allclose(online.solve().predict(self.X), base.predict(self.X))
+
+        online.update(self.X[:20], self.y[:20])
+        nudged = online.solve().predict(self.X)
+        error = np.abs(nudged - self.y).mean()
+        self.assertLess(error, np.abs(base.predict(self.X) - self.y).mean())
+        self.assertGreater(error, 1e-3)
+
+    def test_decay_matches_weighted_least_squares(self):
+        online = OnlineQuadraticModel(self.names, alpha=0.0, decay=0.99, batch_size=7)
+        y = self.y + np.random.default_rng(1).standard_normal(500)
+        online.update(self.X[:250], y[:250])
+        online.update(self.X[250:], y[250:])
+
+        weights = np.sqrt(0.99 ** np.arange(499, -1, -1))
+        Z = online._terms(self.X)
+        expected = np.linalg.lstsq(Z * weights[:, None], y * weights, rcond=None)[0]
+        np.testing.assert_allclose(online.coefficients(), expected, rtol=1e-6, atol=1e-9)
+
+    def test_frames_are_matched_by_name_and_missing_rows_skipped(self):
+        online = OnlineQuadraticModel(self.names)
+        df = pd.DataFrame(self.X[:10], columns=self.names)[["c", "a", "b"]]
+        df.iloc[3, 0] = np.nan
+
+        self.assertEqual(online.update(df, self.y[:10]), 9)
+        with self.assertRaises(ValueError):
+            online.update(df.drop(columns="a"), self.y[:10])
+
+
+class TestArtifactStore(unittest.TestCase):
+
+    def test_versions_round_trip(self):
+        X = np.random.default_rng(0).standard_normal((100, 3))
+        online = OnlineQuadraticModel(["a", "b", "c"], alpha=0.0)
+        online.update(X[:50], quadratic_target(X[:50]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = ArtifactStore(directory)
+            self.assertEqual(store.save("demand", online, last_timestamp="2025-01-01T00"), 1)
+            first = store.load("demand")
+
+            resumed = store.resume("demand")
+            resumed.update(X[50:], quadratic_target(X[50:]) + 1.0)
+            self.assertEqual(store.save("demand", resumed), 2)
+
+            versions = store.versions("demand")
+            self.assertEqual([v["n_observations"] for v in versions], [50, 100])
+            self.assertEqual(versions[0]["last_timestamp"], "2025-01-01T00")
+            np.testing.assert_allclose(store.load("demand", version=1).predict(X), first.predict(X))
+            self.assertFalse(np.allclose(store.load("demand").predict(X), first.predict(X)))
+            with open(os.path.join(directory, "demand", "manifest.json")) as f:
+                self.assertEqual(len(json.load(f)), 2)
+            with self.assertRaises(FileNotFoundError):
+                store.load("renewable")
+
+
+if __name__ == "__main__":
+    unittest.main()
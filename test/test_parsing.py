@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_collectors.parsing import eia_frame, nws_forecast_frame, parse_wind_speeds
+
+
+class TestEIAFrame(unittest.TestCase):
+
+    def test_maps_fields_and_converts_types(self):
+        rows = [
+            {"period": "2024-01-01T00", "respondent": "CISO", "fueltype": "SUN", "value": "120", "extra": 1},
+            {"period": "2024-01-01T01", "respondent": "CISO", "fueltype": "SUN", "value": None},
+        ]
+        df = eia_frame(rows, {"period": "timestamp", "respondent": "region",
+                              "fueltype": "fuel_type", "value": "generation_mw"})
+
+        self.assertEqual(list(df.columns), ["timestamp", "region", "fuel_type", "generation_mw", "data_source"])
+        self.assertEqual(df["timestamp"].iloc[1], pd.Timestamp("2024-01-01 01:00"))
+        self.assertEqual(df["generation_mw"].iloc[0], 120)
+        self.assertTrue(np.isnan(df["generation_mw"].iloc[1]))
+
+    def test_empty_rows_keep_columns(self):
+        df = eia_frame([], {"period": "timestamp", "value": "demand_mw"})
+        self.assertEqual(list(df.columns), ["timestamp", "demand_mw", "data_source"])
+        self.assertEqual(len(df), 0)
+
+
+class TestNWSForecastFrame(unittest.TestCase):
+
+    def test_wind_speed_strings(self):
+        speeds = parse_wind_speeds(pd.Series(["10 mph", "5 to 10 mph", "calm", None]))
+        np.testing.assert_allclose(speeds, [4.4704, 2.2352, 0.0, 0.0])
+
+    def test_periods_across_dst_change(self):
+        periods = [
+            {"startTime": "2024-11-03T00:00:00-07:00", "temperature": 50, "temperatureUnit": "F",
+             "windSpeed": "10 mph", "windDirection": "NW", "shortForecast": "Clear"},
+            {"startTime": "2024-11-03T01:00:00-08:00", "temperature": 10, "temperatureUnit": "C"},
+        ]
+        df = nws_forecast_frame(periods, 38.58, -121.49)
+
+        self.assertEqual(str(df["timestamp"].dt.tz), "UTC")
+        self.assertEqual(df["timestamp"].iloc[1], pd.Timestamp("2024-11-03T09:00:00Z"))
+        np.testing.assert_allclose(df["temperature_c"], [10.0, 10.0])
+        self.assertEqual(list(df["wind_direction"]), ["NW", "N"])
+        self.assertEqual(list(df["forecast_text"]), ["Clear", ""])
+        self.assertEqual(df["wind_speed_ms"].iloc[1], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
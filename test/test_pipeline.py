@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data.scripts.pipeline import FeaturePipeline, RunningStats
+
+
+def raw_hours(start, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=periods, freq="h"),
+        "Sacramento": rng.normal(20, 5, periods),
+        "Load": rng.normal(25000, 4000, periods),
+    })
+
+
+class TestRunningStats(unittest.TestCase):
+
+    def test_chunked_stats_match_pandas(self):
+        df = raw_hours("2024-01-01", 1000)[["Sacramento", "Load"]]
+        stats = RunningStats()
+        for start in range(0, 1000, 137):
+            stats.update(df.iloc[start:start + 137])
+
+        self.assertAlmostEqual(stats.mean["Load"], df["Load"].mean(), places=6)
+        self.assertAlmostEqual(stats.std("Load"), df["Load"].std(), places=6)
+
+
+class TestFeaturePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raw = raw_hours("2024-07-01", 500)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lags_carry_across_chunks(self):
+        pipeline = FeaturePipeline(self.tmp.name, lag_columns={"Load": [1, 24]})
+        pipeline.run(self.raw.iloc[start:start + 100] for start in range(0, 500, 100))
+
+        df = pipeline.read()
+        np.testing.assert_allclose(df["Load_Lag_24"], self.raw["Load"].shift(24).astype("float32"))
+        self.assertEqual(df["Holiday"].astype(int).sum(), 24)  # July 4th
+        self.assertEqual(df["Load"].dtype, np.float32)
+
+    def test_lags_follow_the_clock_across_gaps(self):
+        raw = self.raw.copy()
+        raw.loc[150, "Sacramento"] = np.nan
+        pipeline = FeaturePipeline(self.tmp.name, lag_columns={"Load": [1, 24]})
+        # Hour 150 is incomplete and hour 160 missing; neither is stored
+        gappy = raw.drop(index=160)
+        pipeline.run(gappy.iloc[start:start + 100] for start in range(0, 499, 100))
+
+        df = pipeline.read()
+        load = raw["Load"].where(raw.index != 160)
+        stored = raw.index.drop([150, 160])
+        self.assertEqual(len(df), 498)
+        for lag in (1, 24):
+            np.testing.assert_allclose(df[f"Load_Lag_{lag}"], load.shift(lag)[stored].astype("float32"))
+
+    def test_update_appends_new_hours_only(self):
+        pipeline = FeaturePipeline(self.tmp.name, lag_columns={"Load": [1]})
+        pipeline.run([self.raw.iloc[:499]])
+
+        resumed = FeaturePipeline(self.tmp.name, lag_columns={"Load": [1]})
+        added = resumed.update(self.raw.iloc[490:])
+
+        self.assertEqual(len(added), 1)
+        self.assertAlmostEqual(float(added["Load_Lag_1"].iloc[0]), self.raw["Load"].iloc[498], places=0)
+        self.assertEqual(resumed.stats.count["Load"], 500)
+        normalized = resumed.normalized(["time", "Load"])
+        self.assertAlmostEqual(normalized["Load"].mean(), 0.0, places=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
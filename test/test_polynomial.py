@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+from sklearn.feature_selection import SelectKBest, f_regression
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import PolynomialFeatures
+
+from models.inference import QuadraticModel
+from models.polynomial import CompactPolynomialFeatures
+
+
+class TestCompactPolynomialFeatures(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.X = rng.normal(size=(300, 12))
+        self.y = self.X[:, 0] * self.X[:, 3] + 2 * self.X[:, 5] ** 2 - self.X[:, 7] + rng.normal(scale=0.1, size=300)
+        self.poly = PolynomialFeatures(degree=2, include_bias=True).fit(self.X)
+        self.selector = SelectKBest(f_regression, k=15).fit(self.poly.transform(self.X), self.y)
+
+    def test_matches_full_expansion_then_selection(self):
+        compact = CompactPolynomialFeatures(self.poly, self.selector)
+        expected = self.selector.transform(self.poly.transform(self.X))
+        np.testing.assert_allclose(compact.transform(self.X), expected)
+
+    def test_without_selector_matches_transformer(self):
+        compact = CompactPolynomialFeatures(self.poly)
+        np.testing.assert_allclose(compact.transform(self.X), self.poly.transform(self.X))
+
+    def test_quadratic_model_with_selected_terms(self):
+        selected = self.selector.transform(self.poly.transform(self.X))
+        model = LinearRegression().fit(selected, self.y)
+
+        fused = QuadraticModel.from_estimators(self.poly, model, selector=self.selector)
+
+        np.testing.assert_allclose(fused.predict(self.X), model.predict(selected), rtol=1e-9, atol=1e-9)
+
+    def test_rejects_selector_fit_on_raw_features(self):
+        raw_selector = SelectKBest(f_regression, k=3).fit(self.X, self.y)
+        with self.assertRaises(ValueError):
+            CompactPolynomialFeatures(self.poly, raw_selector)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from unittest.mock import Mock, patch
+
+import requests
+
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+from data_collectors.eia_collector import EIADataCollector
+from data_collectors.engine import CollectorEngine
+from data_collectors.resilience import (CircuitBreaker, CircuitOpenError, PageCheckpoint, RetryPolicy,
+                                        parse_retry_after)
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_retry_after_as_seconds_or_http_date(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 30, usegmt=True)), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_jittered_backoff_stays_under_the_exponential_cap(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0, seed=0)
+
+        delays = [policy.delay(attempt) for attempt in range(6) for _ in range(50)]
+
+        self.assertTrue(all(0 <= delay <= 5.0 for delay in delays))
+        self.assertTrue(all(delay <= 1.0 for delay in delays[:50]))
+        self.assertGreater(len(set(delays)), 250)
+
+    def test_retry_after_wins_up_to_the_cap(self):
+        policy = RetryPolicy(backoff_max=10.0)
+
+        self.assertEqual(policy.delay(0, retry_after=3.0), 3.0)
+        self.assertEqual(policy.delay(0, retry_after=300.0), 10.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold_and_closes_after_a_successful_probe(self):
+        breaker = CircuitBreaker("api.example.com", failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.allow()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()
+
+        time.sleep(0.06)
+        breaker.allow()
+        # Only one probe at a time
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("api.example.com", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.allow()
+        breaker.record_failure()
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()
+
+    def test_probe_that_never_reports_back_expires(self):
+        breaker = CircuitBreaker("api.example.com", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+
+
+class TestEngineResilience(unittest.TestCase):
+
+    @patch("requests.Session.get")
+    def test_connection_errors_are_retried(self, mock_get):
+        ok = Mock(status_code=200, headers={})
+        mock_get.side_effect = [requests.exceptions.ConnectionError("reset"), ok]
+        engine = CollectorEngine(backoff_base=0)
+
+        response = engine.run(engine.request("GET", "https://api.example.com/x"))
+
+        self.assertIs(response, ok)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("requests.Session.get")
+    def test_probe_failing_without_a_verdict_releases_the_breaker(self, mock_get):
+        engine = CollectorEngine(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+        url = "https://api.example.com/x"
+        mock_get.side_effect = requests.exceptions.ConnectionError("reset")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            engine.run(engine.request("GET", url))
+        time.sleep(0.06)
+
+        mock_get.side_effect = requests.exceptions.ChunkedEncodingError("truncated")
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            engine.run(engine.request("GET", url))
+        mock_get.side_effect = None
+        mock_get.return_value = Mock(status_code=200, headers={})
+
+        self.assertEqual(engine.run(engine.request("GET", url)).status_code, 200)
+        self.assertEqual(engine.breaker(url).state, "closed")
+
+    def test_breaker_fails_fast_once_a_host_keeps_failing(self):
+        with StandInServer() as server:
+            server.inject("points", 503, times=100, retry_after="0")
+            engine = CollectorEngine(max_retries=2, backoff_base=0, failure_threshold=3, reset_timeout=60)
+
+            response = engine.run(engine.request("GET", f"{server.url}/points/1,2"))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.hits["points"], 3)
+
+            with self.assertRaises(CircuitOpenError):
+                engine.run(engine.request("GET", f"{server.url}/points/1,2"))
+            self.assertEqual(server.hits["points"], 3)
+
+
+class TestPageCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = fixtures.eia_rows(25)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def collector(self, server):
+        collector = EIADataCollector(api_key="offline", requests_per_second=0,
+                                     engine=CollectorEngine(max_retries=1, backoff_base=0),
+                                     checkpoint_dir=self.directory.name)
+        collector.base_url = server.url
+        return collector
+
+    def test_transient_errors_are_retried_with_retry_after(self):
+        with StandInServer(eia_rows=self.rows) as server:
+            server.inject("eia", 503, retry_after="0", offset=10)
+
+            rows = self.collector(server)._fetch_rows("electricity/rto/region-data", {}, page_length=5)
+
+        self.assertEqual(rows, self.rows)
+        self.assertEqual(server.hits["eia"], 6)
+
+    def test_failed_pagination_resumes_from_completed_pages(self):
+        with StandInServer(eia_rows=self.rows) as server:
+            server.inject("eia", 500, times=2, offset=15)
+            collector = self.collector(server)
+
+            with self.assertRaises(requests.exceptions.HTTPError):
+                collector._fetch_rows("electricity/rto/region-data", {"start": "2024"}, page_length=5)
+            key = PageCheckpoint.key("electricity/rto/region-data", {"start": "2024", "length": 5})
+            self.assertEqual(collector.pages.offsets(key), [0, 5, 10, 20])
+
+            hits = server.hits["eia"]
+            rows = collector._fetch_rows("electricity/rto/region-data", {"start": "2024"}, page_length=5)
+
+        self.assertEqual(server.hits["eia"], hits + 1)
+        self.assertEqual(rows, self.rows)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, key)))
+
+
+if __name__ == "__main__":
+    unittest.main()
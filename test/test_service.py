@@ -0,0 +1,42 @@
+import unittest
+import warnings
+
+from fastapi.testclient import TestClient
+
+from models.inference import load_model
+from models.service import app
+
+
+class TestPredictEndpoint(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cls.features = load_model("demand").feature_names
+        cls.client = TestClient(app)
+
+    def post(self, rows):
+        return self.client.post("/predict/demand", json={"columns": self.features, "rows": rows})
+
+    def test_scores_complete_rows(self):
+        response = self.post([[0.0] * len(self.features)] * 2)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["predictions"]), 2)
+
+    def test_ragged_rows_are_rejected(self):
+        response = self.post([[0.0] * len(self.features), [0.0] * (len(self.features) - 1)])
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("[1]", response.json()["detail"])
+
+    def test_missing_values_are_rejected(self):
+        response = self.post([[0.0] * len(self.features), [None] + [0.0] * (len(self.features) - 1)])
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("[1]", response.json()["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from data_collectors.engine import CollectorEngine
+from data_collectors.sites import Site, SiteRegistry
+from data_collectors.weather_collectors import NOAACollector
+
+# Sacramento and West Sacramento share a forecast cell, San Jose does not
+GRIDPOINTS = {
+    "38.5816,-121.4944": ("STO", 41, 68),
+    "38.5805,-121.5302": ("STO", 41, 68),
+    "37.3382,-121.8863": ("MTR", 99, 82),
+    "38.5449,-121.7405": ("STO", 30, 66),
+}
+
+
+def fake_get(url, **kwargs):
+    response = Mock()
+    response.status_code = 200
+    response.headers = {}
+    if "/points/" in url:
+        office, grid_x, grid_y = GRIDPOINTS[url.rsplit("/", 1)[1]]
+        response.json.return_value = {"properties": {"gridId": office, "gridX": grid_x, "gridY": grid_y}}
+    else:
+        temperature = 50 if "/STO/" in url else 60
+        response.json.return_value = {"properties": {"periods": [
+            {"startTime": "2024-01-01T00:00:00-08:00", "temperature": temperature, "temperatureUnit": "F",
+             "windSpeed": "10 mph"},
+            {"startTime": "2024-01-01T01:00:00-08:00", "temperature": temperature, "temperatureUnit": "F",
+             "windSpeed": "5 mph"},
+        ]}}
+    return response
+
+
+class TestSiteForecasts(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = SiteRegistry([
+            Site("Sacramento", 38.5816, -121.4944),
+            Site("Sacramento Solar", 38.58158, -121.49441),
+            Site("West Sacramento", 38.5805, -121.5302),
+            Site("San Jose", 37.3382, -121.8863),
+        ])
+        self.collector = NOAACollector(requests_per_second=0, engine=CollectorEngine(backoff_base=0))
+
+    def test_colocated_sites_share_a_coordinate_bucket(self):
+        self.assertEqual(len(self.registry), 4)
+        self.assertEqual(len(self.registry.coordinates()), 3)
+        with self.assertRaises(ValueError):
+            self.registry.add(Site("San Jose", 0.0, 0.0))
+
+    @patch("requests.Session.get", side_effect=fake_get)
+    def test_each_gridpoint_is_fetched_once_and_broadcast(self, mock_get):
+        df = self.collector.get_site_forecasts(self.registry)
+
+        forecast_calls = [call for call in mock_get.call_args_list if "/forecast/hourly" in call.args[0]]
+        self.assertEqual(len(forecast_calls), 2)
+        self.assertEqual(mock_get.call_count, 5)
+        self.assertEqual(len(df), 8)
+        by_site = df.groupby("site")["temperature_c"].first().round(1)
+        self.assertEqual(by_site["West Sacramento"], 10.0)
+        self.assertEqual(by_site["San Jose"], 15.6)
+        self.assertEqual(df.loc[df["site"] == "West Sacramento", "longitude"].iloc[0], -121.5302)
+
+    @patch("requests.Session.get", side_effect=fake_get)
+    def test_refreshes_reuse_resolved_gridpoints(self, mock_get):
+        self.collector.get_site_forecasts(self.registry)
+        mock_get.reset_mock()
+
+        self.collector.get_site_forecasts(self.registry)
+        self.assertFalse([call for call in mock_get.call_args_list if "/points/" in call.args[0]])
+
+        # Only a site in a new location needs a lookup
+        self.registry.add(Site("Davis", 38.5449, -121.7405))
+        mock_get.reset_mock()
+        df = self.collector.get_site_forecasts(self.registry)
+
+        self.assertEqual(len([call for call in mock_get.call_args_list if "/points/" in call.args[0]]), 1)
+        self.assertEqual(df["site"].nunique(), 5)
+
+    @patch("requests.Session.get", side_effect=fake_get)
+    def test_wide_frame_has_a_column_per_site_and_variable(self, mock_get):
+        df = self.collector.get_site_forecasts(self.registry, wide=True)
+
+        self.assertEqual(df.shape, (2, 8))
+        self.assertIn("San Jose temperature_c", df.columns)
+        self.assertAlmostEqual(df["Sacramento wind_speed_ms"].iloc[1], 5 * 0.44704)
+
+
+if __name__ == "__main__":
+    unittest.main()
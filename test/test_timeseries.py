@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_collectors.timeseries import HourlyTable, epoch_hours, hour_timestamps
+
+
+def demand_frame():
+    hours = pd.date_range("2024-03-10 00:00", periods=4, freq="h")
+    return pd.DataFrame({
+        "timestamp": np.tile(hours, 2),
+        "region": ["CISO"] * 4 + ["ERCO"] * 4,
+        "demand_mw": np.arange(8, dtype=float),
+        "data_source": "EIA",
+    })
+
+
+class TestEpochHours(unittest.TestCase):
+
+    def test_naive_and_aware_timestamps_agree(self):
+        naive = pd.Series(pd.to_datetime(["2024-01-01 00:00", "2024-01-01 05:00"]))
+        aware = naive.dt.tz_localize("UTC").dt.tz_convert("America/Los_Angeles")
+
+        np.testing.assert_array_equal(epoch_hours(naive), epoch_hours(aware))
+        self.assertEqual(epoch_hours(naive)[0], 19723 * 24)
+        self.assertEqual(hour_timestamps(epoch_hours(naive), tz=None).tolist(), naive.tolist())
+
+    def test_off_hour_timestamps_raise(self):
+        with self.assertRaises(ValueError):
+            epoch_hours(pd.to_datetime(["2024-01-01 00:05"]))
+
+
+class TestHourlyTable(unittest.TestCase):
+
+    def test_frame_round_trip_uses_compact_types(self):
+        df = demand_frame()
+        table = HourlyTable.from_frame(df)
+
+        self.assertEqual(list(table.dims), ["region", "data_source"])
+        self.assertEqual(table.values["demand_mw"].dtype, np.float32)
+        self.assertEqual(table.dims["region"].codes.dtype, np.int8)
+        back = table.to_frame(tz=None)
+        pd.testing.assert_series_equal(back["timestamp"], df["timestamp"])
+        self.assertEqual(list(back["region"]), list(df["region"]))
+        self.assertLess(table.nbytes, df.memory_usage(deep=True).sum())
+
+    def test_join_matches_hour_and_shared_labels(self):
+        demand = HourlyTable.from_frame(demand_frame())
+        generation = HourlyTable.from_frame(pd.DataFrame({
+            "timestamp": pd.to_datetime(["2024-03-10 03:00", "2024-03-10 01:00", "2024-03-10 01:00"]),
+            "region": ["ERCO", "CISO", "MISO"],
+            "generation_mw": [30.0, 10.0, 99.0],
+        }))
+
+        joined = demand.join(generation)
+        expected = [np.nan, 10, np.nan, np.nan, np.nan, np.nan, np.nan, 30]
+        np.testing.assert_array_equal(joined.values["generation_mw"], np.array(expected, dtype="float32"))
+
+        inner = demand.join(generation, how="inner").to_frame()
+        self.assertEqual(list(inner["region"]), ["CISO", "ERCO"])
+        self.assertEqual(list(inner["demand_mw"]), [1, 7])
+
+    def test_join_on_hour_only_broadcasts_to_every_label(self):
+        demand = HourlyTable.from_frame(demand_frame())
+        weather = HourlyTable.from_frame(pd.DataFrame({
+            "timestamp": pd.date_range("2024-03-10", periods=4, freq="h"),
+            "demand_mw": [20.0, 21.0, 22.0, 23.0],
+        }))
+
+        joined = demand.join(weather)
+
+        np.testing.assert_array_equal(joined.values["demand_mw_right"], np.tile([20, 21, 22, 23], 2))
+
+    def test_join_without_any_matching_right_rows(self):
+        demand = HourlyTable.from_frame(demand_frame())
+        other_region = HourlyTable.from_frame(pd.DataFrame({
+            "timestamp": pd.to_datetime(["2024-03-10 01:00"]), "region": ["MISO"], "generation_mw": [5.0]}))
+        empty = other_region.take(np.zeros(1, bool))
+
+        for right in (other_region, empty):
+            joined = demand.join(right)
+            self.assertEqual(len(joined), 8)
+            self.assertTrue(np.isnan(joined.values["generation_mw"]).all())
+            self.assertEqual(len(demand.join(right, how="inner")), 0)
+
+    def test_join_rejects_duplicate_right_rows_and_extra_dims(self):
+        demand = HourlyTable.from_frame(demand_frame())
+        with self.assertRaises(ValueError):
+            demand.join(HourlyTable.concat([demand, demand]))
+        sites = HourlyTable.from_frame(pd.DataFrame({
+            "timestamp": pd.to_datetime(["2024-03-10"]), "site": ["Fresno"], "temperature_c": [10.0]}))
+        with self.assertRaises(ValueError):
+            demand.join(sites)
+
+    def test_unstack_and_grid(self):
+        table = HourlyTable.from_frame(demand_frame().iloc[::-1])
+
+        wide = table.unstack("region").to_frame(tz=None)
+        self.assertEqual(list(wide.columns), ["timestamp", "data_source", "CISO demand_mw", "ERCO demand_mw"])
+        self.assertEqual(list(wide["CISO demand_mw"]), [0, 1, 2, 3])
+        self.assertEqual(list(wide["ERCO demand_mw"]), [4, 5, 6, 7])
+
+        labels, hours, matrix = table.between(end="2024-03-10 03:00").grid("demand_mw", end="2024-03-10 04:00")
+        self.assertEqual(list(labels["region"]), ["CISO", "ERCO"])
+        self.assertEqual(len(hours), 4)
+        np.testing.assert_array_equal(matrix, [[0, 1, 2, np.nan], [4, 5, 6, np.nan]])
+
+    def test_concat_merges_categories_and_sort_orders_by_label_then_hour(self):
+        df = demand_frame()
+        table = HourlyTable.concat([HourlyTable.from_frame(df.iloc[4:]), HourlyTable.from_frame(df.iloc[:4])])
+
+        self.assertEqual(list(table.sort().to_frame()["demand_mw"]), list(range(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()